@@ -1,3 +1,4 @@
+import hashlib
 import logging
 from collections.abc import AsyncGenerator
 from pathlib import Path
@@ -7,10 +8,23 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
+from app.services.db_pool import InstrumentedAsyncAdaptedQueuePool, db_pool_monitor
+from app.services.query_tracking import attach_query_tracking
 
 logger = logging.getLogger(__name__)
 
-engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+db_pool_monitor.attach(engine)
+attach_query_tracking(engine)
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -29,6 +43,9 @@ DB_INIT_ORDER = [
     "credit_wallets.sql",
     "credit_purchases.sql",
     "credit_transactions.sql",
+    "prize_pool_contributions.sql",
+    "mollie_webhook_inbox.sql",
+    "rate_limit_buckets.sql",
 ]
 
 
@@ -55,16 +72,51 @@ def _find_db_dir() -> Path:
     raise FileNotFoundError(f"Could not find db directory. Tried: {candidate_text}")
 
 
-async def init_db_schema(db: AsyncSession) -> None:
-    """Initialize schema by applying SQL files in dependency-safe order."""
+# Bootstrap table recording the checksum of each applied schema file. It guards the
+# files themselves, so it is created here rather than in db/.
+_SCHEMA_FILES_DDL = text(
+    """
+    CREATE TABLE IF NOT EXISTS schema_files (
+        file_name TEXT PRIMARY KEY,
+        checksum TEXT NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+    )
+    """
+)
+_RECORD_SCHEMA_FILE_SQL = text(
+    """
+    INSERT INTO schema_files (file_name, checksum)
+    VALUES (:file_name, :checksum)
+    ON CONFLICT (file_name) DO UPDATE
+    SET checksum = EXCLUDED.checksum,
+        applied_at = now() AT TIME ZONE 'utc'
+    """
+)
+
+
+async def init_db_schema(db: AsyncSession) -> list[str]:
+    """Apply SQL files in dependency-safe order, skipping files whose checksum is unchanged.
+
+    Every file is idempotent, so a changed file is simply re-run in full. Returns the
+    names of the files that were applied.
+    """
 
     db_dir = _find_db_dir()
+    await db.execute(_SCHEMA_FILES_DDL)
+    result = await db.execute(text("SELECT file_name, checksum FROM schema_files"))
+    applied_checksums = dict(result.tuples().all())
+
+    applied_files: list[str] = []
     for sql_file_name in DB_INIT_ORDER:
         sql_path = db_dir / sql_file_name
         if not sql_path.exists():
             raise FileNotFoundError(f"Required schema file missing: {sql_path}")
 
         sql_content = sql_path.read_text(encoding="utf-8")
+        checksum = hashlib.sha256(sql_content.encode("utf-8")).hexdigest()
+        if applied_checksums.get(sql_file_name) == checksum:
+            continue
+
         statements = [
             statement.strip()
             for statement in sql_content.split(";")
@@ -73,8 +125,13 @@ async def init_db_schema(db: AsyncSession) -> None:
 
         for statement in statements:
             await db.execute(text(statement))
+        await db.execute(
+            _RECORD_SCHEMA_FILE_SQL, {"file_name": sql_file_name, "checksum": checksum}
+        )
+        applied_files.append(sql_file_name)
 
     await db.commit()
+    return applied_files
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -1,13 +1,24 @@
-from fastapi import Depends, HTTPException, status
+import math
+from collections.abc import Awaitable, Callable
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
 from app.models.users import User
-from app.services.auth import decode_access_token
+from app.services.auth import verified_token_cache
+from app.services.bot_provider import BotProvider
+from app.services.mock_bot import MockBotProvider
+from app.services.rate_limiter import RateLimitExceededError, rate_limiter
+from app.services.user_cache import AuthenticatedUser, authenticated_user_cache
 
 _bearer_scheme = HTTPBearer(auto_error=False)
+_bot_provider: BotProvider = MockBotProvider(
+    token_delay_seconds=settings.MOCK_BOT_TOKEN_DELAY_SECONDS
+)
 
 
 def _unauthorized_error() -> HTTPException:
@@ -23,20 +34,81 @@ def _unauthorized_error() -> HTTPException:
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(_bearer_scheme),
     db: AsyncSession = Depends(get_db),
-) -> User:
-    """Resolve and return the authenticated user for bearer-token requests."""
+) -> AuthenticatedUser:
+    """Resolve and return the authenticated user for bearer-token requests.
+
+    Tokens already verified by this process and identities from the authenticated-user
+    cache are reused, so most requests skip both signature checks and the users lookup.
+    """
 
     if credentials is None or credentials.scheme.lower() != "bearer":
         raise _unauthorized_error()
 
     try:
-        payload = decode_access_token(credentials.credentials)
+        payload = verified_token_cache.decode(credentials.credentials)
         user_id = int(payload["sub"])
     except (ValueError, KeyError):
         raise _unauthorized_error() from None
 
+    cached_user = authenticated_user_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
+
     result = await db.execute(select(User).where(User.user_id == user_id))
     user = result.scalars().first()
     if user is None:
         raise _unauthorized_error()
-    return user
+    authenticated_user = AuthenticatedUser.from_user(user)
+    authenticated_user_cache.put(authenticated_user)
+    return authenticated_user
+
+
+def rate_limit(
+    *,
+    ip_policy: str | None = None,
+    user_policy: str | None = None,
+) -> Callable[..., Awaitable[None]]:
+    """Build a route dependency that spends a token per client IP and/or bearer user.
+
+    Declare it in the route decorator's `dependencies` so it runs before the session,
+    the user lookup and any bcrypt work. The user comes from the bearer token alone;
+    requests without a valid one are only limited per IP and then rejected by auth.
+    """
+
+    async def _check_rate_limit(
+        request: Request,
+        credentials: HTTPAuthorizationCredentials | None = Depends(_bearer_scheme),
+    ) -> None:
+        if ip_policy is not None:
+            client_ip = request.client.host if request.client else "unknown"
+            await enforce_rate_limit(ip_policy, client_ip)
+        if user_policy is not None and credentials is not None:
+            try:
+                user_id = str(verified_token_cache.decode(credentials.credentials)["sub"])
+            except (ValueError, KeyError):
+                return
+            await enforce_rate_limit(user_policy, user_id)
+
+    return _check_rate_limit
+
+
+async def enforce_rate_limit(policy_name: str, identity: str) -> None:
+    """Spend a token for `identity`, answering 429 when its bucket is empty.
+
+    Routes call this directly for identities only known once the body is parsed.
+    """
+
+    try:
+        await rate_limiter.hit(policy_name, identity)
+    except RateLimitExceededError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please retry later",
+            headers={"Retry-After": str(max(1, math.ceil(exc.retry_after_seconds)))},
+        ) from exc
+
+
+def get_bot_provider() -> BotProvider:
+    """Return the process-wide bot provider used to answer attack messages."""
+
+    return _bot_provider
@@ -1,90 +1,185 @@
+import asyncio
+import contextlib
 import logging
+import time
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
 import pendulum
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from app.config import settings
-from app.database import get_db, init_db_schema
+from app.database import DB_INIT_ORDER, AsyncSessionLocal, engine, init_db_schema
+from app.middleware import PrometheusMiddleware, QueryBudgetMiddleware
 from app.models.challenges import Challenge
 from app.models.timezones import Timezone
-from app.routers import attempts, auth, challenges, credits, health, payments, users
+from app.routers import attempts, auth, challenges, credits, health, metrics, payments, users
+from app.services.bot_pool import bot_pool
+from app.services.db_pool import db_pool_monitor
+from app.services.metrics import (
+    RuntimeStatsCollector,
+    app_startup_seconds,
+    mark_worker_stopped,
+    register_process_collector,
+)
+from app.services.mollie import mollie_client
+from app.services.password_hasher import password_hasher
+from app.services.prize_pool import run_prize_pool_folder
+from app.services.rate_limiter import PostgresRateLimitBackend, rate_limiter, run_rate_limit_pruner
+from app.services.webhook_inbox import run_webhook_inbox_drainer
 from app.static_data.challenges import SEED_CHALLENGES
 from app.static_data.timezones import TimezoneEnum
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Session-level, so the lock survives the commits inside schema init and seeding.
+_PREPARE_DATABASE_LOCK_SQL = text("SELECT pg_advisory_lock(hashtext('prepare_database'))")
+_PREPARE_DATABASE_UNLOCK_SQL = text("SELECT pg_advisory_unlock(hashtext('prepare_database'))")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    """Initialize schema and seed static data at startup."""
+    """Prepare the database, start background workers, and release resources on shutdown."""
 
     logger.info("Starting template backend")
+    started = time.perf_counter()
     settings.validate_runtime_config()
 
-    async for db in get_db():
-        await init_db_schema(db)
-        await seed_timezones(db)
-        await seed_challenges(db)
-        break
+    await prepare_database(engine)
+
+    if settings.RATE_LIMIT_BACKEND == "postgres":
+        rate_limiter.backend = PostgresRateLimitBackend(engine)
+    await mollie_client.start()
+    prize_pool_folder = asyncio.create_task(
+        run_prize_pool_folder(
+            AsyncSessionLocal,
+            interval_seconds=settings.PRIZE_POOL_FOLD_INTERVAL_SECONDS,
+            batch_size=settings.PRIZE_POOL_FOLD_BATCH_SIZE,
+        )
+    )
+    webhook_inbox_drainer = asyncio.create_task(
+        run_webhook_inbox_drainer(
+            AsyncSessionLocal,
+            interval_seconds=settings.WEBHOOK_INBOX_POLL_INTERVAL_SECONDS,
+            batch_size=settings.WEBHOOK_INBOX_BATCH_SIZE,
+            concurrency=settings.WEBHOOK_INBOX_CONCURRENCY,
+            lease_seconds=settings.WEBHOOK_INBOX_LEASE_SECONDS,
+            max_attempts=settings.WEBHOOK_INBOX_MAX_ATTEMPTS,
+        )
+    )
+    rate_limit_pruner = asyncio.create_task(
+        run_rate_limit_pruner(
+            rate_limiter, interval_seconds=settings.RATE_LIMIT_PRUNE_INTERVAL_SECONDS
+        )
+    )
+
+    ready_seconds = time.perf_counter() - started
+    app_startup_seconds.labels("total").set(ready_seconds)
+    logger.info("Ready in %.0f ms", ready_seconds * 1000)
 
     yield
     logger.info("Shutting down template backend")
+    for background_task in (prize_pool_folder, webhook_inbox_drainer, rate_limit_pruner):
+        background_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await background_task
+    password_hasher.shutdown()
+    await mollie_client.close()
+    await engine.dispose()
+    mark_worker_stopped()
+
+
+async def prepare_database(database_engine: AsyncEngine) -> list[str]:
+    """Apply changed schema files and seed static rows under a Postgres advisory lock.
+
+    Workers and replicas booting together queue on the lock instead of racing on DDL.
+    The first one applies any changed files; the rest find every checksum current and
+    every seed row present, so they only pay a few reads. Returns the applied files.
+    """
+
+    started = time.perf_counter()
+    async with database_engine.connect() as conn:
+        await conn.execute(_PREPARE_DATABASE_LOCK_SQL)
+        await conn.commit()
+        locked = time.perf_counter()
+        try:
+            async with AsyncSession(bind=conn, expire_on_commit=False) as db:
+                applied_files = await init_db_schema(db)
+                schema_ready = time.perf_counter()
+                await seed_timezones(db)
+                await seed_challenges(db)
+        finally:
+            await conn.execute(_PREPARE_DATABASE_UNLOCK_SQL)
+            await conn.commit()
+    seeded = time.perf_counter()
+
+    app_startup_seconds.labels("lock_wait").set(locked - started)
+    app_startup_seconds.labels("schema").set(schema_ready - locked)
+    app_startup_seconds.labels("seed").set(seeded - schema_ready)
+    logger.info(
+        "Database ready: waited %.0f ms for the init lock, schema %.0f ms "
+        "(%d of %d files applied), seeding %.0f ms",
+        (locked - started) * 1000,
+        (schema_ready - locked) * 1000,
+        len(applied_files),
+        len(DB_INIT_ORDER),
+        (seeded - schema_ready) * 1000,
+    )
+    return applied_files
 
 
 async def seed_timezones(db: AsyncSession) -> None:
     """Seed stable timezone rows used by example user records."""
 
     now = pendulum.now("UTC").naive()
-    for timezone_enum in TimezoneEnum:
-        result = await db.execute(
-            select(Timezone).where(Timezone.timezone_id == int(timezone_enum.value))
-        )
-        existing_timezone = result.scalars().first()
-        if existing_timezone is not None:
-            continue
-        db.add(
-            Timezone(
-                timezone_id=int(timezone_enum.value),
-                timezone_name=timezone_enum.timezone_name,
-                created_at=now,
-            )
+    await db.execute(
+        insert(Timezone)
+        .values(
+            [
+                {
+                    "timezone_id": int(timezone_enum.value),
+                    "timezone_name": timezone_enum.timezone_name,
+                    "created_at": now,
+                }
+                for timezone_enum in TimezoneEnum
+            ]
         )
+        .on_conflict_do_nothing(index_elements=[Timezone.timezone_id])
+    )
     await db.commit()
 
 
 async def seed_challenges(db: AsyncSession) -> None:
-    """Seed static challenge rows with stable identifiers."""
+    """Seed static challenge rows with stable identifiers, leaving existing rows untouched."""
 
     now = pendulum.now("UTC").naive()
-    for seed_challenge in SEED_CHALLENGES:
-        result = await db.execute(
-            select(Challenge).where(Challenge.challenge_id == seed_challenge.challenge_id)
-        )
-        existing_challenge = result.scalars().first()
-        if existing_challenge is not None:
-            continue
-
-        db.add(
-            Challenge(
-                challenge_id=seed_challenge.challenge_id,
-                title=seed_challenge.title,
-                description=seed_challenge.description,
-                difficulty=seed_challenge.difficulty.value,
-                secret=seed_challenge.secret,
-                cost_per_attempt_cents=seed_challenge.cost_per_attempt_cents,
-                attack_cost_credits=seed_challenge.attack_cost_credits,
-                prize_pool_cents=seed_challenge.prize_pool_cents,
-                is_active=seed_challenge.is_active,
-                created_at=now,
-                updated_at=now,
-            )
+    await db.execute(
+        insert(Challenge)
+        .values(
+            [
+                {
+                    "challenge_id": seed_challenge.challenge_id,
+                    "title": seed_challenge.title,
+                    "description": seed_challenge.description,
+                    "difficulty": seed_challenge.difficulty.value,
+                    "secret": seed_challenge.secret,
+                    "cost_per_attempt_cents": seed_challenge.cost_per_attempt_cents,
+                    "attack_cost_credits": seed_challenge.attack_cost_credits,
+                    "prize_pool_cents": seed_challenge.prize_pool_cents,
+                    "is_active": seed_challenge.is_active,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for seed_challenge in SEED_CHALLENGES
+            ]
         )
+        .on_conflict_do_nothing(index_elements=[Challenge.challenge_id])
+    )
     await db.commit()
 
 
@@ -102,8 +197,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    QueryBudgetMiddleware,
+    max_queries=settings.DB_REQUEST_QUERY_BUDGET,
+    max_repeats=settings.DB_REQUEST_REPEATED_QUERY_LIMIT,
+    expose_headers=settings.DEBUG,
+)
+app.add_middleware(PrometheusMiddleware)
+register_process_collector(
+    RuntimeStatsCollector(
+        db_pool_stats=lambda: db_pool_monitor.snapshot(engine.pool),
+        bot_pool_stats=bot_pool.snapshot,
+        password_hasher_stats=password_hasher.snapshot,
+    )
+)
 
 app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(users.router)
 app.include_router(auth.router)
 app.include_router(challenges.router)
@@ -0,0 +1,137 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics import (
+    db_queries_total,
+    db_query_seconds_total,
+    http_request_db_queries,
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+    route_label,
+)
+from app.services.query_tracking import QueryStats, track_queries
+
+logger = logging.getLogger(__name__)
+
+
+class PrometheusMiddleware:
+    """Record request counts, latency and per-route query totals for every HTTP request.
+
+    This is a plain ASGI middleware rather than `BaseHTTPMiddleware`, so it adds no
+    extra task or body buffering to streaming responses. Route labels are read from
+    the matched route after the request is handled.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - started
+                http_requests_in_flight.dec()
+                _record_request(scope, status_code, elapsed, stats)
+
+
+def _record_request(scope: Scope, status_code: int, elapsed: float, stats: QueryStats) -> None:
+    """Observe one finished request under its route template."""
+
+    method = scope["method"]
+    route = route_label(scope)
+    http_requests_total.labels(method, route, str(status_code)).inc()
+    http_request_duration_seconds.labels(method, route).observe(elapsed)
+    http_request_db_queries.labels(route).observe(stats.count)
+    if stats.count:
+        db_queries_total.labels(route).inc(stats.count)
+        db_query_seconds_total.labels(route).inc(stats.seconds)
+
+
+class QueryBudgetMiddleware:
+    """Log each request's statement count and DB time, and warn about likely N+1 patterns.
+
+    A request warns when it runs more than `max_queries` statements in total, or the
+    same statement `max_repeats` times or more. With `expose_headers` (debug mode) the
+    count and DB time are also sent as `X-DB-Query-Count` and `Server-Timing` headers,
+    covering the statements run before the response started.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        max_queries: int,
+        max_repeats: int,
+        expose_headers: bool,
+    ) -> None:
+        self.app = app
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_headers(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers.append("Server-Timing", f"db;dur={stats.seconds * 1000:.2f}")
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers if self.expose_headers else send)
+            self._log(scope, stats)
+
+    def _log(self, scope: Scope, stats: QueryStats) -> None:
+        route = route_label(scope)
+        method = scope["method"]
+        most_repeated = stats.most_repeated()
+        if most_repeated is not None and most_repeated[1] >= self.max_repeats:
+            statement, repeats = most_repeated
+            logger.warning(
+                "Possible N+1 on %s %s: statement ran %d times: %s",
+                method,
+                route,
+                repeats,
+                " ".join(statement.split())[:200],
+            )
+        if stats.count > self.max_queries:
+            logger.warning(
+                "%s %s ran %d statements (budget %d) in %.1f ms",
+                method,
+                route,
+                stats.count,
+                self.max_queries,
+                stats.seconds * 1000,
+            )
+        else:
+            logger.debug(
+                "%s %s ran %d statements in %.1f ms",
+                method,
+                route,
+                stats.count,
+                stats.seconds * 1000,
+            )
@@ -5,7 +5,10 @@ from app.models.credit_purchases import CreditPurchase
 from app.models.credit_transactions import CreditTransaction
 from app.models.credit_wallets import CreditWallet
 from app.models.messages import Message
+from app.models.mollie_webhook_inbox import MollieWebhookInboxEntry
 from app.models.payments import Payment
+from app.models.prize_pool_contributions import PrizePoolContribution
+from app.models.rate_limit_buckets import RateLimitBucket
 from app.models.timezones import Timezone
 from app.models.users import User
 
@@ -17,7 +20,10 @@ __all__ = [
     "CreditTransaction",
     "CreditWallet",
     "Message",
+    "MollieWebhookInboxEntry",
     "Payment",
+    "PrizePoolContribution",
+    "RateLimitBucket",
     "Timezone",
     "User",
 ]
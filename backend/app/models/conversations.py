@@ -22,5 +22,6 @@ class Conversation(Base):
         ForeignKey("challenges.challenge_id"),
         nullable=False,
     )
+    message_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
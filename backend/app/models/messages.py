@@ -21,6 +21,7 @@ class Message(Base):
         ForeignKey("conversations.conversation_id"),
         nullable=False,
     )
+    conversation_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
     role: Mapped[str] = mapped_column(Text, nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     is_secret_exposure: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
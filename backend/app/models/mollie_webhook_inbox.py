@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class MollieWebhookInboxEntry(Base):
+    """Pending Mollie webhook notification, coalesced per source and payment id."""
+
+    __tablename__ = "mollie_webhook_inbox"
+
+    source: Mapped[str] = mapped_column(Text, primary_key=True)
+    mollie_payment_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    notification_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    received_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
+    last_received_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
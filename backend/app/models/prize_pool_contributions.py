@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Sequence
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class PrizePoolContribution(Base):
+    """Pending prize pool growth that has not been folded into its challenge yet."""
+
+    __tablename__ = "prize_pool_contributions"
+
+    prize_pool_contribution_id: Mapped[int] = mapped_column(
+        BigInteger,
+        Sequence("prize_pool_contribution_id_seq"),
+        primary_key=True,
+    )
+    challenge_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("challenges.challenge_id"),
+        nullable=False,
+    )
+    amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Double, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class RateLimitBucket(Base):
+    """Shared token bucket for one rate limit policy and caller identity."""
+
+    __tablename__ = "rate_limit_buckets"
+
+    bucket_key: Mapped[str] = mapped_column(Text, primary_key=True)
+    tokens: Mapped[float] = mapped_column(Double, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
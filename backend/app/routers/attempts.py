@@ -1,5 +1,6 @@
 import pendulum
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -8,17 +9,18 @@ from app.dependencies import get_current_user
 from app.models.attempts import Attempt
 from app.models.challenges import Challenge
 from app.models.payments import Payment
-from app.models.users import User
-from app.routers.helpers import get_next_sequence_value
+from app.routers.helpers import get_next_sequence_value, json_model_response
 from app.schemas import AttemptRead, AttemptResponse, SecretSubmitRequest
+from app.services.user_cache import AuthenticatedUser
 
 router = APIRouter(prefix="/attempts", tags=["attempts"])
+_ATTEMPT_LIST_ADAPTER = TypeAdapter(list[AttemptRead])
 
 
 @router.post("", response_model=AttemptResponse, status_code=201)
 async def submit_secret(
     payload: SecretSubmitRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> AttemptResponse:
     """Submit a paid secret guess for a challenge."""
@@ -78,15 +80,14 @@ async def submit_secret(
 @router.get("", response_model=list[AttemptRead])
 async def list_attempts(
     challenge_id: int | None = None,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> list[AttemptRead]:
-    """List authenticated user attempts with optional challenge filtering."""
+) -> Response:
+    """List authenticated user attempts with optional challenge filtering, newest first."""
 
     query = select(Attempt).where(Attempt.user_id == current_user.user_id)
     if challenge_id is not None:
         query = query.where(Attempt.challenge_id == challenge_id)
 
-    result = await db.execute(query.order_by(Attempt.attempt_id.desc()))
-    attempts = result.scalars().all()
-    return [AttemptRead.model_validate(attempt) for attempt in attempts]
+    result = await db.execute(query.order_by(Attempt.created_at.desc(), Attempt.attempt_id.desc()))
+    return json_model_response(_ATTEMPT_LIST_ADAPTER, result.scalars().all())
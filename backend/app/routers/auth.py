@@ -8,24 +8,46 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import enforce_rate_limit, get_current_user, rate_limit
 from app.models.credit_wallets import CreditWallet
 from app.models.users import User
 from app.routers.helpers import get_next_sequence_value
 from app.schemas import LoginRequest, RegisterRequest, TokenResponse, UserMeResponse
-from app.services.auth import create_access_token, hash_password, verify_password
+from app.services.auth import create_access_token
+from app.services.password_hasher import PasswordHasherBusyError, password_hasher
+from app.services.user_cache import AuthenticatedUser
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 logger = logging.getLogger(__name__)
 
 
-@router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
+def _password_hasher_busy_error() -> HTTPException:
+    """Map a full password hashing queue to a retryable HTTP error."""
+
+    return HTTPException(
+        status_code=503,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+@router.post(
+    "/register",
+    response_model=TokenResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit(ip_policy="register_ip"))],
+)
 async def register(
     payload: RegisterRequest,
     db: AsyncSession = Depends(get_db),
 ) -> TokenResponse:
     """Create a local user account and return a bearer token."""
 
+    # Hash before touching the database so no pooled connection waits on bcrypt.
+    try:
+        password_hash = await password_hasher.hash(payload.password)
+    except PasswordHasherBusyError as exc:
+        raise _password_hasher_busy_error() from exc
     existing_result = await db.execute(select(User.user_id).where(User.email == payload.email))
     if existing_result.scalar_one_or_none() is not None:
         raise HTTPException(status_code=409, detail="Email already registered")
@@ -36,7 +58,7 @@ async def register(
         reference=uuid.uuid4(),
         timezone_id=1,
         email=payload.email,
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
         created_at=now,
         updated_at=now,
     )
@@ -63,16 +85,33 @@ async def register(
     return TokenResponse(access_token=access_token)
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit(ip_policy="login_ip"))],
+)
 async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)) -> TokenResponse:
-    """Authenticate a user using email/password credentials."""
+    """Authenticate a user using email/password credentials.
+
+    Attempts are limited per client IP and per email, so rotating IPs cannot
+    brute-force one account without limit.
+    """
 
-    result = await db.execute(select(User).where(User.email == payload.email))
-    user = result.scalars().first()
+    await enforce_rate_limit("login_email", payload.email)
+    result = await db.execute(
+        select(User.user_id, User.password_hash).where(User.email == payload.email)
+    )
+    user = result.first()
+    # End the read-only transaction so the connection returns to the pool while bcrypt runs.
+    await db.commit()
     if user is None or user.password_hash is None:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    if not verify_password(payload.password, user.password_hash):
+    try:
+        is_valid_password = await password_hasher.verify(payload.password, user.password_hash)
+    except PasswordHasherBusyError as exc:
+        raise _password_hasher_busy_error() from exc
+    if not is_valid_password:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     return TokenResponse(
@@ -81,7 +120,7 @@ async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)) -> To
 
 
 @router.get("/me", response_model=UserMeResponse)
-async def me(current_user: User = Depends(get_current_user)) -> UserMeResponse:
+async def me(current_user: AuthenticatedUser = Depends(get_current_user)) -> UserMeResponse:
     """Return the authenticated user profile."""
 
     return UserMeResponse.model_validate(current_user)
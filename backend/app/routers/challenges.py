@@ -1,29 +1,64 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+
 import pendulum
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import ColumnElement, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.dependencies import get_current_user
-from app.models.challenges import Challenge
+from app.dependencies import get_bot_provider, get_current_user, rate_limit
 from app.models.conversations import Conversation
-from app.models.credit_transactions import CreditTransaction
 from app.models.messages import Message
-from app.models.users import User
-from app.routers.helpers import get_next_sequence_value
+from app.routers.helpers import (
+    PRIVATE_REVALIDATE_CACHE_CONTROL,
+    PUBLIC_REVALIDATE_CACHE_CONTROL,
+    clamp_page_limit,
+    decode_created_at_cursor,
+    decode_page_cursor,
+    encode_created_at_cursor,
+    encode_page_cursor,
+    get_next_sequence_value,
+    json_model_response,
+    not_modified_response,
+    weak_etag,
+)
 from app.schemas import (
     ChallengeDetail,
     ChallengeListItem,
+    ConversationPage,
     ConversationRead,
     MessageCreate,
+    MessagePage,
     MessageRead,
+    MessageStreamError,
+    MessageStreamStart,
+    MessageStreamToken,
     SendMessageResponse,
 )
-from app.services.credits import get_or_create_wallet_for_update
-from app.services.mock_bot import get_mock_reply
-from app.static_data.economy import CENTS_PER_CREDIT
+from app.services.attack_messages import (
+    AttackCharge,
+    add_assistant_message,
+    charge_attack_message,
+    refund_attack_message,
+)
+from app.services.bot_pool import BotCallTimeoutError, BotPoolFullError, bot_pool
+from app.services.bot_provider import BotProvider, reply_exposes_secret
+from app.services.challenge_catalog import challenge_catalog
+from app.services.metrics import record_attack, record_secret_exposure
+from app.services.user_cache import AuthenticatedUser
 
 router = APIRouter(tags=["challenges"])
+# Shared by the plain and streaming send routes, so both spend from the same buckets.
+_send_message_rate_limit = Depends(
+    rate_limit(ip_policy="send_message_ip", user_policy="send_message_user")
+)
+_CHALLENGE_LIST_ADAPTER = TypeAdapter(list[ChallengeListItem])
+_CONVERSATION_PAGE_ADAPTER = TypeAdapter(ConversationPage)
+_MESSAGE_PAGE_ADAPTER = TypeAdapter(MessagePage)
+_BOT_REPLY_FAILED_DETAIL = "Bot reply failed, your credits were refunded"
 
 
 async def _get_owned_conversation(
@@ -45,31 +80,70 @@ async def _get_owned_conversation(
     return conversation
 
 
-@router.get("/challenges", response_model=list[ChallengeListItem])
-async def list_challenges(db: AsyncSession = Depends(get_db)) -> list[ChallengeListItem]:
-    """Return active challenges for public browsing."""
+async def _get_owned_conversation_message_count(
+    db: AsyncSession,
+    conversation_id: int,
+    user_id: int,
+) -> int:
+    """Check conversation ownership and return how many messages it holds in one query."""
 
     result = await db.execute(
-        select(Challenge).where(Challenge.is_active.is_(True)).order_by(Challenge.challenge_id.asc())
+        select(Conversation.message_count).where(
+            Conversation.conversation_id == conversation_id,
+            Conversation.user_id == user_id,
+        )
     )
-    challenges = result.scalars().all()
-    return [ChallengeListItem.model_validate(challenge) for challenge in challenges]
+    message_count = result.scalar_one_or_none()
+    if message_count is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return int(message_count)
 
 
-@router.get("/challenges/{challenge_id}", response_model=ChallengeDetail)
-async def get_challenge(challenge_id: int, db: AsyncSession = Depends(get_db)) -> ChallengeDetail:
-    """Return one active challenge by id."""
+def _message_conversation_seq(conversation_id: int, message_id: int) -> ColumnElement[int]:
+    """Return a subquery for a message's position; unknown ids compare as NULL."""
 
-    result = await db.execute(
-        select(Challenge).where(
-            Challenge.challenge_id == challenge_id,
-            Challenge.is_active.is_(True),
-        )
+    return (
+        select(Message.conversation_seq)
+        .where(Message.conversation_id == conversation_id, Message.message_id == message_id)
+        .scalar_subquery()
     )
-    challenge = result.scalars().first()
-    if challenge is None:
+
+
+@router.get("/challenges", response_model=list[ChallengeListItem])
+async def list_challenges(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Return active challenges for public browsing from the catalog cache."""
+
+    entries = await challenge_catalog.list_entries(db)
+    etag = weak_etag("challenges", challenge_catalog.catalog_version)
+    not_modified = not_modified_response(request, response, etag, PUBLIC_REVALIDATE_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    return json_model_response(
+        _CHALLENGE_LIST_ADAPTER, [entry.list_item for entry in entries], response
+    )
+
+
+@router.get("/challenges/{challenge_id}", response_model=ChallengeDetail)
+async def get_challenge(
+    challenge_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+) -> ChallengeDetail | Response:
+    """Return one active challenge by id from the catalog cache."""
+
+    entry = await challenge_catalog.get_entry(db, challenge_id)
+    if entry is None:
         raise HTTPException(status_code=404, detail="Challenge not found")
-    return ChallengeDetail.model_validate(challenge)
+    etag = weak_etag("challenge", challenge_id, entry.version)
+    not_modified = not_modified_response(request, response, etag, PUBLIC_REVALIDATE_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    return entry.detail
 
 
 @router.post(
@@ -79,18 +153,12 @@ async def get_challenge(challenge_id: int, db: AsyncSession = Depends(get_db)) -
 )
 async def create_conversation(
     challenge_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> ConversationRead:
     """Create an authenticated conversation for a challenge."""
 
-    challenge_result = await db.execute(
-        select(Challenge.challenge_id).where(
-            Challenge.challenge_id == challenge_id,
-            Challenge.is_active.is_(True),
-        )
-    )
-    if challenge_result.scalar_one_or_none() is None:
+    if await challenge_catalog.get_entry(db, challenge_id) is None:
         raise HTTPException(status_code=404, detail="Challenge not found")
 
     now = pendulum.now("UTC").naive()
@@ -106,126 +174,375 @@ async def create_conversation(
     return ConversationRead.model_validate(conversation)
 
 
-@router.get("/challenges/{challenge_id}/conversations", response_model=list[ConversationRead])
+@router.get("/challenges/{challenge_id}/conversations", response_model=ConversationPage)
 async def list_user_conversations(
     challenge_id: int,
-    current_user: User = Depends(get_current_user),
+    before_conversation_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> list[ConversationRead]:
-    """List authenticated user conversations for one challenge."""
+) -> Response:
+    """List authenticated user conversations for one challenge, newest first.
+
+    Block-allocated conversation ids do not follow creation order across workers, so
+    conversations are ordered by `(created_at, conversation_id)` and cursors carry
+    both. A bare `before_conversation_id` is resolved to that conversation's position.
+    """
+
+    safe_limit = clamp_page_limit(limit)
+    query = select(Conversation).where(
+        Conversation.user_id == current_user.user_id,
+        Conversation.challenge_id == challenge_id,
+    )
+    position = tuple_(Conversation.created_at, Conversation.conversation_id)
+    if cursor is not None:
+        _, before_created_at, before_id = decode_created_at_cursor(cursor)
+        query = query.where(position < tuple_(literal(before_created_at), literal(before_id)))
+    elif before_conversation_id is not None:
+        boundary_created_at = (
+            select(Conversation.created_at)
+            .where(Conversation.conversation_id == before_conversation_id)
+            .scalar_subquery()
+        )
+        query = query.where(position < tuple_(boundary_created_at, literal(before_conversation_id)))
 
     result = await db.execute(
-        select(Conversation)
-        .where(
-            Conversation.user_id == current_user.user_id,
-            Conversation.challenge_id == challenge_id,
+        query.order_by(Conversation.created_at.desc(), Conversation.conversation_id.desc()).limit(
+            safe_limit + 1
+        )
+    )
+    conversations = list(result.scalars().all())
+    has_more = len(conversations) > safe_limit
+    conversations = conversations[:safe_limit]
+    next_cursor = (
+        encode_created_at_cursor(
+            "before", conversations[-1].created_at, conversations[-1].conversation_id
         )
-        .order_by(Conversation.conversation_id.desc())
+        if has_more
+        else None
+    )
+    return json_model_response(
+        _CONVERSATION_PAGE_ADAPTER, {"items": conversations, "next_cursor": next_cursor}
     )
-    conversations = result.scalars().all()
-    return [ConversationRead.model_validate(conversation) for conversation in conversations]
 
 
-@router.get("/conversations/{conversation_id}/messages", response_model=list[MessageRead])
+@router.get("/conversations/{conversation_id}/messages", response_model=MessagePage)
 async def get_conversation_messages(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    after_message_id: int | None = None,
+    before_message_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> list[MessageRead]:
-    """List messages for an owned conversation."""
+) -> Response:
+    """List messages for an owned conversation using keyset pagination.
+
+    `after_message_id` pages forward and lets pollers fetch only messages newer than
+    the last id they saw; `before_message_id` pages backward through older history.
+    Both are resolved to the message's `conversation_seq`, which follows insertion
+    order where block-allocated message ids do not, and cursors carry that position
+    directly. Items are always returned in ascending position order. Messages are
+    append-only and each one bumps the conversation's `message_count` in its own
+    transaction, so that count versions every page and is checked before the page is
+    loaded.
+    """
+
+    if cursor is None and after_message_id is not None and before_message_id is not None:
+        raise HTTPException(
+            status_code=400,
+            detail="Use either after_message_id or before_message_id, not both",
+        )
 
-    await _get_owned_conversation(db, conversation_id, current_user.user_id)
-    result = await db.execute(
-        select(Message)
-        .where(Message.conversation_id == conversation_id)
-        .order_by(Message.message_id.asc())
+    safe_limit = clamp_page_limit(limit)
+    message_count = await _get_owned_conversation_message_count(
+        db, conversation_id, current_user.user_id
+    )
+    etag = weak_etag(
+        "messages",
+        conversation_id,
+        message_count,
+        cursor,
+        after_message_id,
+        before_message_id,
+        safe_limit,
+    )
+    not_modified = not_modified_response(request, response, etag, PRIVATE_REVALIDATE_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+
+    after_seq: int | ColumnElement[int] | None = None
+    before_seq: int | ColumnElement[int] | None = None
+    if cursor is not None:
+        direction, boundary_seq = decode_page_cursor(cursor)
+        after_seq = boundary_seq if direction == "after" else None
+        before_seq = boundary_seq if direction == "before" else None
+    elif after_message_id is not None:
+        after_seq = _message_conversation_seq(conversation_id, after_message_id)
+    elif before_message_id is not None:
+        before_seq = _message_conversation_seq(conversation_id, before_message_id)
+
+    query = select(Message).where(Message.conversation_id == conversation_id)
+
+    if before_seq is not None:
+        result = await db.execute(
+            query.where(Message.conversation_seq < before_seq)
+            .order_by(Message.conversation_seq.desc())
+            .limit(safe_limit + 1)
+        )
+        messages = list(result.scalars().all())
+        has_more = len(messages) > safe_limit
+        messages = messages[:safe_limit][::-1]
+        next_cursor = (
+            encode_page_cursor("before", messages[0].conversation_seq) if has_more else None
+        )
+    else:
+        if after_seq is not None:
+            query = query.where(Message.conversation_seq > after_seq)
+        result = await db.execute(
+            query.order_by(Message.conversation_seq.asc()).limit(safe_limit + 1)
+        )
+        messages = list(result.scalars().all())
+        has_more = len(messages) > safe_limit
+        messages = messages[:safe_limit]
+        next_cursor = (
+            encode_page_cursor("after", messages[-1].conversation_seq) if has_more else None
+        )
+
+    return json_model_response(
+        _MESSAGE_PAGE_ADAPTER, {"items": messages, "next_cursor": next_cursor}, response
     )
-    messages = result.scalars().all()
-    return [MessageRead.model_validate(message) for message in messages]
+
+
+async def _charge_attack_or_raise(
+    db: AsyncSession,
+    conversation_id: int,
+    user_id: int,
+    content: str,
+    now: datetime,
+) -> AttackCharge:
+    """Charge an attack message and map failed charges to HTTP errors."""
+
+    charge = await charge_attack_message(
+        db,
+        conversation_id=conversation_id,
+        user_id=user_id,
+        content=content,
+        now=now,
+    )
+    if not charge.conversation_found:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    if charge.challenge_secret is None:
+        raise HTTPException(status_code=404, detail="Challenge not found")
+    if not charge.is_charged:
+        raise HTTPException(
+            status_code=402,
+            detail="Insufficient credits to perform attack message",
+        )
+    return charge
+
+
+def _charged_user_message(
+    charge: AttackCharge,
+    conversation_id: int,
+    content: str,
+    now: datetime,
+) -> MessageRead:
+    """Build the response payload for the user message stored by the charge."""
+
+    return MessageRead(
+        message_id=charge.user_message_id,
+        conversation_id=conversation_id,
+        role="user",
+        content=content,
+        is_secret_exposure=False,
+        created_at=now,
+    )
+
+
+def _bot_unavailable_error(exc: BotPoolFullError | BotCallTimeoutError) -> HTTPException:
+    """Map bot pool backpressure and timeouts to retryable HTTP errors."""
+
+    if isinstance(exc, BotCallTimeoutError):
+        return HTTPException(status_code=504, detail="Bot reply timed out")
+    return HTTPException(
+        status_code=503,
+        detail="Bot is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _record_committed_charge(charge: AttackCharge) -> None:
+    """Mark cached prize pools stale after a committed attack and count it."""
+
+    if charge.challenge_id is not None:
+        challenge_catalog.invalidate_prize_pools()
+        record_attack(charge.challenge_id, charge.credits_charged)
+
+
+def _sse_event(event: str, payload: BaseModel) -> str:
+    """Format one Server-Sent Events frame with a JSON data line."""
+
+    return f"event: {event}\ndata: {payload.model_dump_json()}\n\n"
 
 
 @router.post(
     "/conversations/{conversation_id}/messages",
     response_model=SendMessageResponse,
     status_code=201,
+    dependencies=[_send_message_rate_limit],
 )
 async def send_message(
     conversation_id: int,
     payload: MessageCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    bot_provider: BotProvider = Depends(get_bot_provider),
 ) -> SendMessageResponse:
-    """Create a user message while charging credits and updating challenge bounty."""
-
-    conversation = await _get_owned_conversation(db, conversation_id, current_user.user_id)
-    challenge_result = await db.execute(
-        select(Challenge)
-        .where(
-            Challenge.challenge_id == conversation.challenge_id,
-            Challenge.is_active.is_(True),
-        )
-        .with_for_update()
-    )
-    challenge = challenge_result.scalars().first()
-    if challenge is None:
-        raise HTTPException(status_code=404, detail="Challenge not found")
+    """Create a user message while charging credits and updating challenge bounty.
 
-    wallet = await get_or_create_wallet_for_update(db, current_user.user_id)
-    credits_charged = challenge.attack_cost_credits
-    if wallet.balance_credits < credits_charged:
-        raise HTTPException(
-            status_code=402,
-            detail="Insufficient credits to perform attack message",
-        )
+    The charge commits before the bot is called, so no wallet row lock or pooled
+    connection is held while the reply is generated. A failed bot call refunds it.
+    """
+
+    try:
+        bot_pool.ensure_capacity()
+    except BotPoolFullError as exc:
+        raise _bot_unavailable_error(exc) from exc
 
     now = pendulum.now("UTC").naive()
-    wallet.balance_credits -= credits_charged
-    wallet.updated_at = now
-
-    db.add(
-        CreditTransaction(
-            credit_transaction_id=await get_next_sequence_value(db, "credit_transaction_id_seq"),
-            user_id=current_user.user_id,
-            challenge_id=challenge.challenge_id,
-            credit_purchase_id=None,
-            delta_credits=-credits_charged,
-            transaction_type="attack_spend",
-            created_at=now,
-        )
+    charge = await _charge_attack_or_raise(
+        db, conversation_id, current_user.user_id, payload.content, now
     )
+    await db.commit()
+    secret = charge.challenge_secret or ""
 
-    challenge.prize_pool_cents += credits_charged * CENTS_PER_CREDIT
-    challenge.updated_at = now
+    try:
+        bot_reply = await bot_pool.run(lambda: bot_provider.generate_reply(secret))
+    except Exception as exc:
+        await refund_attack_message(
+            db, charge, user_id=current_user.user_id, now=pendulum.now("UTC").naive()
+        )
+        await db.commit()
+        if isinstance(exc, BotPoolFullError | BotCallTimeoutError):
+            raise _bot_unavailable_error(exc) from exc
+        raise
 
-    user_message = Message(
-        message_id=await get_next_sequence_value(db, "message_id_seq"),
+    bot_message = await add_assistant_message(
+        db,
         conversation_id=conversation_id,
-        role="user",
-        content=payload.content,
-        is_secret_exposure=False,
-        created_at=now,
+        content=bot_reply.content,
+        is_secret_exposure=bot_reply.did_expose_secret,
+        now=now,
     )
-    db.add(user_message)
+    await db.commit()
+    _record_committed_charge(charge)
+    if bot_reply.did_expose_secret and charge.challenge_id is not None:
+        record_secret_exposure(charge.challenge_id)
 
-    mock_reply = get_mock_reply(challenge.secret)
-    bot_message = Message(
-        message_id=await get_next_sequence_value(db, "message_id_seq"),
-        conversation_id=conversation_id,
-        role="assistant",
-        content=mock_reply.content,
-        is_secret_exposure=mock_reply.did_expose_secret,
-        created_at=now,
+    return SendMessageResponse(
+        user_message=_charged_user_message(charge, conversation_id, payload.content, now),
+        bot_message=MessageRead.model_validate(bot_message),
+        did_expose_secret=bot_reply.did_expose_secret,
+        credits_charged=charge.credits_charged,
+        remaining_credits=charge.remaining_credits,
+        updated_prize_pool_cents=charge.updated_prize_pool_cents,
     )
-    db.add(bot_message)
 
-    conversation.updated_at = now
+
+@router.post(
+    "/conversations/{conversation_id}/messages/stream",
+    dependencies=[_send_message_rate_limit],
+)
+async def stream_message(
+    conversation_id: int,
+    payload: MessageCreate,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    bot_provider: BotProvider = Depends(get_bot_provider),
+) -> StreamingResponse:
+    """Charge and store the user message, then stream the assistant reply over SSE.
+
+    The charge commits before streaming starts, so no transaction or row lock is held
+    while tokens are generated. The assistant message is persisted once the stream
+    completes and the final `done` event carries the full send-message payload. A bot
+    failure after the charge refunds it and ends the stream with an `error` event.
+    """
+
+    try:
+        bot_pool.ensure_capacity()
+    except BotPoolFullError as exc:
+        raise _bot_unavailable_error(exc) from exc
+
+    now = pendulum.now("UTC").naive()
+    charge = await _charge_attack_or_raise(
+        db, conversation_id, current_user.user_id, payload.content, now
+    )
     await db.commit()
 
-    return SendMessageResponse(
-        user_message=MessageRead.model_validate(user_message),
-        bot_message=MessageRead.model_validate(bot_message),
-        did_expose_secret=mock_reply.did_expose_secret,
-        credits_charged=credits_charged,
-        remaining_credits=wallet.balance_credits,
-        updated_prize_pool_cents=challenge.prize_pool_cents,
+    user_message = _charged_user_message(charge, conversation_id, payload.content, now)
+    secret = charge.challenge_secret or ""
+
+    async def _event_stream() -> AsyncIterator[str]:
+        yield _sse_event(
+            "start",
+            MessageStreamStart(
+                user_message=user_message,
+                credits_charged=charge.credits_charged,
+                remaining_credits=charge.remaining_credits,
+                updated_prize_pool_cents=charge.updated_prize_pool_cents,
+            ),
+        )
+
+        reply_tokens: list[str] = []
+        try:
+            async for token in bot_pool.stream(bot_provider.stream_reply(secret)):
+                reply_tokens.append(token)
+                yield _sse_event("token", MessageStreamToken(token=token))
+        except Exception as exc:
+            await refund_attack_message(
+                db, charge, user_id=current_user.user_id, now=pendulum.now("UTC").naive()
+            )
+            await db.commit()
+            detail = (
+                str(_bot_unavailable_error(exc).detail)
+                if isinstance(exc, BotPoolFullError | BotCallTimeoutError)
+                else _BOT_REPLY_FAILED_DETAIL
+            )
+            yield _sse_event("error", MessageStreamError(detail=detail))
+            return
+
+        reply_content = "".join(reply_tokens)
+        did_expose_secret = reply_exposes_secret(reply_content, secret)
+        bot_message = await add_assistant_message(
+            db,
+            conversation_id=conversation_id,
+            content=reply_content,
+            is_secret_exposure=did_expose_secret,
+            now=pendulum.now("UTC").naive(),
+        )
+        await db.commit()
+        _record_committed_charge(charge)
+        if did_expose_secret and charge.challenge_id is not None:
+            record_secret_exposure(charge.challenge_id)
+
+        yield _sse_event(
+            "done",
+            SendMessageResponse(
+                user_message=user_message,
+                bot_message=MessageRead.model_validate(bot_message),
+                did_expose_secret=did_expose_secret,
+                credits_charged=charge.credits_charged,
+                remaining_credits=charge.remaining_credits,
+                updated_prize_pool_cents=charge.updated_prize_pool_cents,
+            ),
+        )
+
+    return StreamingResponse(
+        _event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
@@ -1,7 +1,5 @@
-from urllib.parse import parse_qs
-
 import pendulum
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,18 +8,23 @@ from app.config import settings
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.models.credit_purchases import CreditPurchase
-from app.models.credit_transactions import CreditTransaction
 from app.models.credit_wallets import CreditWallet
-from app.models.users import User
-from app.routers.helpers import get_next_sequence_value
+from app.routers.helpers import (
+    PRIVATE_REVALIDATE_CACHE_CONTROL,
+    get_next_sequence_value,
+    not_modified_response,
+    read_mollie_webhook_payment_id,
+    weak_etag,
+)
 from app.schemas import (
     CreditBalanceResponse,
     CreditPurchaseCreateRequest,
     CreditPurchaseCreateResponse,
     CreditPurchaseReadResponse,
 )
-from app.services.credits import get_or_create_wallet_for_update
-from app.services.mollie import create_mollie_payment, get_mollie_payment
+from app.services.mollie import create_mollie_payment
+from app.services.user_cache import AuthenticatedUser
+from app.services.webhook_inbox import WebhookSource, enqueue_webhook, notify_webhook_inbox
 from app.static_data.economy import CENTS_PER_CREDIT
 
 router = APIRouter(prefix="/credits", tags=["credits"])
@@ -30,10 +33,14 @@ router = APIRouter(prefix="/credits", tags=["credits"])
 @router.post("/purchases", response_model=CreditPurchaseCreateResponse, status_code=201)
 async def create_credit_purchase(
     payload: CreditPurchaseCreateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> CreditPurchaseCreateResponse:
-    """Create a Mollie checkout for a credit top-up purchase."""
+    """Create a Mollie checkout for a credit top-up purchase.
+
+    The pending row is committed before the provider call so no pooled connection or
+    transaction is held across the Mollie round trip.
+    """
 
     if payload.amount_cents % CENTS_PER_CREDIT != 0:
         raise HTTPException(
@@ -57,6 +64,11 @@ async def create_credit_purchase(
         updated_at=now,
     )
     db.add(purchase)
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Failed to create credit purchase") from exc
 
     redirect_base_url = settings.MOLLIE_REDIRECT_BASE_URL.rstrip("/")
     redirect_url = (
@@ -66,7 +78,7 @@ async def create_credit_purchase(
     webhook_url = f"{webhook_base_url}/credits/purchases/webhook"
 
     try:
-        mollie_result = create_mollie_payment(
+        mollie_result = await create_mollie_payment(
             amount_cents=purchase.amount_cents,
             description=f"Credit purchase #{purchase.credit_purchase_id}",
             redirect_url=redirect_url,
@@ -77,13 +89,17 @@ async def create_credit_purchase(
                 "credits_purchased": str(credits_purchased),
             },
         )
-        purchase.mollie_payment_id = mollie_result["mollie_payment_id"]
-        purchase.status = mollie_result["status"]
+    except (ValueError, RuntimeError) as exc:
+        purchase.status = "failed"
         purchase.updated_at = pendulum.now("UTC").naive()
         await db.commit()
-    except (ValueError, RuntimeError) as exc:
-        await db.rollback()
         raise HTTPException(status_code=502, detail="Payment provider unavailable") from exc
+
+    purchase.mollie_payment_id = mollie_result["mollie_payment_id"]
+    purchase.status = mollie_result["status"]
+    purchase.updated_at = pendulum.now("UTC").naive()
+    try:
+        await db.commit()
     except IntegrityError as exc:
         await db.rollback()
         raise HTTPException(status_code=409, detail="Failed to create credit purchase") from exc
@@ -102,67 +118,20 @@ async def credit_purchase_webhook(
     request: Request,
     db: AsyncSession = Depends(get_db),
 ) -> dict[str, str]:
-    """Handle Mollie purchase status callbacks and credit wallets on paid transitions."""
-
-    content_type = request.headers.get("content-type", "")
-    mollie_payment_id = ""
-    if "multipart/form-data" in content_type:
-        form = await request.form()
-        mollie_payment_id = str(form.get("id") or "")
-    else:
-        body = (await request.body()).decode("utf-8")
-        parsed = parse_qs(body)
-        mollie_payment_id = parsed.get("id", [""])[0]
-
-    if not mollie_payment_id:
-        raise HTTPException(status_code=400, detail="Missing Mollie payment id")
-
-    purchase_result = await db.execute(
-        select(CreditPurchase).where(CreditPurchase.mollie_payment_id == mollie_payment_id)
-    )
-    purchase = purchase_result.scalars().first()
-    if purchase is None:
-        return {"status": "ignored"}
-
-    try:
-        mollie_payment = get_mollie_payment(mollie_payment_id)
-    except (ValueError, RuntimeError) as exc:
-        raise HTTPException(status_code=502, detail="Payment provider unavailable") from exc
+    """Record a Mollie purchase webhook in the inbox and acknowledge it immediately."""
 
-    next_status = mollie_payment["status"]
-    if purchase.status == next_status:
-        return {"status": "ok"}
-
-    now = pendulum.now("UTC").naive()
-    if purchase.status != "paid" and next_status == "paid":
-        wallet = await get_or_create_wallet_for_update(db, purchase.user_id)
-        wallet.balance_credits += purchase.credits_purchased
-        wallet.updated_at = now
-
-        db.add(
-            CreditTransaction(
-                credit_transaction_id=await get_next_sequence_value(
-                    db, "credit_transaction_id_seq"
-                ),
-                user_id=purchase.user_id,
-                challenge_id=None,
-                credit_purchase_id=purchase.credit_purchase_id,
-                delta_credits=purchase.credits_purchased,
-                transaction_type="purchase",
-                created_at=now,
-            )
-        )
-
-    purchase.status = next_status
-    purchase.updated_at = now
+    mollie_payment_id = await read_mollie_webhook_payment_id(request)
+    if not await enqueue_webhook(db, WebhookSource.CREDIT_PURCHASE, mollie_payment_id):
+        return {"status": "ignored"}
     await db.commit()
+    notify_webhook_inbox()
     return {"status": "ok"}
 
 
 @router.get("/purchases/{credit_purchase_id}", response_model=CreditPurchaseReadResponse)
 async def get_credit_purchase(
     credit_purchase_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> CreditPurchaseReadResponse:
     """Return one credit purchase record owned by the authenticated user."""
@@ -181,15 +150,23 @@ async def get_credit_purchase(
 
 @router.get("/balance", response_model=CreditBalanceResponse)
 async def get_credit_balance(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> CreditBalanceResponse:
+) -> CreditBalanceResponse | Response:
     """Return the authenticated user's available credit balance."""
 
     result = await db.execute(
-        select(CreditWallet.balance_credits).where(CreditWallet.user_id == current_user.user_id)
+        select(CreditWallet.balance_credits, CreditWallet.updated_at).where(
+            CreditWallet.user_id == current_user.user_id
+        )
     )
-    balance_value = result.scalar_one_or_none()
-    if balance_value is None:
-        return CreditBalanceResponse(balance_credits=0)
-    return CreditBalanceResponse(balance_credits=int(balance_value))
+    wallet_row = result.first()
+    balance_credits = int(wallet_row.balance_credits) if wallet_row is not None else 0
+    wallet_version = wallet_row.updated_at if wallet_row is not None else None
+    etag = weak_etag("balance", current_user.user_id, balance_credits, wallet_version)
+    not_modified = not_modified_response(request, response, etag, PRIVATE_REVALIDATE_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    return CreditBalanceResponse(balance_credits=balance_credits)
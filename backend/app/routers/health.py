@@ -1,8 +1,14 @@
+from dataclasses import asdict
+from typing import Any
+
 from fastapi import APIRouter, Depends
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import engine, get_db
+from app.services.bot_pool import bot_pool
+from app.services.db_pool import db_pool_monitor
+from app.services.password_hasher import password_hasher
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -20,3 +26,35 @@ async def db_health(db: AsyncSession = Depends(get_db)) -> dict[str, str]:
 
     await db.execute(text("SELECT 1"))
     return {"status": "ok", "database": "connected"}
+
+
+@router.get("/db/pool")
+async def db_pool_health(db: AsyncSession = Depends(get_db)) -> dict[str, Any]:
+    """Report connection pool occupancy, checkout waits and Postgres connection headroom."""
+
+    result = await db.execute(
+        text(
+            "SELECT current_setting('max_connections')::int, "
+            "(SELECT count(*) FROM pg_stat_activity WHERE datname = current_database())"
+        )
+    )
+    server_max_connections, server_connections = result.one()
+    return {
+        **asdict(db_pool_monitor.snapshot(engine.pool)),
+        "server_max_connections": server_max_connections,
+        "server_connections": server_connections,
+    }
+
+
+@router.get("/bots")
+async def bot_pool_health() -> dict[str, int | float]:
+    """Report bot worker pool concurrency, queue depth and wait-time counters."""
+
+    return asdict(bot_pool.snapshot())
+
+
+@router.get("/auth")
+async def password_hasher_health() -> dict[str, int | float]:
+    """Report password hashing executor load and queue-wait counters."""
+
+    return asdict(password_hasher.snapshot())
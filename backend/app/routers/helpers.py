@@ -1,17 +1,28 @@
-from fastapi import HTTPException
-from sqlalchemy import select, text
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.timezones import Timezone
+from app.services.id_allocator import id_allocator
 from app.static_data.timezones import TimezoneEnum
 
+PAGE_DIRECTIONS = ("after", "before")
+PUBLIC_REVALIDATE_CACHE_CONTROL = "public, no-cache"
+PRIVATE_REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
 
 async def get_next_sequence_value(db: AsyncSession, sequence_name: str) -> int:
-    """Fetch the next BIGINT value from a database sequence."""
+    """Return the next BIGINT id for a sequence from the process-local block allocator."""
 
-    result = await db.execute(text(f"SELECT nextval('{sequence_name}')"))
-    next_value = result.scalar_one()
-    return int(next_value)
+    return await id_allocator.next_id(db, sequence_name)
 
 
 async def resolve_timezone_id(db: AsyncSession, timezone_name: str) -> int:
@@ -37,3 +48,140 @@ async def resolve_timezone_id(db: AsyncSession, timezone_name: str) -> int:
             detail=f"Unsupported timezone_name: {normalized_timezone_name}",
         )
     return int(timezone_id)
+
+
+def clamp_page_limit(limit: int) -> int:
+    """Clamp client page sizes to a safe range."""
+
+    return max(1, min(limit, 200))
+
+
+def encode_page_cursor(direction: str, boundary_id: int) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor."""
+
+    return _encode_cursor_payload({"direction": direction, "id": boundary_id})
+
+
+def decode_page_cursor(cursor: str) -> tuple[str, int]:
+    """Decode an opaque cursor into its direction and boundary id."""
+
+    payload = _decode_cursor_payload(cursor)
+    try:
+        return str(payload["direction"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor") from None
+
+
+def encode_created_at_cursor(direction: str, created_at: datetime, boundary_id: int) -> str:
+    """Encode a `(created_at, id)` keyset position as an opaque URL-safe cursor."""
+
+    return _encode_cursor_payload(
+        {"direction": direction, "created_at": created_at.isoformat(), "id": boundary_id}
+    )
+
+
+def decode_created_at_cursor(cursor: str) -> tuple[str, datetime, int]:
+    """Decode an opaque cursor into its direction, boundary timestamp and boundary id."""
+
+    payload = _decode_cursor_payload(cursor)
+    try:
+        return (
+            str(payload["direction"]),
+            datetime.fromisoformat(payload["created_at"]),
+            int(payload["id"]),
+        )
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor") from None
+
+
+def _encode_cursor_payload(payload: dict[str, Any]) -> str:
+    """Serialize a cursor payload as unpadded URL-safe base64 JSON."""
+
+    raw_cursor = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw_cursor.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor_payload(cursor: str) -> dict[str, Any]:
+    """Parse a cursor back into its payload, rejecting anything malformed."""
+
+    try:
+        padded_cursor = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded_cursor.encode("ascii")))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor") from None
+
+    if not isinstance(payload, dict) or payload.get("direction") not in PAGE_DIRECTIONS:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return payload
+
+
+def weak_etag(*versions: object) -> str:
+    """Build a weak ETag from the row versions that determine a response body."""
+
+    raw_version = "|".join(str(version) for version in versions)
+    return f'W/"{hashlib.blake2b(raw_version.encode("utf-8"), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Apply the weak comparison that If-None-Match requires."""
+
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque_tag for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str,
+) -> Response | None:
+    """Return a bodiless 304 when the client already has `etag`, else tag the response."""
+
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def json_model_response(
+    adapter: TypeAdapter[Any],
+    content: Any,
+    response: Response | None = None,
+) -> Response:
+    """Validate `content` (ORM rows included) and dump it to JSON bytes in one pass each.
+
+    Returning a `Response` skips FastAPI's `response_model` handling, which would validate
+    the models a second time, convert them back to Python primitives and encode those
+    with `json.dumps`. Headers already set on the endpoint's injected `response` are kept.
+    """
+
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    json_response = Response(content=body, media_type="application/json")
+    if response is not None:
+        json_response.headers.raw.extend(response.headers.raw)
+    return json_response
+
+
+async def read_mollie_webhook_payment_id(request: Request) -> str:
+    """Return the Mollie payment id posted to a webhook, as form or urlencoded body."""
+
+    content_type = request.headers.get("content-type", "")
+    mollie_payment_id = ""
+    if "multipart/form-data" in content_type:
+        form = await request.form()
+        mollie_payment_id = str(form.get("id") or "")
+    else:
+        body = (await request.body()).decode("utf-8")
+        parsed = parse_qs(body)
+        mollie_payment_id = parsed.get("id", [""])[0]
+
+    if not mollie_payment_id:
+        raise HTTPException(status_code=400, detail="Missing Mollie payment id")
+    return mollie_payment_id
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from app.services.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    """Expose request, database, provider and business metrics in Prometheus text format."""
+
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -1,7 +1,5 @@
-from urllib.parse import parse_qs
-
 import pendulum
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,10 +9,17 @@ from app.database import get_db
 from app.dependencies import get_current_user
 from app.models.challenges import Challenge
 from app.models.payments import Payment
-from app.models.users import User
-from app.routers.helpers import get_next_sequence_value
+from app.routers.helpers import (
+    PRIVATE_REVALIDATE_CACHE_CONTROL,
+    get_next_sequence_value,
+    not_modified_response,
+    read_mollie_webhook_payment_id,
+    weak_etag,
+)
 from app.schemas import PaymentCreateRequest, PaymentCreateResponse, PaymentStatusResponse
-from app.services.mollie import create_mollie_payment, get_mollie_payment
+from app.services.mollie import create_mollie_payment
+from app.services.user_cache import AuthenticatedUser
+from app.services.webhook_inbox import WebhookSource, enqueue_webhook, notify_webhook_inbox
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
@@ -22,10 +27,14 @@ router = APIRouter(prefix="/payments", tags=["payments"])
 @router.post("", response_model=PaymentCreateResponse, status_code=201)
 async def create_payment(
     payload: PaymentCreateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> PaymentCreateResponse:
-    """Create a payment in Mollie and persist the local payment record."""
+    """Create a payment in Mollie and persist the local payment record.
+
+    The pending row is committed before the provider call so no pooled connection or
+    transaction is held across the Mollie round trip.
+    """
 
     challenge_result = await db.execute(
         select(Challenge).where(
@@ -49,6 +58,11 @@ async def create_payment(
         updated_at=now,
     )
     db.add(payment)
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Failed to create payment") from exc
 
     redirect_base_url = settings.MOLLIE_REDIRECT_BASE_URL.rstrip("/")
     redirect_url = (
@@ -58,7 +72,7 @@ async def create_payment(
     webhook_url = f"{webhook_base_url}/payments/webhook"
 
     try:
-        mollie_result = create_mollie_payment(
+        mollie_result = await create_mollie_payment(
             amount_cents=payment.amount_cents,
             description=f"Challenge attempt #{challenge.challenge_id}",
             redirect_url=redirect_url,
@@ -69,13 +83,17 @@ async def create_payment(
                 "user_id": str(current_user.user_id),
             },
         )
-        payment.mollie_payment_id = mollie_result["mollie_payment_id"]
-        payment.status = mollie_result["status"]
+    except (ValueError, RuntimeError) as exc:
+        payment.status = "failed"
         payment.updated_at = pendulum.now("UTC").naive()
         await db.commit()
-    except (ValueError, RuntimeError) as exc:
-        await db.rollback()
         raise HTTPException(status_code=502, detail="Payment provider unavailable") from exc
+
+    payment.mollie_payment_id = mollie_result["mollie_payment_id"]
+    payment.status = mollie_result["status"]
+    payment.updated_at = pendulum.now("UTC").naive()
+    try:
+        await db.commit()
     except IntegrityError as exc:
         await db.rollback()
         raise HTTPException(status_code=409, detail="Failed to create payment") from exc
@@ -89,47 +107,24 @@ async def create_payment(
 
 @router.post("/webhook")
 async def payment_webhook(request: Request, db: AsyncSession = Depends(get_db)) -> dict[str, str]:
-    """Handle Mollie webhook updates and persist the latest payment status."""
-
-    content_type = request.headers.get("content-type", "")
-    mollie_payment_id = ""
-    if "multipart/form-data" in content_type:
-        form = await request.form()
-        mollie_payment_id = str(form.get("id") or "")
-    else:
-        body = (await request.body()).decode("utf-8")
-        parsed = parse_qs(body)
-        mollie_payment_id = parsed.get("id", [""])[0]
-
-    if not mollie_payment_id:
-        raise HTTPException(status_code=400, detail="Missing Mollie payment id")
-
-    payment_result = await db.execute(
-        select(Payment).where(Payment.mollie_payment_id == mollie_payment_id)
-    )
-    payment = payment_result.scalars().first()
-    if payment is None:
-        return {"status": "ignored"}
-
-    try:
-        mollie_payment = get_mollie_payment(mollie_payment_id)
-    except (ValueError, RuntimeError) as exc:
-        raise HTTPException(status_code=502, detail="Payment provider unavailable") from exc
-
-    if payment.status != mollie_payment["status"]:
-        payment.status = mollie_payment["status"]
-        payment.updated_at = pendulum.now("UTC").naive()
-        await db.commit()
+    """Record a Mollie payment webhook in the inbox and acknowledge it immediately."""
 
+    mollie_payment_id = await read_mollie_webhook_payment_id(request)
+    if not await enqueue_webhook(db, WebhookSource.PAYMENT, mollie_payment_id):
+        return {"status": "ignored"}
+    await db.commit()
+    notify_webhook_inbox()
     return {"status": "ok"}
 
 
 @router.get("/{payment_id}", response_model=PaymentStatusResponse)
 async def get_payment_status(
     payment_id: int,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> PaymentStatusResponse:
+) -> PaymentStatusResponse | Response:
     """Return payment status for the authenticated owner."""
 
     result = await db.execute(
@@ -141,4 +136,8 @@ async def get_payment_status(
     payment = result.scalars().first()
     if payment is None:
         raise HTTPException(status_code=404, detail="Payment not found")
+    etag = weak_etag("payment", payment.payment_id, payment.status, payment.updated_at)
+    not_modified = not_modified_response(request, response, etag, PRIVATE_REVALIDATE_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
     return PaymentStatusResponse.model_validate(payment)
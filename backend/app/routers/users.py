@@ -1,7 +1,8 @@
 import uuid
 
 import pendulum
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,10 +10,11 @@ from sqlalchemy.orm import joinedload
 
 from app.database import get_db
 from app.models.users import User
-from app.routers.helpers import get_next_sequence_value, resolve_timezone_id
+from app.routers.helpers import get_next_sequence_value, json_model_response, resolve_timezone_id
 from app.schemas import UserCreate, UserRead
 
 router = APIRouter(prefix="/users", tags=["users"])
+_USER_LIST_ADAPTER = TypeAdapter(list[UserRead])
 
 
 async def _load_user_by_reference(db: AsyncSession, reference: uuid.UUID) -> User:
@@ -58,12 +60,14 @@ async def create_user(payload: UserCreate, db: AsyncSession = Depends(get_db)) -
 async def list_users(
     limit: int = 50,
     db: AsyncSession = Depends(get_db),
-) -> list[UserRead]:
+) -> Response:
     """List example users in descending creation order."""
 
     safe_limit = max(1, min(limit, 200))
     result = await db.execute(
-        select(User).options(joinedload(User.timezone)).order_by(User.user_id.desc()).limit(safe_limit)
+        select(User)
+        .options(joinedload(User.timezone))
+        .order_by(User.created_at.desc(), User.user_id.desc())
+        .limit(safe_limit)
     )
-    users = result.scalars().all()
-    return [UserRead.model_validate(user) for user in users]
+    return json_model_response(_USER_LIST_ADAPTER, result.scalars().all())
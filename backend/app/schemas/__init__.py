@@ -3,9 +3,14 @@ from app.schemas.auth import LoginRequest, RegisterRequest, TokenResponse, UserM
 from app.schemas.challenges import (
     ChallengeDetail,
     ChallengeListItem,
+    ConversationPage,
     ConversationRead,
     MessageCreate,
+    MessagePage,
     MessageRead,
+    MessageStreamError,
+    MessageStreamStart,
+    MessageStreamToken,
     SendMessageResponse,
 )
 from app.schemas.credits import (
@@ -22,6 +27,7 @@ __all__ = [
     "AttemptResponse",
     "ChallengeDetail",
     "ChallengeListItem",
+    "ConversationPage",
     "ConversationRead",
     "CreditBalanceResponse",
     "CreditPurchaseCreateRequest",
@@ -29,7 +35,11 @@ __all__ = [
     "CreditPurchaseReadResponse",
     "LoginRequest",
     "MessageCreate",
+    "MessagePage",
     "MessageRead",
+    "MessageStreamError",
+    "MessageStreamStart",
+    "MessageStreamToken",
     "PaymentCreateRequest",
     "PaymentCreateResponse",
     "PaymentStatusResponse",
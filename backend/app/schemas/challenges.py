@@ -47,6 +47,13 @@ class ConversationRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ConversationPage(BaseModel):
+    """Keyset-paginated conversations, newest first."""
+
+    items: list[ConversationRead]
+    next_cursor: str | None
+
+
 class MessageCreate(BaseModel):
     """Request payload for posting a conversation message."""
 
@@ -76,6 +83,13 @@ class MessageRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class MessagePage(BaseModel):
+    """Keyset-paginated conversation messages in ascending `conversation_seq` order."""
+
+    items: list[MessageRead]
+    next_cursor: str | None
+
+
 class SendMessageResponse(BaseModel):
     """Response containing both user and mock-assistant messages."""
 
@@ -85,3 +99,24 @@ class SendMessageResponse(BaseModel):
     credits_charged: int
     remaining_credits: int
     updated_prize_pool_cents: int
+
+
+class MessageStreamStart(BaseModel):
+    """First streamed event, sent once the charge and user message are committed."""
+
+    user_message: MessageRead
+    credits_charged: int
+    remaining_credits: int
+    updated_prize_pool_cents: int
+
+
+class MessageStreamToken(BaseModel):
+    """One streamed chunk of assistant reply text."""
+
+    token: str
+
+
+class MessageStreamError(BaseModel):
+    """Terminal streamed event sent when the bot reply could not be completed."""
+
+    detail: str
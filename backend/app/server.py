@@ -0,0 +1,62 @@
+"""Production entry point: serve the API with uvicorn using the SERVER_* settings.
+
+    uv run python -m app.server
+
+With `SERVER_WORKERS` above 1 (or 0 for one per CPU core), uvicorn runs that many
+worker processes. Each one imports the app itself, so it gets its own event loop,
+SQLAlchemy engine and connection pool. `SERVER_MAX_REQUESTS` recycles a worker
+gracefully after that many requests (plus up to `SERVER_MAX_REQUESTS_JITTER`, so
+workers do not all restart together), and the supervisor starts a replacement.
+"""
+
+import os
+import shutil
+import tempfile
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any
+
+import uvicorn
+
+from app.config import settings
+from app.services.metrics import MULTIPROCESS_DIR_ENV
+
+
+def uvicorn_options() -> dict[str, Any]:
+    """Translate the SERVER_* settings into `uvicorn.run` keyword arguments."""
+
+    return {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "workers": settings.server_worker_count,
+        "limit_max_requests": settings.SERVER_MAX_REQUESTS or None,
+        "limit_max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        "forwarded_allow_ips": settings.SERVER_FORWARDED_ALLOW_IPS,
+    }
+
+
+def prepare_multiprocess_metrics(environ: MutableMapping[str, str]) -> None:
+    """Point every worker at one empty metrics directory so /metrics sums all of them.
+
+    Must run before any worker starts. Reuses `PROMETHEUS_MULTIPROC_DIR` when it is set
+    and otherwise creates a temporary directory, clearing files from earlier runs.
+    """
+
+    metrics_dir = environ.get(MULTIPROCESS_DIR_ENV) or tempfile.mkdtemp(prefix="prometheus-")
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    Path(metrics_dir).mkdir(parents=True)
+    environ[MULTIPROCESS_DIR_ENV] = metrics_dir
+
+
+def main() -> None:
+    """Run the API in one process, or under uvicorn's worker supervisor."""
+
+    options = uvicorn_options()
+    if options["workers"] > 1:
+        prepare_multiprocess_metrics(os.environ)
+    uvicorn.run("app.main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
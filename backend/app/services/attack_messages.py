@@ -0,0 +1,271 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.messages import Message
+from app.routers.helpers import get_next_sequence_value
+from app.static_data.economy import CENTS_PER_CREDIT
+
+# Ownership check, conditional wallet debit, ledger insert, prize pool contribution,
+# conversation touch and user message insert in one statement. Every write is
+# gated on the `debit` CTE, so nothing changes unless the wallet could pay. The
+# challenge row is only read: pool growth is appended to prize_pool_contributions
+# and folded in the background, so attackers never queue behind its row lock. The
+# user message takes its position from the conversation's bumped message_count.
+_CHARGE_ATTACK_MESSAGE_SQL = text(
+    """
+    WITH conversation AS (
+        SELECT conversation_id, challenge_id
+        FROM conversations
+        WHERE conversation_id = :conversation_id AND user_id = :user_id
+    ),
+    challenge AS (
+        SELECT c.challenge_id, c.secret, c.attack_cost_credits, c.prize_pool_cents
+        FROM challenges c
+        JOIN conversation ON conversation.challenge_id = c.challenge_id
+        WHERE c.is_active
+    ),
+    debit AS (
+        UPDATE credit_wallets w
+        SET balance_credits = w.balance_credits - challenge.attack_cost_credits,
+            updated_at = :now
+        FROM challenge
+        WHERE w.user_id = :user_id AND w.balance_credits >= challenge.attack_cost_credits
+        RETURNING w.balance_credits
+    ),
+    ledger AS (
+        INSERT INTO credit_transactions (
+            credit_transaction_id, user_id, challenge_id, credit_purchase_id,
+            delta_credits, transaction_type, created_at
+        )
+        SELECT :credit_transaction_id, :user_id, challenge.challenge_id, NULL,
+               -challenge.attack_cost_credits, 'attack_spend', :now
+        FROM challenge, debit
+    ),
+    contribution AS (
+        INSERT INTO prize_pool_contributions (
+            prize_pool_contribution_id, challenge_id, amount_cents, created_at
+        )
+        SELECT :prize_pool_contribution_id, challenge.challenge_id,
+               challenge.attack_cost_credits * :cents_per_credit, :now
+        FROM challenge, debit
+        RETURNING amount_cents
+    ),
+    pool AS (
+        SELECT challenge.prize_pool_cents + contribution.amount_cents + COALESCE(
+            (
+                SELECT SUM(p.amount_cents)
+                FROM prize_pool_contributions p
+                WHERE p.challenge_id = challenge.challenge_id
+            ),
+            0
+        ) AS prize_pool_cents
+        FROM challenge, contribution
+    ),
+    touched_conversation AS (
+        UPDATE conversations
+        SET updated_at = :now, message_count = conversations.message_count + 1
+        FROM debit
+        WHERE conversations.conversation_id = :conversation_id
+        RETURNING conversations.message_count
+    ),
+    user_message AS (
+        INSERT INTO messages (
+            message_id, conversation_id, conversation_seq, role, content,
+            is_secret_exposure, created_at
+        )
+        SELECT :user_message_id, :conversation_id, touched_conversation.message_count,
+               'user', :content, FALSE, :now
+        FROM touched_conversation
+    )
+    SELECT
+        conversation.conversation_id,
+        challenge.challenge_id,
+        challenge.secret,
+        challenge.attack_cost_credits,
+        debit.balance_credits,
+        pool.prize_pool_cents
+    FROM (SELECT 1) AS request
+    LEFT JOIN conversation ON TRUE
+    LEFT JOIN challenge ON TRUE
+    LEFT JOIN debit ON TRUE
+    LEFT JOIN pool ON TRUE
+    """
+)
+
+# Takes the next conversation position and stores the assistant reply in one round trip.
+_ADD_ASSISTANT_MESSAGE_SQL = text(
+    """
+    WITH slot AS (
+        UPDATE conversations
+        SET message_count = message_count + 1
+        WHERE conversation_id = :conversation_id
+        RETURNING message_count
+    )
+    INSERT INTO messages (
+        message_id, conversation_id, conversation_seq, role, content,
+        is_secret_exposure, created_at
+    )
+    SELECT :message_id, :conversation_id, slot.message_count, 'assistant', :content,
+           :is_secret_exposure, :now
+    FROM slot
+    RETURNING conversation_seq
+    """
+)
+
+# Compensate a committed charge whose bot reply never came: credit the wallet back,
+# record the refund in the ledger and append a negative prize pool contribution. The
+# user message stays, since messages are append-only.
+_REFUND_ATTACK_MESSAGE_SQL = text(
+    """
+    WITH credit AS (
+        UPDATE credit_wallets
+        SET balance_credits = balance_credits + :credits, updated_at = :now
+        WHERE user_id = :user_id
+        RETURNING balance_credits
+    ),
+    ledger AS (
+        INSERT INTO credit_transactions (
+            credit_transaction_id, user_id, challenge_id, credit_purchase_id,
+            delta_credits, transaction_type, created_at
+        )
+        SELECT :credit_transaction_id, :user_id, :challenge_id, NULL,
+               :credits, 'attack_refund', :now
+        FROM credit
+    ),
+    contribution AS (
+        INSERT INTO prize_pool_contributions (
+            prize_pool_contribution_id, challenge_id, amount_cents, created_at
+        )
+        SELECT :prize_pool_contribution_id, :challenge_id, -:credits * :cents_per_credit, :now
+        FROM credit
+    )
+    SELECT balance_credits FROM credit
+    """
+)
+
+
+@dataclass(frozen=True)
+class AttackCharge:
+    """Outcome of charging one attack message against a user's wallet."""
+
+    conversation_found: bool
+    challenge_id: int | None
+    challenge_secret: str | None
+    credits_charged: int
+    is_charged: bool
+    remaining_credits: int
+    updated_prize_pool_cents: int
+    user_message_id: int
+
+
+async def charge_attack_message(
+    db: AsyncSession,
+    *,
+    conversation_id: int,
+    user_id: int,
+    content: str,
+    now: datetime,
+) -> AttackCharge:
+    """Charge credits and store the user message in a single server-side statement.
+
+    The transaction is left open for the caller to commit, or to roll back when the
+    charge did not happen.
+    """
+
+    credit_transaction_id = await get_next_sequence_value(db, "credit_transaction_id_seq")
+    user_message_id = await get_next_sequence_value(db, "message_id_seq")
+    prize_pool_contribution_id = await get_next_sequence_value(db, "prize_pool_contribution_id_seq")
+
+    result = await db.execute(
+        _CHARGE_ATTACK_MESSAGE_SQL,
+        {
+            "conversation_id": conversation_id,
+            "user_id": user_id,
+            "content": content,
+            "now": now,
+            "credit_transaction_id": credit_transaction_id,
+            "user_message_id": user_message_id,
+            "prize_pool_contribution_id": prize_pool_contribution_id,
+            "cents_per_credit": CENTS_PER_CREDIT,
+        },
+    )
+    row = result.one()
+    is_charged = row.balance_credits is not None
+    return AttackCharge(
+        conversation_found=row.conversation_id is not None,
+        challenge_id=row.challenge_id,
+        challenge_secret=row.secret,
+        credits_charged=int(row.attack_cost_credits or 0),
+        is_charged=is_charged,
+        remaining_credits=int(row.balance_credits) if is_charged else 0,
+        updated_prize_pool_cents=int(row.prize_pool_cents) if is_charged else 0,
+        user_message_id=user_message_id,
+    )
+
+
+async def refund_attack_message(
+    db: AsyncSession,
+    charge: AttackCharge,
+    *,
+    user_id: int,
+    now: datetime,
+) -> None:
+    """Give back the credits and pool contribution of a committed charge.
+
+    Used when the bot reply fails after the charge was committed. The caller commits.
+    """
+
+    credit_transaction_id = await get_next_sequence_value(db, "credit_transaction_id_seq")
+    prize_pool_contribution_id = await get_next_sequence_value(db, "prize_pool_contribution_id_seq")
+
+    await db.execute(
+        _REFUND_ATTACK_MESSAGE_SQL,
+        {
+            "user_id": user_id,
+            "challenge_id": charge.challenge_id,
+            "credits": charge.credits_charged,
+            "now": now,
+            "credit_transaction_id": credit_transaction_id,
+            "prize_pool_contribution_id": prize_pool_contribution_id,
+            "cents_per_credit": CENTS_PER_CREDIT,
+        },
+    )
+
+
+async def add_assistant_message(
+    db: AsyncSession,
+    *,
+    conversation_id: int,
+    content: str,
+    is_secret_exposure: bool,
+    now: datetime,
+) -> Message:
+    """Insert an assistant reply at the next position of its conversation.
+
+    Bumping `message_count` row-locks the conversation until the caller commits, so
+    positions within a conversation follow commit order even across workers.
+    """
+
+    message_id = await get_next_sequence_value(db, "message_id_seq")
+    result = await db.execute(
+        _ADD_ASSISTANT_MESSAGE_SQL,
+        {
+            "message_id": message_id,
+            "conversation_id": conversation_id,
+            "content": content,
+            "is_secret_exposure": is_secret_exposure,
+            "now": now,
+        },
+    )
+    return Message(
+        message_id=message_id,
+        conversation_id=conversation_id,
+        conversation_seq=int(result.scalar_one()),
+        role="assistant",
+        content=content,
+        is_secret_exposure=is_secret_exposure,
+        created_at=now,
+    )
@@ -1,3 +1,8 @@
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
 import bcrypt
 import jwt
 import pendulum
@@ -6,14 +11,18 @@ from jwt import InvalidTokenError
 from app.config import settings
 
 
-def hash_password(password: str) -> str:
-    """Hash a plaintext password using bcrypt."""
+def hash_password(password: str, *, rounds: int | None = None) -> str:
+    """Hash a plaintext password using bcrypt, blocking the calling thread.
+
+    Request handlers go through `app.services.password_hasher` instead.
+    """
 
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    salt = bcrypt.gensalt(rounds=rounds if rounds is not None else settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    """Return whether a plaintext password matches a bcrypt hash."""
+    """Return whether a plaintext password matches a bcrypt hash, blocking the thread."""
 
     try:
         return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
@@ -57,3 +66,48 @@ def decode_access_token(token: str) -> dict[str, str | int]:
         "iat": int(iat_value) if iat_value is not None else 0,
         "exp": int(exp_value) if exp_value is not None else 0,
     }
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of already-verified access tokens, keyed by a digest of the token.
+
+    A hit requires the exact token bytes that passed signature verification earlier,
+    so it is as trustworthy as re-verifying. Entries are dropped once `exp` passes.
+    """
+
+    def __init__(self, *, max_entries: int, clock: Callable[[], float] = time.time) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[bytes, dict[str, str | int]] = OrderedDict()
+
+    def decode(self, token: str) -> dict[str, str | int]:
+        """Return verified claims, running full verification only on a cache miss.
+
+        Callers get their own copy, so changing it cannot leak into later requests.
+        """
+
+        token_digest = hashlib.sha256(token.encode("utf-8")).digest()
+        claims = self._entries.get(token_digest)
+        if claims is not None:
+            if self._clock() < int(claims["exp"]):
+                self._entries.move_to_end(token_digest)
+                return dict(claims)
+            del self._entries[token_digest]
+
+        claims = decode_access_token(token)
+        if int(claims["exp"]) > self._clock():
+            self._entries[token_digest] = dict(claims)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return claims
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Forget every verified token."""
+
+        self._entries.clear()
+
+
+verified_token_cache = VerifiedTokenCache(max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TypeVar
+
+from app.config import settings
+from app.services.metrics import bot_call_duration_seconds
+
+_T = TypeVar("_T")
+
+
+class BotPoolFullError(Exception):
+    """Raised when a bot call cannot get a worker slot (queue full or wait too long)."""
+
+
+class BotCallTimeoutError(Exception):
+    """Raised when a bot call exceeds its per-call timeout."""
+
+
+@dataclass(frozen=True)
+class BotPoolStats:
+    """Point-in-time view of bot worker pool usage."""
+
+    max_concurrency: int
+    max_queue_depth: int
+    in_flight: int
+    queue_depth: int
+    calls_started: int
+    calls_rejected: int
+    calls_timed_out: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class BotWorkerPool:
+    """Cap concurrent bot generations and shed load once the wait queue is full."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        max_queue_depth: int,
+        queue_timeout_seconds: float,
+        call_timeout_seconds: float,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.call_timeout_seconds = call_timeout_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._queue_depth = 0
+        self._calls_started = 0
+        self._calls_rejected = 0
+        self._calls_timed_out = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def ensure_capacity(self) -> None:
+        """Fail fast before doing billable work when no slot could be queued for."""
+
+        if self._in_flight >= self.max_concurrency and self._queue_depth >= self.max_queue_depth:
+            self._calls_rejected += 1
+            raise BotPoolFullError("Bot worker queue is full")
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one worker slot, waiting in the bounded queue when all are busy."""
+
+        self.ensure_capacity()
+        self._queue_depth += 1
+        wait_started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.queue_timeout_seconds):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self._calls_rejected += 1
+            raise BotPoolFullError("Timed out waiting for a bot worker slot") from None
+        finally:
+            self._queue_depth -= 1
+            waited = time.perf_counter() - wait_started
+            self._wait_seconds_total += waited
+            self._wait_seconds_max = max(self._wait_seconds_max, waited)
+
+        self._in_flight += 1
+        self._calls_started += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    async def run(self, call: Callable[[], Awaitable[_T]]) -> _T:
+        """Run one bot call inside a worker slot and under the per-call timeout."""
+
+        async with self.slot():
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                async with asyncio.timeout(self.call_timeout_seconds):
+                    result = await call()
+                outcome = "ok"
+                return result
+            except TimeoutError:
+                outcome = "timeout"
+                self._calls_timed_out += 1
+                raise BotCallTimeoutError("Bot call exceeded its timeout") from None
+            finally:
+                bot_call_duration_seconds.labels("reply", outcome).observe(
+                    time.perf_counter() - started
+                )
+
+    async def stream(self, chunks: AsyncIterator[_T]) -> AsyncIterator[_T]:
+        """Relay a streamed bot reply inside a worker slot and under the per-call timeout.
+
+        The deadline only wraps waits on the provider, never the caller's own work
+        between chunks, so a slow client cannot trip it.
+        """
+
+        async with self.slot():
+            deadline = asyncio.get_running_loop().time() + self.call_timeout_seconds
+            generating_seconds = 0.0
+            outcome = "error"
+            try:
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        async with asyncio.timeout_at(deadline):
+                            chunk = await anext(chunks)
+                    except StopAsyncIteration:
+                        outcome = "ok"
+                        return
+                    except TimeoutError:
+                        outcome = "timeout"
+                        self._calls_timed_out += 1
+                        raise BotCallTimeoutError("Bot call exceeded its timeout") from None
+                    finally:
+                        generating_seconds += time.perf_counter() - started
+                    yield chunk
+            finally:
+                bot_call_duration_seconds.labels("stream", outcome).observe(generating_seconds)
+
+    def snapshot(self) -> BotPoolStats:
+        """Return current pool counters for health and metrics endpoints."""
+
+        return BotPoolStats(
+            max_concurrency=self.max_concurrency,
+            max_queue_depth=self.max_queue_depth,
+            in_flight=self._in_flight,
+            queue_depth=self._queue_depth,
+            calls_started=self._calls_started,
+            calls_rejected=self._calls_rejected,
+            calls_timed_out=self._calls_timed_out,
+            wait_seconds_total=self._wait_seconds_total,
+            wait_seconds_max=self._wait_seconds_max,
+        )
+
+
+bot_pool = BotWorkerPool(
+    max_concurrency=settings.BOT_MAX_CONCURRENCY,
+    max_queue_depth=settings.BOT_MAX_QUEUE_DEPTH,
+    queue_timeout_seconds=settings.BOT_QUEUE_TIMEOUT_SECONDS,
+    call_timeout_seconds=settings.BOT_CALL_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,29 @@
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Protocol
+
+
+@dataclass(frozen=True)
+class BotReply:
+    """Bot response content and whether it leaked the secret."""
+
+    content: str
+    did_expose_secret: bool
+
+
+class BotProvider(Protocol):
+    """Pluggable source of assistant replies for challenge conversations."""
+
+    async def generate_reply(self, secret: str) -> BotReply:
+        """Return one complete reply for a conversation guarding `secret`."""
+        ...
+
+    def stream_reply(self, secret: str) -> AsyncIterator[str]:
+        """Yield reply text chunks as they are produced."""
+        ...
+
+
+def reply_exposes_secret(content: str, secret: str) -> bool:
+    """Return whether streamed reply text contains the protected secret."""
+
+    return bool(secret) and secret.lower() in content.lower()
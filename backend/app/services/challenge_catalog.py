@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.challenges import Challenge
+from app.schemas import ChallengeDetail, ChallengeListItem
+from app.services.prize_pool import effective_prize_pool_cents
+
+
+def _payload_version(payload: str) -> str:
+    """Return a short stable digest, identical across workers for identical content."""
+
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """One cached active challenge, pre-validated for both public response shapes."""
+
+    detail: ChallengeDetail
+    list_item: ChallengeListItem
+    version: str
+
+    @classmethod
+    def from_detail(cls, detail: ChallengeDetail) -> "CatalogEntry":
+        """Build an entry whose version changes whenever its public payload does."""
+
+        return cls(
+            detail=detail,
+            list_item=ChallengeListItem.model_validate(detail.model_dump()),
+            version=_payload_version(detail.model_dump_json()),
+        )
+
+
+class ChallengeCatalogCache:
+    """Serve active challenges from memory with separate static and prize pool refresh.
+
+    Static fields are reloaded after `ttl_seconds`. Prize pools change with every attack,
+    so they are re-read with one narrow query every `pool_refresh_seconds`, and this
+    worker's own attacks and refunds mark them stale so the next read re-reads them.
+    Charges commit in any order, so an attack's own pool snapshot is never written in,
+    which could move a pool backwards. Reads between refreshes never touch the database
+    session, so no connection is checked out.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        pool_refresh_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.pool_refresh_seconds = pool_refresh_seconds
+        self._clock = clock
+        self._lock = asyncio.Lock()
+        self._entries: dict[int, CatalogEntry] = {}
+        self._catalog_version = ""
+        self._loaded_at: float | None = None
+        self._pools_refreshed_at: float | None = None
+
+    @property
+    def catalog_version(self) -> str:
+        """Return a digest that changes whenever any cached entry changes."""
+
+        return self._catalog_version
+
+    async def list_entries(self, db: AsyncSession) -> list[CatalogEntry]:
+        """Return active challenges ordered by id, refreshing stale data first."""
+
+        await self._ensure_fresh(db)
+        return list(self._entries.values())
+
+    async def get_entry(self, db: AsyncSession, challenge_id: int) -> CatalogEntry | None:
+        """Return one active challenge, or None when it does not exist or is inactive."""
+
+        await self._ensure_fresh(db)
+        return self._entries.get(challenge_id)
+
+    def invalidate_prize_pools(self) -> None:
+        """Force the next read to re-read prize pools after a committed pool change."""
+
+        self._pools_refreshed_at = None
+
+    def clear(self) -> None:
+        """Drop every entry so the next read reloads the full catalog."""
+
+        self._entries = {}
+        self._catalog_version = ""
+        self._loaded_at = None
+        self._pools_refreshed_at = None
+
+    def _is_stale(self, refreshed_at: float | None, max_age_seconds: float) -> bool:
+        """Return whether a refresh timestamp is missing or older than its max age."""
+
+        return refreshed_at is None or self._clock() - refreshed_at >= max_age_seconds
+
+    async def _ensure_fresh(self, db: AsyncSession) -> None:
+        """Reload whatever has expired, letting one caller refresh while others wait."""
+
+        if not self._is_stale(self._loaded_at, self.ttl_seconds) and not self._is_stale(
+            self._pools_refreshed_at, self.pool_refresh_seconds
+        ):
+            return
+
+        async with self._lock:
+            if self._is_stale(self._loaded_at, self.ttl_seconds):
+                await self._reload(db)
+            elif self._is_stale(self._pools_refreshed_at, self.pool_refresh_seconds):
+                await self._refresh_prize_pools(db)
+
+    async def _reload(self, db: AsyncSession) -> None:
+        """Load every active challenge with its effective prize pool."""
+
+        result = await db.execute(
+            select(Challenge, effective_prize_pool_cents())
+            .where(Challenge.is_active.is_(True))
+            .order_by(Challenge.challenge_id.asc())
+        )
+        self._entries = {
+            challenge.challenge_id: CatalogEntry.from_detail(
+                ChallengeDetail.model_validate(challenge).model_copy(
+                    update={"prize_pool_cents": int(prize_pool_cents)}
+                )
+            )
+            for challenge, prize_pool_cents in result.all()
+        }
+        self._refresh_catalog_version()
+        self._loaded_at = self._pools_refreshed_at = self._clock()
+
+    async def _refresh_prize_pools(self, db: AsyncSession) -> None:
+        """Re-read only prize pools and rebuild the entries whose pool moved."""
+
+        result = await db.execute(
+            select(Challenge.challenge_id, effective_prize_pool_cents()).where(
+                Challenge.challenge_id.in_(self._entries)
+            )
+        )
+        for challenge_id, prize_pool_cents in result.all():
+            entry = self._entries[challenge_id]
+            if entry.detail.prize_pool_cents != prize_pool_cents:
+                self._entries[challenge_id] = CatalogEntry.from_detail(
+                    entry.detail.model_copy(update={"prize_pool_cents": int(prize_pool_cents)})
+                )
+        self._refresh_catalog_version()
+        self._pools_refreshed_at = self._clock()
+
+    def _refresh_catalog_version(self) -> None:
+        """Recompute the whole-catalog digest from the per-entry versions."""
+
+        entry_versions = ",".join(
+            f"{challenge_id}:{entry.version}" for challenge_id, entry in self._entries.items()
+        )
+        self._catalog_version = _payload_version(entry_versions)
+
+
+challenge_catalog = ChallengeCatalogCache(
+    ttl_seconds=settings.CHALLENGE_CATALOG_TTL_SECONDS,
+    pool_refresh_seconds=settings.CHALLENGE_POOL_REFRESH_SECONDS,
+)
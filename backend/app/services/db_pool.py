@@ -0,0 +1,176 @@
+import bisect
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, Pool, QueuePool
+
+from app.services.metrics import (
+    CHECKOUT_SECONDS_BUCKETS,
+    LIFETIME_SECONDS_BUCKETS,
+    db_pool_checkout_hold_seconds,
+    db_pool_checkout_wait_seconds,
+    db_pool_connection_lifetime_seconds,
+)
+
+_CHECKED_OUT_AT = "checked_out_at"
+_OPENED_AT = "opened_at"
+
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus-style cumulative bucket counts."""
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+
+        self._counts[bisect.bisect_left(self.bounds, value)] += 1
+        self._sum += value
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return cumulative counts per upper bound (`+Inf` last), the count and the sum."""
+
+        buckets: dict[str, int] = {}
+        cumulative = 0
+        for bound, count in zip((*map(str, self.bounds), "+Inf"), self._counts, strict=True):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"buckets": buckets, "count": cumulative, "sum": self._sum}
+
+
+@dataclass(frozen=True)
+class DatabasePoolStats:
+    """Point-in-time view of the SQLAlchemy connection pool."""
+
+    pool_size: int
+    max_overflow: int
+    timeout_seconds: float
+    recycle_seconds: float
+    pre_ping: bool
+    checked_out: int
+    idle: int
+    overflow: int
+    checkouts_total: int
+    checkout_timeouts_total: int
+    checkout_wait_seconds_max: float
+    connections_opened_total: int
+    connections_closed_total: int
+    checkout_wait_seconds: dict[str, Any]
+    checkout_hold_seconds: dict[str, Any]
+    connection_lifetime_seconds: dict[str, Any]
+
+
+class DatabasePoolMonitor:
+    """Collect pool wait, hold and connection lifetime statistics from pool events.
+
+    Each observation also goes to the matching Prometheus histogram, which `reset`
+    leaves alone since Prometheus expects them to only grow.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every recorded observation."""
+
+        self._checkout_timeouts = 0
+        self._checkout_wait_max = 0.0
+        self._connections_opened = 0
+        self._connections_closed = 0
+        self._checkout_wait = Histogram(CHECKOUT_SECONDS_BUCKETS)
+        self._checkout_hold = Histogram(CHECKOUT_SECONDS_BUCKETS)
+        self._connection_lifetime = Histogram(LIFETIME_SECONDS_BUCKETS)
+
+    def attach(self, engine: AsyncEngine) -> None:
+        """Listen to the engine's pool events (the listeners survive pool recreation)."""
+
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "connect", self._on_connect)
+        event.listen(sync_engine, "checkout", self._on_checkout)
+        event.listen(sync_engine, "checkin", self._on_checkin)
+        event.listen(sync_engine, "close", self._on_close)
+
+    def record_checkout_wait(self, seconds: float) -> None:
+        """Record how long a successful checkout waited for a connection."""
+
+        self._checkout_wait.observe(seconds)
+        db_pool_checkout_wait_seconds.observe(seconds)
+        self._checkout_wait_max = max(self._checkout_wait_max, seconds)
+
+    def record_checkout_timeout(self) -> None:
+        """Record a checkout that gave up after the pool timeout."""
+
+        self._checkout_timeouts += 1
+
+    def snapshot(self, pool: Pool) -> DatabasePoolStats:
+        """Combine the recorded counters with the pool's live occupancy."""
+
+        queue_pool = pool if isinstance(pool, QueuePool) else None
+        return DatabasePoolStats(
+            pool_size=queue_pool.size() if queue_pool else 0,
+            max_overflow=getattr(pool, "_max_overflow", 0),
+            timeout_seconds=queue_pool.timeout() if queue_pool else 0.0,
+            recycle_seconds=pool._recycle,
+            pre_ping=pool._pre_ping,
+            checked_out=queue_pool.checkedout() if queue_pool else 0,
+            idle=queue_pool.checkedin() if queue_pool else 0,
+            overflow=max(queue_pool.overflow(), 0) if queue_pool else 0,
+            checkouts_total=self._checkout_wait.snapshot()["count"],
+            checkout_timeouts_total=self._checkout_timeouts,
+            checkout_wait_seconds_max=self._checkout_wait_max,
+            connections_opened_total=self._connections_opened,
+            connections_closed_total=self._connections_closed,
+            checkout_wait_seconds=self._checkout_wait.snapshot(),
+            checkout_hold_seconds=self._checkout_hold.snapshot(),
+            connection_lifetime_seconds=self._connection_lifetime.snapshot(),
+        )
+
+    def _on_connect(self, dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+        record.info[_OPENED_AT] = time.monotonic()
+        self._connections_opened += 1
+
+    def _on_checkout(self, dbapi_connection: Any, record: ConnectionPoolEntry, proxy: Any) -> None:
+        record.info[_CHECKED_OUT_AT] = time.perf_counter()
+
+    def _on_checkin(self, dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+        checked_out_at = record.info.pop(_CHECKED_OUT_AT, None)
+        if checked_out_at is not None:
+            held = time.perf_counter() - checked_out_at
+            self._checkout_hold.observe(held)
+            db_pool_checkout_hold_seconds.observe(held)
+
+    def _on_close(self, dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+        opened_at = record.info.pop(_OPENED_AT, None)
+        if opened_at is not None:
+            lifetime = time.monotonic() - opened_at
+            self._connection_lifetime.observe(lifetime)
+            db_pool_connection_lifetime_seconds.observe(lifetime)
+        self._connections_closed += 1
+
+
+db_pool_monitor = DatabasePoolMonitor()
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that reports how long checkouts wait and how often they time out.
+
+    SQLAlchemy has no event before a checkout starts waiting, so the wait is measured
+    around the pool's own `_do_get`.
+    """
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except sa_exc.TimeoutError:
+            db_pool_monitor.record_checkout_timeout()
+            raise
+        db_pool_monitor.record_checkout_wait(time.perf_counter() - started)
+        return record
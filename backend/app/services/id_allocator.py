@@ -0,0 +1,64 @@
+from collections import deque
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_RESERVE_BLOCK_SQL = text(
+    "SELECT nextval(CAST(:sequence_name AS regclass)) AS block_start, "
+    "(SELECT seqincrement FROM pg_sequence "
+    "WHERE seqrelid = CAST(:sequence_name AS regclass)) AS block_size"
+)
+
+
+@dataclass
+class _IdBlock:
+    """Half-open range of reserved identifiers that have not been handed out yet."""
+
+    next_value: int
+    stop_value: int
+
+
+class SequenceIdAllocator:
+    """Hand out BIGINT ids from sequence blocks reserved with a single `nextval`.
+
+    Each sequence is declared with `INCREMENT BY <block size>`, so one `nextval`
+    reserves `[value, value + increment)` for this process alone. Blocks never
+    overlap across workers or replicas as long as increments are only ever raised.
+    """
+
+    def __init__(self) -> None:
+        self._blocks: dict[str, deque[_IdBlock]] = {}
+
+    async def next_id(self, db: AsyncSession, sequence_name: str) -> int:
+        """Return the next unused id, reserving a new block when the cache is empty."""
+
+        blocks = self._blocks.setdefault(sequence_name, deque())
+        while True:
+            while blocks:
+                block = blocks[0]
+                if block.next_value < block.stop_value:
+                    value = block.next_value
+                    block.next_value += 1
+                    return value
+                blocks.popleft()
+
+            # Concurrent refills each append their own block, so no ids are wasted.
+            blocks.append(await self._reserve_block(db, sequence_name))
+
+    def clear(self) -> None:
+        """Drop all cached blocks; unused ids in them are simply skipped."""
+
+        self._blocks.clear()
+
+    async def _reserve_block(self, db: AsyncSession, sequence_name: str) -> _IdBlock:
+        """Reserve the next block of ids for a sequence in one round trip."""
+
+        result = await db.execute(_RESERVE_BLOCK_SQL, {"sequence_name": sequence_name})
+        row = result.one()
+        block_start = int(row.block_start)
+        block_size = max(1, int(row.block_size))
+        return _IdBlock(next_value=block_start, stop_value=block_start + block_size)
+
+
+id_allocator = SequenceIdAllocator()
@@ -0,0 +1,275 @@
+import os
+from collections.abc import Callable, Iterator
+from typing import TYPE_CHECKING
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from starlette.types import Scope
+
+if TYPE_CHECKING:
+    from app.services.bot_pool import BotPoolStats
+    from app.services.db_pool import DatabasePoolStats
+    from app.services.password_hasher import PasswordHasherStats
+
+# Route label for requests no route matched, so scanners cannot blow up label cardinality.
+UNMATCHED_ROUTE = "unmatched"
+# Route label for queries issued outside a request, e.g. by background workers.
+BACKGROUND_ROUTE = "background"
+
+REQUEST_SECONDS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)  # fmt: skip
+QUERY_SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERIES_PER_REQUEST_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+PROVIDER_SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Bucket upper bounds, in seconds, for checkout waits/holds and for connection lifetimes.
+CHECKOUT_SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIFETIME_SECONDS_BUCKETS = (1.0, 10.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 14400.0)
+
+# Set by `app.server` when it runs several workers. prometheus_client then keeps every
+# metric in per-process files under this directory so a scrape can sum all workers.
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+metrics_registry = CollectorRegistry()
+# Collectors reporting this process's own state, served as-is even in multiprocess mode.
+_process_collectors: list[Collector] = []
+
+# prometheus_client leaves these unannotated; typed aliases keep strict mypy quiet.
+_add_multiprocess_collector: Callable[[CollectorRegistry], object] = (
+    multiprocess.MultiProcessCollector
+)
+_mark_process_dead: Callable[[int], None] = multiprocess.mark_process_dead
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ["method", "route", "status"],
+    registry=metrics_registry,
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response body is fully sent.",
+    ["method", "route"],
+    buckets=REQUEST_SECONDS_BUCKETS,
+    registry=metrics_registry,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled.",
+    multiprocess_mode="livesum",
+    registry=metrics_registry,
+)
+db_queries_total = Counter(
+    "db_queries_total",
+    "Database statements executed, by the route that issued them.",
+    ["route"],
+    registry=metrics_registry,
+)
+db_query_seconds_total = Counter(
+    "db_query_seconds_total",
+    "Time spent executing database statements, by the route that issued them.",
+    ["route"],
+    registry=metrics_registry,
+)
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds",
+    "Latency of individual database statements.",
+    buckets=QUERY_SECONDS_BUCKETS,
+    registry=metrics_registry,
+)
+http_request_db_queries = Histogram(
+    "http_request_db_queries",
+    "Database statements executed per HTTP request.",
+    ["route"],
+    buckets=QUERIES_PER_REQUEST_BUCKETS,
+    registry=metrics_registry,
+)
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time a successful pool checkout waited for a connection.",
+    buckets=CHECKOUT_SECONDS_BUCKETS,
+    registry=metrics_registry,
+)
+db_pool_checkout_hold_seconds = Histogram(
+    "db_pool_checkout_hold_seconds",
+    "Time a connection stayed checked out before it was returned to the pool.",
+    buckets=CHECKOUT_SECONDS_BUCKETS,
+    registry=metrics_registry,
+)
+db_pool_connection_lifetime_seconds = Histogram(
+    "db_pool_connection_lifetime_seconds",
+    "Time a pooled database connection stayed open before it was closed.",
+    buckets=LIFETIME_SECONDS_BUCKETS,
+    registry=metrics_registry,
+)
+bot_call_duration_seconds = Histogram(
+    "bot_call_duration_seconds",
+    "Bot generation time once a worker slot is held, by call mode and outcome.",
+    ["mode", "outcome"],
+    buckets=PROVIDER_SECONDS_BUCKETS,
+    registry=metrics_registry,
+)
+mollie_request_duration_seconds = Histogram(
+    "mollie_request_duration_seconds",
+    "Mollie API call latency by operation.",
+    ["operation"],
+    buckets=PROVIDER_SECONDS_BUCKETS,
+    registry=metrics_registry,
+)
+mollie_requests_total = Counter(
+    "mollie_requests_total",
+    "Mollie API calls by operation and outcome (`ok` or the kind of failure).",
+    ["operation", "outcome"],
+    registry=metrics_registry,
+)
+attack_messages_total = Counter(
+    "attack_messages_total",
+    "Charged attack messages by challenge.",
+    ["challenge_id"],
+    registry=metrics_registry,
+)
+secret_exposures_total = Counter(
+    "secret_exposures_total",
+    "Bot replies that exposed the challenge secret, by challenge.",
+    ["challenge_id"],
+    registry=metrics_registry,
+)
+app_startup_seconds = Gauge(
+    "app_startup_seconds",
+    "Time the last startup spent per phase (lock_wait, schema, seed, total) before serving.",
+    ["phase"],
+    multiprocess_mode="mostrecent",
+    registry=metrics_registry,
+)
+rate_limited_requests_total = Counter(
+    "rate_limited_requests_total",
+    "Requests rejected with 429 by the rate limiter, by policy.",
+    ["policy"],
+    registry=metrics_registry,
+)
+credits_spent_total = Counter(
+    "credits_spent_total",
+    "Credits charged for attack messages, by challenge.",
+    ["challenge_id"],
+    registry=metrics_registry,
+)
+
+
+def record_attack(challenge_id: int, credits_charged: int) -> None:
+    """Count one charged attack message and the credits it spent."""
+
+    label = str(challenge_id)
+    attack_messages_total.labels(label).inc()
+    credits_spent_total.labels(label).inc(credits_charged)
+
+
+def record_secret_exposure(challenge_id: int) -> None:
+    """Count one bot reply that exposed the challenge secret."""
+
+    secret_exposures_total.labels(str(challenge_id)).inc()
+
+
+def is_multiprocess() -> bool:
+    """Return whether metrics are shared across server worker processes."""
+
+    return bool(os.environ.get(MULTIPROCESS_DIR_ENV))
+
+
+def register_process_collector(collector: Collector) -> None:
+    """Serve a collector of this process's own state alongside the shared metrics."""
+
+    metrics_registry.register(collector)
+    _process_collectors.append(collector)
+
+
+def render_metrics() -> bytes:
+    """Render every metric in Prometheus text format, summed across workers if shared."""
+
+    if not is_multiprocess():
+        return generate_latest(metrics_registry)
+
+    registry = CollectorRegistry()
+    _add_multiprocess_collector(registry)
+    for collector in _process_collectors:
+        registry.register(collector)
+    return generate_latest(registry)
+
+
+def mark_worker_stopped() -> None:
+    """Drop this worker's live gauges from the shared metrics once it stops serving."""
+
+    if is_multiprocess():
+        _mark_process_dead(os.getpid())
+
+
+def route_label(scope: Scope) -> str:
+    """Return the matched route's path template, never the raw request path."""
+
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class RuntimeStatsCollector(Collector):
+    """Expose the DB pool, bot pool and password hasher snapshots at scrape time.
+
+    The pools already keep their own counters, so nothing is added to their hot paths.
+    With several server workers these describe the worker that answered the scrape.
+    DB pool wait, hold and lifetime distributions are regular histograms instead, so
+    they sum across workers.
+    """
+
+    def __init__(
+        self,
+        *,
+        db_pool_stats: Callable[[], "DatabasePoolStats"],
+        bot_pool_stats: Callable[[], "BotPoolStats"],
+        password_hasher_stats: Callable[[], "PasswordHasherStats"],
+    ) -> None:
+        self._db_pool_stats = db_pool_stats
+        self._bot_pool_stats = bot_pool_stats
+        self._password_hasher_stats = password_hasher_stats
+
+    def collect(self) -> Iterator[Metric]:
+        db = self._db_pool_stats()
+        yield _gauge("db_pool_checked_out", "Connections checked out of the pool.", db.checked_out)
+        yield _gauge("db_pool_idle", "Idle connections in the pool.", db.idle)
+        yield _gauge("db_pool_overflow", "Overflow connections open.", db.overflow)
+        yield _counter("db_pool_checkouts", "Pool checkouts.", db.checkouts_total)
+        yield _counter(
+            "db_pool_checkout_timeouts",
+            "Checkouts that hit the pool timeout.",
+            db.checkout_timeouts_total,
+        )
+
+        bots = self._bot_pool_stats()
+        yield _gauge("bot_pool_in_flight", "Bot calls holding a worker slot.", bots.in_flight)
+        yield _gauge("bot_pool_queue_depth", "Bot calls waiting for a slot.", bots.queue_depth)
+        yield _counter(
+            "bot_pool_calls_rejected", "Bot calls shed by the pool.", bots.calls_rejected
+        )
+        yield _counter(
+            "bot_pool_calls_timed_out", "Bot calls over the timeout.", bots.calls_timed_out
+        )
+
+        hasher = self._password_hasher_stats()
+        yield _gauge("password_hash_in_flight", "Password hashes running.", hasher.in_flight)
+        yield _gauge("password_hash_queue_depth", "Password hashes waiting.", hasher.queue_depth)
+        yield _counter(
+            "password_hash_calls_completed", "Password hashes completed.", hasher.calls_completed
+        )
+
+
+def _gauge(name: str, documentation: str, value: float) -> GaugeMetricFamily:
+    return GaugeMetricFamily(name, documentation, value=value)
+
+
+def _counter(name: str, documentation: str, value: float) -> CounterMetricFamily:
+    return CounterMetricFamily(name, documentation, value=value)
@@ -1,6 +1,9 @@
+import asyncio
 import random
-from dataclasses import dataclass
+import re
+from collections.abc import AsyncIterator
 
+from app.services.bot_provider import BotReply
 from app.static_data.economy import SECRET_EXPOSURE_PROBABILITY
 
 _CANNED_REPLIES = (
@@ -10,24 +13,51 @@ _CANNED_REPLIES = (
     "Try probing instruction hierarchy instead of asking directly.",
     "You are getting warmer, but the protected token remains locked.",
 )
+_TOKEN_PATTERN = re.compile(r"\S+\s*")
 
 
-@dataclass(frozen=True)
-class MockBotReply:
-    """Mock bot response content and whether it leaked the secret."""
-
-    content: str
-    did_expose_secret: bool
-
-
-def get_mock_reply(secret: str) -> MockBotReply:
+def get_mock_reply(secret: str) -> BotReply:
     """Return a random mock reply with 20% uniform secret exposure probability."""
 
     should_expose_secret = random.random() < SECRET_EXPOSURE_PROBABILITY
     if should_expose_secret:
-        return MockBotReply(
+        return BotReply(
             content=f"Transmission leak detected. Protected token: {secret}",
             did_expose_secret=True,
         )
 
-    return MockBotReply(content=random.choice(_CANNED_REPLIES), did_expose_secret=False)
+    return BotReply(content=random.choice(_CANNED_REPLIES), did_expose_secret=False)
+
+
+async def stream_mock_reply(
+    reply: BotReply,
+    *,
+    token_delay_seconds: float,
+) -> AsyncIterator[str]:
+    """Yield reply content word by word, pausing between tokens like a real model."""
+
+    for index, match in enumerate(_TOKEN_PATTERN.finditer(reply.content)):
+        if index and token_delay_seconds > 0:
+            await asyncio.sleep(token_delay_seconds)
+        yield match.group(0)
+
+
+class MockBotProvider:
+    """Default bot provider that answers with canned replies and no network calls."""
+
+    def __init__(self, *, token_delay_seconds: float) -> None:
+        self._token_delay_seconds = token_delay_seconds
+
+    async def generate_reply(self, secret: str) -> BotReply:
+        """Return a random mock reply."""
+
+        return get_mock_reply(secret)
+
+    async def stream_reply(self, secret: str) -> AsyncIterator[str]:
+        """Stream a random mock reply with the configured inter-token delay."""
+
+        async for token in stream_mock_reply(
+            get_mock_reply(secret),
+            token_delay_seconds=self._token_delay_seconds,
+        ):
+            yield token
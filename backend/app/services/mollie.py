@@ -1,8 +1,12 @@
-from typing import TypedDict
+import asyncio
+import time
+from typing import Any, TypedDict
+from urllib.parse import quote
 
-from mollie.api.client import Client
+import httpx
 
 from app.config import settings
+from app.services.metrics import mollie_request_duration_seconds, mollie_requests_total
 
 
 class MollieCreatePaymentResult(TypedDict):
@@ -20,15 +24,12 @@ class MolliePaymentStatusResult(TypedDict):
     status: str
 
 
-def _create_client() -> Client:
-    """Build and configure the Mollie API client."""
+class MollieRequestError(RuntimeError):
+    """A failed Mollie API call, tagged with the kind of failure for metrics."""
 
-    if not settings.MOLLIE_API_KEY.strip():
-        raise ValueError("MOLLIE_API_KEY is not configured")
-
-    client = Client()
-    client.set_api_key(settings.MOLLIE_API_KEY)
-    return client
+    def __init__(self, outcome: str, message: str) -> None:
+        super().__init__(message)
+        self.outcome = outcome
 
 
 def _format_amount_cents(amount_cents: int) -> str:
@@ -37,7 +38,193 @@ def _format_amount_cents(amount_cents: int) -> str:
     return f"{amount_cents / 100:.2f}"
 
 
-def create_mollie_payment(
+class MollieClient:
+    """Async Mollie payments API adapter sharing one pooled keep-alive HTTP client.
+
+    The underlying `httpx.AsyncClient` is opened by the app lifespan (or lazily on first
+    use) and reused for every call, so requests reuse warm HTTP/2 connections instead
+    of paying a TLS handshake each time. Transport failures and error responses are
+    raised as `RuntimeError`, and a missing API key or malformed payment id as
+    `ValueError`.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        base_url: str,
+        timeout: httpx.Timeout,
+        limits: httpx.Limits,
+        http2: bool,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self._timeout = timeout
+        self._limits = limits
+        self._http2 = http2
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+
+    async def start(self) -> None:
+        """Open the pooled HTTP client if it is not open yet."""
+
+        self._open_client()
+
+    def _open_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self._timeout,
+                limits=self._limits,
+                http2=self._http2,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def create_payment(
+        self,
+        *,
+        amount_cents: int,
+        description: str,
+        redirect_url: str,
+        webhook_url: str,
+        metadata: dict[str, str],
+    ) -> MollieCreatePaymentResult:
+        """Create a Mollie payment and return only fields needed by the app."""
+
+        payment = await self._request(
+            "create_payment",
+            "POST",
+            "/payments",
+            json={
+                "amount": {
+                    "currency": "EUR",
+                    "value": _format_amount_cents(amount_cents),
+                },
+                "description": description,
+                "redirectUrl": redirect_url,
+                "webhookUrl": webhook_url,
+                "metadata": metadata,
+            },
+        )
+        try:
+            checkout_url = payment["_links"]["checkout"]["href"]
+        except (KeyError, TypeError):
+            raise RuntimeError("Mollie payment response has no checkout link") from None
+        return {
+            "mollie_payment_id": str(payment["id"]),
+            "checkout_url": str(checkout_url),
+            "status": str(payment["status"]),
+        }
+
+    async def get_payment(self, mollie_payment_id: str) -> MolliePaymentStatusResult:
+        """Fetch a Mollie payment and return its id and status.
+
+        Webhook-supplied ids are untrusted, so they must carry the `tr_` payment prefix
+        and are percent-encoded into the path, as the Mollie SDK did.
+        """
+
+        if not mollie_payment_id.startswith("tr_"):
+            raise ValueError(f"Invalid Mollie payment id {mollie_payment_id!r}")
+        payment = await self._request(
+            "get_payment", "GET", f"/payments/{quote(mollie_payment_id, safe='')}"
+        )
+        return {
+            "mollie_payment_id": str(payment["id"]),
+            "status": str(payment["status"]),
+        }
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        path: str,
+        *,
+        json: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Send one authenticated API request, record its latency and outcome, return its JSON."""
+
+        if not self.api_key.strip():
+            raise ValueError("MOLLIE_API_KEY is not configured")
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            payload = await self._send(method, path, json=json)
+            outcome = "ok"
+            return payload
+        except MollieRequestError as exc:
+            outcome = exc.outcome
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            mollie_request_duration_seconds.labels(operation).observe(time.perf_counter() - started)
+            mollie_requests_total.labels(operation, outcome).inc()
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        """Send one API request and return its decoded JSON body."""
+
+        try:
+            response = await self._open_client().request(
+                method,
+                path,
+                json=json,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            )
+        except httpx.HTTPError as exc:
+            raise MollieRequestError("transport_error", f"Mollie request failed: {exc!r}") from exc
+        if response.is_error:
+            raise MollieRequestError(
+                "http_error", f"Mollie returned HTTP {response.status_code} for {method} {path}"
+            )
+
+        try:
+            payload = response.json()
+        except ValueError as exc:
+            raise MollieRequestError(
+                "invalid_response", "Mollie returned a non-JSON response"
+            ) from exc
+        if not isinstance(payload, dict) or "id" not in payload or "status" not in payload:
+            raise MollieRequestError(
+                "invalid_response", "Mollie returned an unexpected payment payload"
+            )
+        return payload
+
+
+mollie_client = MollieClient(
+    api_key=settings.MOLLIE_API_KEY,
+    base_url=settings.MOLLIE_API_BASE_URL,
+    timeout=httpx.Timeout(
+        settings.MOLLIE_READ_TIMEOUT_SECONDS,
+        connect=settings.MOLLIE_CONNECT_TIMEOUT_SECONDS,
+        pool=settings.MOLLIE_POOL_TIMEOUT_SECONDS,
+    ),
+    limits=httpx.Limits(
+        max_connections=settings.MOLLIE_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.MOLLIE_MAX_KEEPALIVE_CONNECTIONS,
+    ),
+    http2=settings.MOLLIE_HTTP2,
+)
+
+
+async def create_mollie_payment(
     *,
     amount_cents: int,
     description: str,
@@ -45,34 +232,18 @@ def create_mollie_payment(
     webhook_url: str,
     metadata: dict[str, str],
 ) -> MollieCreatePaymentResult:
-    """Create a Mollie payment and return only fields needed by the app."""
-
-    client = _create_client()
-    payment = client.payments.create(
-        {
-            "amount": {
-                "currency": "EUR",
-                "value": _format_amount_cents(amount_cents),
-            },
-            "description": description,
-            "redirectUrl": redirect_url,
-            "webhookUrl": webhook_url,
-            "metadata": metadata,
-        }
+    """Create a Mollie payment through the process-wide client."""
+
+    return await mollie_client.create_payment(
+        amount_cents=amount_cents,
+        description=description,
+        redirect_url=redirect_url,
+        webhook_url=webhook_url,
+        metadata=metadata,
     )
-    return {
-        "mollie_payment_id": str(payment.id),
-        "checkout_url": str(payment.checkout_url),
-        "status": str(payment.status),
-    }
-
-
-def get_mollie_payment(mollie_payment_id: str) -> MolliePaymentStatusResult:
-    """Fetch a Mollie payment and return its id and status."""
-
-    client = _create_client()
-    payment = client.payments.get(mollie_payment_id)
-    return {
-        "mollie_payment_id": str(payment.id),
-        "status": str(payment.status),
-    }
+
+
+async def get_mollie_payment(mollie_payment_id: str) -> MolliePaymentStatusResult:
+    """Fetch a Mollie payment through the process-wide client."""
+
+    return await mollie_client.get_payment(mollie_payment_id)
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from app.config import settings
+from app.services.auth import hash_password, verify_password
+
+_T = TypeVar("_T")
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when too many password hashes are already waiting for a worker."""
+
+
+@dataclass(frozen=True)
+class PasswordHasherStats:
+    """Point-in-time view of password hashing executor usage."""
+
+    max_workers: int
+    max_queue_depth: int
+    bcrypt_rounds: int
+    in_flight: int
+    queue_depth: int
+    calls_completed: int
+    queue_wait_seconds_total: float
+    queue_wait_seconds_max: float
+
+
+class PasswordHasher:
+    """Run bcrypt on a bounded thread pool so hashing never blocks the event loop.
+
+    bcrypt releases the GIL while it works, so a small thread pool runs hashes beside
+    the loop without a process pool's pickling overhead. At most `max_workers` hashes run
+    at once, later calls wait in the executor queue (whose wait time is recorded), and
+    calls beyond `max_queue_depth` waiting ones are rejected instead of piling up.
+    """
+
+    def __init__(self, *, max_workers: int, max_queue_depth: int, bcrypt_rounds: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.bcrypt_rounds = bcrypt_rounds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._started = 0
+        self._completed = 0
+        self._queue_wait_seconds_total = 0.0
+        self._queue_wait_seconds_max = 0.0
+
+    async def hash(self, password: str) -> str:
+        """Hash a plaintext password with the configured bcrypt cost factor."""
+
+        return await self._run(lambda: hash_password(password, rounds=self.bcrypt_rounds))
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """Return whether a plaintext password matches a bcrypt hash."""
+
+        return await self._run(lambda: verify_password(password, password_hash))
+
+    def snapshot(self) -> PasswordHasherStats:
+        """Return current executor counters for health and metrics endpoints."""
+
+        with self._lock:
+            return PasswordHasherStats(
+                max_workers=self.max_workers,
+                max_queue_depth=self.max_queue_depth,
+                bcrypt_rounds=self.bcrypt_rounds,
+                in_flight=self._started - self._completed,
+                queue_depth=self._submitted - self._started,
+                calls_completed=self._completed,
+                queue_wait_seconds_total=self._queue_wait_seconds_total,
+                queue_wait_seconds_max=self._queue_wait_seconds_max,
+            )
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release the worker threads."""
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, call: Callable[[], _T]) -> _T:
+        """Queue one bcrypt call on the executor and record how long it waited."""
+
+        submitted_at = time.perf_counter()
+
+        def _timed_call() -> _T:
+            waited = time.perf_counter() - submitted_at
+            with self._lock:
+                self._started += 1
+                self._queue_wait_seconds_total += waited
+                self._queue_wait_seconds_max = max(self._queue_wait_seconds_max, waited)
+            try:
+                return call()
+            finally:
+                with self._lock:
+                    self._completed += 1
+
+        with self._lock:
+            if self._submitted - self._started >= self.max_queue_depth:
+                raise PasswordHasherBusyError("Password hashing queue is full")
+            self._submitted += 1
+        future = self._executor.submit(_timed_call)
+        future.add_done_callback(self._release_unstarted)
+        return await asyncio.wrap_future(future)
+
+    def _release_unstarted(self, future: Future[Any]) -> None:
+        """Free the queue slot of a call cancelled before any worker picked it up."""
+
+        # An executor future can only be cancelled while it is still queued, so a
+        # cancelled one never reached `_timed_call` and never counted as started.
+        if future.cancelled():
+            with self._lock:
+                self._submitted -= 1
+
+
+def _default_max_workers() -> int:
+    """Share the cores left after one event loop per server worker, since bcrypt is pure CPU."""
+
+    spare_cores = (os.cpu_count() or 2) - settings.server_worker_count
+    return max(1, spare_cores // settings.server_worker_count)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_MAX_WORKERS or _default_max_workers(),
+    max_queue_depth=settings.PASSWORD_HASH_MAX_QUEUE_DEPTH,
+    bcrypt_rounds=settings.BCRYPT_ROUNDS,
+)
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from datetime import datetime
+
+import pendulum
+from sqlalchemy import ColumnElement, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.challenges import Challenge
+from app.models.prize_pool_contributions import PrizePoolContribution
+
+logger = logging.getLogger(__name__)
+
+# Claim a batch of contributions (skipping rows another worker is folding), delete
+# them and add their totals to the owning challenges in one atomic statement. The
+# delete probes the primary key with the claimed id array instead of hash-joining
+# the whole queue table.
+_FOLD_CONTRIBUTIONS_SQL = text(
+    """
+    WITH claimed AS (
+        SELECT prize_pool_contribution_id
+        FROM prize_pool_contributions
+        ORDER BY prize_pool_contribution_id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    folded AS (
+        DELETE FROM prize_pool_contributions p
+        WHERE p.prize_pool_contribution_id = ANY (
+            ARRAY(SELECT prize_pool_contribution_id FROM claimed)
+        )
+        RETURNING p.challenge_id, p.amount_cents
+    ),
+    totals AS (
+        SELECT challenge_id, SUM(amount_cents) AS amount_cents, COUNT(*) AS folded_count
+        FROM folded
+        GROUP BY challenge_id
+    ),
+    updated AS (
+        UPDATE challenges c
+        SET prize_pool_cents = c.prize_pool_cents + totals.amount_cents,
+            updated_at = :now
+        FROM totals
+        WHERE c.challenge_id = totals.challenge_id
+    )
+    SELECT COALESCE(SUM(folded_count), 0) FROM totals
+    """
+)
+
+
+def effective_prize_pool_cents() -> ColumnElement[int]:
+    """Return folded pool cents plus pending contributions for the selected challenge."""
+
+    pending_cents = (
+        select(func.coalesce(func.sum(PrizePoolContribution.amount_cents), 0))
+        .where(PrizePoolContribution.challenge_id == Challenge.challenge_id)
+        .correlate(Challenge)
+        .scalar_subquery()
+    )
+    return (Challenge.prize_pool_cents + pending_cents).label("effective_prize_pool_cents")
+
+
+async def fold_prize_pool_contributions(
+    db: AsyncSession,
+    *,
+    batch_size: int,
+    now: datetime | None = None,
+) -> int:
+    """Fold one batch of pending contributions into challenges and return its size."""
+
+    result = await db.execute(
+        _FOLD_CONTRIBUTIONS_SQL,
+        {"batch_size": batch_size, "now": now or pendulum.now("UTC").naive()},
+    )
+    return int(result.scalar_one())
+
+
+async def run_prize_pool_folder(
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    interval_seconds: float,
+    batch_size: int,
+) -> None:
+    """Periodically fold contributions until cancelled, draining full batches eagerly."""
+
+    while True:
+        try:
+            async with session_factory() as db:
+                folded_count = await fold_prize_pool_contributions(db, batch_size=batch_size)
+                await db.commit()
+        except Exception:
+            logger.exception("Failed to fold prize pool contributions")
+            folded_count = 0
+
+        if folded_count < batch_size:
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,98 @@
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.metrics import (
+    BACKGROUND_ROUTE,
+    db_queries_total,
+    db_query_duration_seconds,
+    db_query_seconds_total,
+)
+
+_QUERY_STARTED_AT = "query_tracking_started_at"
+
+
+@dataclass
+class QueryStats:
+    """Statements executed, and time spent executing them, inside one tracking scope."""
+
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        """Count one executed statement."""
+
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def merge(self, other: "QueryStats") -> None:
+        """Add a nested scope's statements to this one."""
+
+        self.count += other.count
+        self.seconds += other.seconds
+        self.statements.update(other.statements)
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        """Return the statement executed most often and its count, if any ran."""
+
+        common = self.statements.most_common(1)
+        return common[0] if common else None
+
+
+_current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count statements executed in this context until the block exits.
+
+    Scopes nest: when the block exits its totals are added to the enclosing scope, so
+    a test can wrap a request that the app's own middleware also tracks.
+    """
+
+    stats = QueryStats()
+    parent = _current_query_stats.get()
+    token = _current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_query_stats.reset(token)
+        if parent is not None:
+            parent.merge(stats)
+
+
+def attach_query_tracking(engine: AsyncEngine) -> None:
+    """Time every statement the engine executes and count it against the current scope."""
+
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn: Any, *_: Any) -> None:
+    conn.info[_QUERY_STARTED_AT] = time.perf_counter()
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, *_: Any) -> None:
+    started_at = conn.info.pop(_QUERY_STARTED_AT, None)
+    if started_at is None:
+        return
+    elapsed = time.perf_counter() - started_at
+    db_query_duration_seconds.observe(elapsed)
+    stats = _current_query_stats.get()
+    if stats is None:
+        db_queries_total.labels(BACKGROUND_ROUTE).inc()
+        db_query_seconds_total.labels(BACKGROUND_ROUTE).inc(elapsed)
+        return
+    stats.record(statement, elapsed)
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Protocol, cast
+
+from sqlalchemy import Table, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.models.rate_limit_buckets import RateLimitBucket
+from app.services.metrics import rate_limited_requests_total
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceededError(Exception):
+    """Raised when a caller has no token left in one of a route's buckets."""
+
+    def __init__(self, policy_name: str, retry_after_seconds: float) -> None:
+        super().__init__(f"Rate limit '{policy_name}' exceeded")
+        self.policy_name = policy_name
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Token bucket allowing `burst` requests at once, refilled at `per_minute`."""
+
+    burst: int
+    per_minute: float
+
+    @property
+    def refill_per_second(self) -> float:
+        """Return how many tokens the bucket earns back per second."""
+
+        return self.per_minute / 60
+
+    @property
+    def full_refill_seconds(self) -> float:
+        """Return how long an empty bucket takes to fill up again."""
+
+        return self.burst / self.refill_per_second
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Outcome of taking one token: allowed, or how long until a token is available."""
+
+    allowed: bool
+    retry_after_seconds: float = 0.0
+
+
+class RateLimitBackend(Protocol):
+    """Storage for token buckets, keyed by policy name and caller identity."""
+
+    async def consume(self, key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+        """Take one token from the bucket if it has one."""
+        ...
+
+    async def prune(self, idle_seconds: float) -> int:
+        """Forget buckets untouched for `idle_seconds`, which must be full again by now."""
+        ...
+
+
+class InMemoryRateLimitBackend:
+    """Per-process buckets in a bounded LRU; only correct with a single server worker.
+
+    An evicted bucket starts full again, so `max_keys` should comfortably exceed the
+    number of callers active within a refill period.
+    """
+
+    def __init__(self, *, max_keys: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def consume(self, key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+        """Refill the bucket for the time since its last use, then take one token."""
+
+        now = self._clock()
+        tokens, updated_at = self._buckets.pop(key, (float(policy.burst), now))
+        tokens = min(float(policy.burst), tokens + (now - updated_at) * policy.refill_per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        if allowed:
+            return RateLimitDecision(allowed=True)
+        return RateLimitDecision(False, (1 - tokens) / policy.refill_per_second)
+
+    async def prune(self, idle_seconds: float) -> int:
+        """Drop buckets untouched for `idle_seconds` and return how many went."""
+
+        cutoff = self._clock() - idle_seconds
+        idle_keys = [key for key, (_, updated_at) in self._buckets.items() if updated_at < cutoff]
+        for key in idle_keys:
+            del self._buckets[key]
+        return len(idle_keys)
+
+    def clear(self) -> None:
+        """Forget every bucket."""
+
+        self._buckets.clear()
+
+
+class PostgresRateLimitBackend:
+    """Buckets in the `rate_limit_buckets` table, shared by every worker and replica.
+
+    Each check is one autocommitted upsert on its own pooled connection, outside any
+    request transaction, and uses the database clock so servers never disagree on
+    elapsed time. A denied upsert changes nothing and returns no row, so the retry
+    hint is the time to earn a whole token, an upper bound on the real wait.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+
+    async def consume(self, key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+        """Refill and take one token in a single conditional upsert."""
+
+        bucket = cast(Table, RateLimitBucket.__table__)
+        now = func.timezone("UTC", func.clock_timestamp())
+        insert_bucket = insert(bucket).values(
+            bucket_key=key, tokens=policy.burst - 1, updated_at=now
+        )
+        elapsed_seconds = func.greatest(
+            func.extract("epoch", insert_bucket.excluded.updated_at - bucket.c.updated_at), 0
+        )
+        refilled = func.least(
+            float(policy.burst), bucket.c.tokens + elapsed_seconds * policy.refill_per_second
+        )
+        take_token = insert_bucket.on_conflict_do_update(
+            index_elements=[bucket.c.bucket_key],
+            set_={"tokens": refilled - 1, "updated_at": insert_bucket.excluded.updated_at},
+            where=refilled >= 1,
+        ).returning(bucket.c.tokens)
+        async with self._engine.begin() as conn:
+            allowed = (await conn.execute(take_token)).first() is not None
+        if allowed:
+            return RateLimitDecision(allowed=True)
+        return RateLimitDecision(False, 1 / policy.refill_per_second)
+
+    async def prune(self, idle_seconds: float) -> int:
+        """Delete bucket rows untouched for `idle_seconds` and return how many went."""
+
+        cutoff = func.timezone("UTC", func.clock_timestamp()) - timedelta(seconds=idle_seconds)
+        async with self._engine.begin() as conn:
+            result = await conn.execute(
+                delete(RateLimitBucket).where(RateLimitBucket.updated_at < cutoff)
+            )
+        return result.rowcount
+
+
+class RateLimiter:
+    """Apply named token-bucket policies to caller identities before any request work."""
+
+    def __init__(
+        self,
+        *,
+        backend: RateLimitBackend,
+        policies: dict[str, RateLimitPolicy],
+        enabled: bool = True,
+    ) -> None:
+        self.backend = backend
+        self.policies = policies
+        self.enabled = enabled
+
+    async def hit(self, policy_name: str, identity: str) -> None:
+        """Take a token for `identity` or raise `RateLimitExceededError`.
+
+        Backend failures let the request through: an unavailable limiter must not take
+        the API down with it.
+        """
+
+        if not self.enabled:
+            return
+        policy = self.policies[policy_name]
+        try:
+            decision = await self.backend.consume(f"{policy_name}:{identity}", policy)
+        except (SQLAlchemyError, OSError):
+            logger.warning("Rate limit check for %s failed, allowing request", policy_name)
+            return
+        if not decision.allowed:
+            rate_limited_requests_total.labels(policy_name).inc()
+            raise RateLimitExceededError(policy_name, decision.retry_after_seconds)
+
+    async def prune(self) -> int:
+        """Drop buckets idle long enough that every policy would have refilled them."""
+
+        idle_seconds = max(policy.full_refill_seconds for policy in self.policies.values())
+        return await self.backend.prune(idle_seconds)
+
+
+def default_policies() -> dict[str, RateLimitPolicy]:
+    """Build the per-route policies from the RATE_LIMIT_* settings."""
+
+    return {
+        "register_ip": RateLimitPolicy(
+            settings.RATE_LIMIT_REGISTER_IP_BURST, settings.RATE_LIMIT_REGISTER_IP_PER_MINUTE
+        ),
+        "login_ip": RateLimitPolicy(
+            settings.RATE_LIMIT_LOGIN_IP_BURST, settings.RATE_LIMIT_LOGIN_IP_PER_MINUTE
+        ),
+        "login_email": RateLimitPolicy(
+            settings.RATE_LIMIT_LOGIN_EMAIL_BURST, settings.RATE_LIMIT_LOGIN_EMAIL_PER_MINUTE
+        ),
+        "send_message_user": RateLimitPolicy(
+            settings.RATE_LIMIT_SEND_MESSAGE_USER_BURST,
+            settings.RATE_LIMIT_SEND_MESSAGE_USER_PER_MINUTE,
+        ),
+        "send_message_ip": RateLimitPolicy(
+            settings.RATE_LIMIT_SEND_MESSAGE_IP_BURST,
+            settings.RATE_LIMIT_SEND_MESSAGE_IP_PER_MINUTE,
+        ),
+    }
+
+
+async def run_rate_limit_pruner(limiter: RateLimiter, *, interval_seconds: float) -> None:
+    """Periodically drop fully refilled buckets until cancelled."""
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await limiter.prune()
+        except Exception:
+            logger.exception("Failed to prune rate limit buckets")
+
+
+rate_limiter = RateLimiter(
+    backend=InMemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MEMORY_MAX_KEYS),
+    policies=default_policies(),
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
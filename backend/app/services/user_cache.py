@@ -0,0 +1,99 @@
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, UOWTransaction
+
+from app.config import settings
+from app.models.users import User
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Immutable identity of the caller, safe to share across requests and sessions."""
+
+    user_id: int
+    reference: uuid.UUID
+    email: str | None
+    timezone_id: int
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUser":
+        """Snapshot the public identity fields of a loaded user row."""
+
+        return cls(
+            user_id=user.user_id,
+            reference=user.reference,
+            email=user.email,
+            timezone_id=user.timezone_id,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class AuthenticatedUserCache:
+    """Bounded LRU of resolved identities with a TTL so other workers' edits age out."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[int, tuple[float, AuthenticatedUser]] = OrderedDict()
+
+    def get(self, user_id: int) -> AuthenticatedUser | None:
+        """Return a live cached identity and mark it most recently used."""
+
+        cached = self._entries.get(user_id)
+        if cached is None:
+            return None
+        expires_at, user = cached
+        if self._clock() >= expires_at:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return user
+
+    def put(self, user: AuthenticatedUser) -> None:
+        """Cache an identity, evicting the least recently used one when full."""
+
+        self._entries[user.user_id] = (self._clock() + self.ttl_seconds, user)
+        self._entries.move_to_end(user.user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget one identity so the next request reloads it."""
+
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Forget every cached identity."""
+
+        self._entries.clear()
+
+
+authenticated_user_cache = AuthenticatedUserCache(
+    max_entries=settings.AUTH_USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_changed_users(session: Session, flush_context: UOWTransaction) -> None:
+    """Drop cached identities for any user row this process updates or deletes."""
+
+    for instance in (*session.dirty, *session.deleted):
+        if isinstance(instance, User):
+            authenticated_user_cache.invalidate(instance.user_id)
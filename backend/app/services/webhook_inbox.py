@@ -0,0 +1,338 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import StrEnum
+
+import pendulum
+from sqlalchemy import ColumnElement, delete, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.credit_purchases import CreditPurchase
+from app.models.credit_transactions import CreditTransaction
+from app.models.mollie_webhook_inbox import MollieWebhookInboxEntry
+from app.models.payments import Payment
+from app.routers.helpers import get_next_sequence_value
+from app.services.credits import get_or_create_wallet_for_update
+from app.services.mollie import get_mollie_payment
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+_MAX_RETRY_DELAY_SECONDS = 300.0
+
+
+class WebhookSource(StrEnum):
+    """Which local table a Mollie webhook notification refers to."""
+
+    PAYMENT = "payment"
+    CREDIT_PURCHASE = "credit_purchase"
+
+
+# Persist a notification only when the payment id is known locally, coalescing
+# repeats for a pending id into the existing row. Returns no row for unknown ids.
+_ENQUEUE_SQL = """
+    INSERT INTO mollie_webhook_inbox (
+        source, mollie_payment_id, notification_count, attempts,
+        received_at, last_received_at, available_at
+    )
+    SELECT :source, :mollie_payment_id, 1, 0, :now, :now, :now
+    WHERE EXISTS (SELECT 1 FROM {table} WHERE mollie_payment_id = :mollie_payment_id)
+    ON CONFLICT (source, mollie_payment_id) DO UPDATE
+    SET notification_count = mollie_webhook_inbox.notification_count + 1,
+        last_received_at = EXCLUDED.last_received_at
+    RETURNING notification_count
+"""
+_ENQUEUE_STATEMENTS = {
+    WebhookSource.PAYMENT: text(_ENQUEUE_SQL.format(table="payments")),
+    WebhookSource.CREDIT_PURCHASE: text(_ENQUEUE_SQL.format(table="credit_purchases")),
+}
+
+# Lease a batch of due rows (skipping rows another worker holds) by pushing their
+# availability past the lease, so a crashed worker's rows become due again.
+_CLAIM_SQL = text(
+    """
+    WITH claimed AS (
+        SELECT source, mollie_payment_id
+        FROM mollie_webhook_inbox
+        WHERE available_at <= :now
+        ORDER BY available_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE mollie_webhook_inbox i
+    SET available_at = :lease_until,
+        attempts = i.attempts + 1
+    FROM claimed
+    WHERE i.source = claimed.source
+      AND i.mollie_payment_id = claimed.mollie_payment_id
+    RETURNING i.source, i.mollie_payment_id, i.notification_count, i.attempts
+    """
+)
+
+_inbox_wakeup = asyncio.Event()
+
+
+@dataclass(frozen=True)
+class ClaimedNotification:
+    """One leased inbox row and the notification count it was claimed at."""
+
+    source: WebhookSource
+    mollie_payment_id: str
+    notification_count: int
+    attempts: int
+
+
+async def enqueue_webhook(db: AsyncSession, source: WebhookSource, mollie_payment_id: str) -> bool:
+    """Persist a webhook notification and return whether the payment id is known."""
+
+    result = await db.execute(
+        _ENQUEUE_STATEMENTS[source],
+        {
+            "source": source.value,
+            "mollie_payment_id": mollie_payment_id,
+            "now": pendulum.now("UTC").naive(),
+        },
+    )
+    return result.first() is not None
+
+
+def notify_webhook_inbox() -> None:
+    """Wake the drain worker so freshly committed notifications are handled promptly."""
+
+    _inbox_wakeup.set()
+
+
+async def apply_payment_status(db: AsyncSession, mollie_payment_id: str, status: str) -> None:
+    """Persist the latest Mollie status on a challenge attempt payment."""
+
+    result = await db.execute(
+        select(Payment).where(Payment.mollie_payment_id == mollie_payment_id).with_for_update()
+    )
+    payment = result.scalars().first()
+    if payment is not None and payment.status != status:
+        payment.status = status
+        payment.updated_at = pendulum.now("UTC").naive()
+
+
+async def apply_credit_purchase_status(
+    db: AsyncSession,
+    mollie_payment_id: str,
+    status: str,
+) -> None:
+    """Persist the latest Mollie status on a purchase and credit the wallet once on paid."""
+
+    result = await db.execute(
+        select(CreditPurchase)
+        .where(CreditPurchase.mollie_payment_id == mollie_payment_id)
+        .with_for_update()
+    )
+    purchase = result.scalars().first()
+    if purchase is None or purchase.status == status:
+        return
+
+    now = pendulum.now("UTC").naive()
+    if purchase.status != "paid" and status == "paid":
+        wallet = await get_or_create_wallet_for_update(db, purchase.user_id)
+        wallet.balance_credits += purchase.credits_purchased
+        wallet.updated_at = now
+
+        db.add(
+            CreditTransaction(
+                credit_transaction_id=await get_next_sequence_value(
+                    db, "credit_transaction_id_seq"
+                ),
+                user_id=purchase.user_id,
+                challenge_id=None,
+                credit_purchase_id=purchase.credit_purchase_id,
+                delta_credits=purchase.credits_purchased,
+                transaction_type="purchase",
+                created_at=now,
+            )
+        )
+
+    purchase.status = status
+    purchase.updated_at = now
+
+
+_STATUS_APPLIERS: dict[WebhookSource, Callable[[AsyncSession, str, str], Awaitable[None]]] = {
+    WebhookSource.PAYMENT: apply_payment_status,
+    WebhookSource.CREDIT_PURCHASE: apply_credit_purchase_status,
+}
+
+
+async def claim_webhook_notifications(
+    db: AsyncSession,
+    *,
+    batch_size: int,
+    lease_seconds: float,
+    now: datetime | None = None,
+) -> list[ClaimedNotification]:
+    """Lease up to `batch_size` due notifications for processing."""
+
+    now = now or pendulum.now("UTC").naive()
+    result = await db.execute(
+        _CLAIM_SQL,
+        {
+            "now": now,
+            "lease_until": now + timedelta(seconds=lease_seconds),
+            "batch_size": batch_size,
+        },
+    )
+    return [
+        ClaimedNotification(WebhookSource(source), mollie_payment_id, count, attempts)
+        for source, mollie_payment_id, count, attempts in result.tuples()
+    ]
+
+
+def _entry_filter(notification: ClaimedNotification) -> tuple[ColumnElement[bool], ...]:
+    """Match the inbox row a claimed notification came from."""
+
+    return (
+        MollieWebhookInboxEntry.source == notification.source.value,
+        MollieWebhookInboxEntry.mollie_payment_id == notification.mollie_payment_id,
+    )
+
+
+async def _complete_notification(db: AsyncSession, notification: ClaimedNotification) -> None:
+    """Remove a processed row, or make it due again if newer notifications arrived."""
+
+    result = await db.execute(
+        delete(MollieWebhookInboxEntry)
+        .where(
+            *_entry_filter(notification),
+            MollieWebhookInboxEntry.notification_count == notification.notification_count,
+        )
+        .returning(MollieWebhookInboxEntry.mollie_payment_id)
+    )
+    if result.first() is None:
+        await db.execute(
+            update(MollieWebhookInboxEntry)
+            .where(*_entry_filter(notification))
+            .values(available_at=pendulum.now("UTC").naive(), attempts=0)
+        )
+
+
+async def _retry_notification(
+    db: AsyncSession,
+    notification: ClaimedNotification,
+    *,
+    max_attempts: int,
+) -> None:
+    """Back off a failed notification, or drop it once it has used every attempt."""
+
+    if notification.attempts >= max_attempts:
+        logger.error(
+            "Dropping Mollie webhook for %s %s after %d attempts",
+            notification.source.value,
+            notification.mollie_payment_id,
+            notification.attempts,
+        )
+        await db.execute(delete(MollieWebhookInboxEntry).where(*_entry_filter(notification)))
+        return
+
+    delay_seconds = min(2.0**notification.attempts, _MAX_RETRY_DELAY_SECONDS)
+    await db.execute(
+        update(MollieWebhookInboxEntry)
+        .where(*_entry_filter(notification))
+        .values(available_at=pendulum.now("UTC").naive() + timedelta(seconds=delay_seconds))
+    )
+
+
+async def process_webhook_notification(
+    session_factory: SessionFactory,
+    notification: ClaimedNotification,
+    *,
+    max_attempts: int,
+) -> None:
+    """Fetch one payment from Mollie and apply its status, then settle the inbox row."""
+
+    try:
+        mollie_payment = await get_mollie_payment(notification.mollie_payment_id)
+    except (ValueError, RuntimeError) as exc:
+        logger.warning(
+            "Mollie status fetch failed for %s %s: %s",
+            notification.source.value,
+            notification.mollie_payment_id,
+            exc,
+        )
+        async with session_factory() as db:
+            await _retry_notification(db, notification, max_attempts=max_attempts)
+            await db.commit()
+        return
+
+    async with session_factory() as db:
+        await _STATUS_APPLIERS[notification.source](
+            db, notification.mollie_payment_id, mollie_payment["status"]
+        )
+        await _complete_notification(db, notification)
+        await db.commit()
+
+
+async def drain_webhook_inbox_batch(
+    session_factory: SessionFactory,
+    *,
+    batch_size: int,
+    concurrency: int,
+    lease_seconds: float,
+    max_attempts: int,
+) -> int:
+    """Claim one batch of due notifications, process them concurrently and return the count."""
+
+    async with session_factory() as db:
+        notifications = await claim_webhook_notifications(
+            db, batch_size=batch_size, lease_seconds=lease_seconds
+        )
+        await db.commit()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _process(notification: ClaimedNotification) -> None:
+        async with semaphore:
+            try:
+                await process_webhook_notification(
+                    session_factory, notification, max_attempts=max_attempts
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to process Mollie webhook for %s %s",
+                    notification.source.value,
+                    notification.mollie_payment_id,
+                )
+
+    await asyncio.gather(*(_process(notification) for notification in notifications))
+    return len(notifications)
+
+
+async def run_webhook_inbox_drainer(
+    session_factory: SessionFactory,
+    *,
+    interval_seconds: float,
+    batch_size: int,
+    concurrency: int,
+    lease_seconds: float,
+    max_attempts: int,
+) -> None:
+    """Drain the inbox until cancelled, waking early when a webhook is enqueued."""
+
+    while True:
+        _inbox_wakeup.clear()
+        try:
+            processed_count = await drain_webhook_inbox_batch(
+                session_factory,
+                batch_size=batch_size,
+                concurrency=concurrency,
+                lease_seconds=lease_seconds,
+                max_attempts=max_attempts,
+            )
+        except Exception:
+            logger.exception("Failed to drain Mollie webhook inbox")
+            processed_count = 0
+
+        if processed_count < batch_size:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(_inbox_wakeup.wait(), timeout=interval_seconds)
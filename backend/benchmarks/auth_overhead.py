@@ -0,0 +1,111 @@
+"""Measure per-request authentication overhead with and without the auth caches.
+
+Times token decoding alone, then the full `get_current_user` dependency against a
+benchmark database, both cold (token and identity caches cleared before each call)
+and warm (both caches hit):
+
+    uv run python -m benchmarks.auth_overhead --iterations 20000
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies import get_current_user
+from app.services.auth import create_access_token, decode_access_token, verified_token_cache
+from app.services.user_cache import authenticated_user_cache
+from benchmarks.common import (
+    LatencySummary,
+    create_benchmark_engine,
+    seed_attackers,
+    summarize_latencies,
+)
+
+
+def time_sync(label: str, call: Callable[[], object], iterations: int) -> LatencySummary:
+    """Time a synchronous call in a tight loop."""
+
+    samples: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return summarize_latencies(label, samples)
+
+
+async def time_async(
+    label: str,
+    call: Callable[[], Awaitable[object]],
+    iterations: int,
+    before_each: Callable[[], None] | None = None,
+) -> LatencySummary:
+    """Time an awaitable call in a tight loop, optionally resetting state before each."""
+
+    samples: list[float] = []
+    for _ in range(iterations):
+        if before_each is not None:
+            before_each()
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return summarize_latencies(label, samples)
+
+
+def _clear_auth_caches() -> None:
+    """Reset both caches so the next call pays full verification and lookup cost."""
+
+    verified_token_cache.clear()
+    authenticated_user_cache.clear()
+
+
+async def main(iterations: int) -> None:
+    """Report decode-only and end-to-end dependency latency before and after caching."""
+
+    token = create_access_token(user_id=1, email="bench@example.com")
+    print(
+        time_sync(
+            "decode_access_token", lambda: decode_access_token(token), iterations
+        ).format_row()
+    )
+    verified_token_cache.decode(token)
+    print(
+        time_sync(
+            "verified_token_cache hit", lambda: verified_token_cache.decode(token), iterations
+        ).format_row()
+    )
+
+    engine = await create_benchmark_engine()
+    try:
+        [(_, user_id)] = await seed_attackers(engine, 1)
+        credentials = HTTPAuthorizationCredentials(
+            scheme="Bearer",
+            credentials=create_access_token(user_id=user_id, email="bench@example.com"),
+        )
+        async with AsyncSession(engine) as db:
+            db_iterations = max(1, iterations // 10)
+            cold = await time_async(
+                "get_current_user cold",
+                lambda: get_current_user(credentials, db),
+                db_iterations,
+                before_each=_clear_auth_caches,
+            )
+            print(cold.format_row())
+            warm = await time_async(
+                "get_current_user warm",
+                lambda: get_current_user(credentials, db),
+                db_iterations,
+            )
+            print(warm.format_row())
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.iterations))
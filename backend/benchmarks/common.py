@@ -0,0 +1,130 @@
+import os
+import statistics
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+import pendulum
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.config import settings
+from app.database import init_db_schema
+from app.main import seed_challenges, seed_timezones
+from app.models.conversations import Conversation
+from app.models.credit_wallets import CreditWallet
+from app.models.users import User
+from app.routers.helpers import get_next_sequence_value
+from app.services.query_tracking import attach_query_tracking
+
+_BASE_URL = os.environ.get("BENCH_DATABASE_BASE_URL", settings.DATABASE_URL.rsplit("/", 1)[0])
+BENCH_DATABASE_NAME = "app_db_bench"
+
+
+@dataclass(frozen=True)
+class LatencySummary:
+    """Latency percentiles for one benchmarked code path, in milliseconds."""
+
+    label: str
+    samples: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    def format_row(self) -> str:
+        """Render the summary as one aligned report line."""
+
+        return (
+            f"{self.label:<28} n={self.samples:<6} mean={self.mean_ms:8.3f}ms "
+            f"p50={self.p50_ms:8.3f}ms p95={self.p95_ms:8.3f}ms p99={self.p99_ms:8.3f}ms"
+        )
+
+
+def summarize_latencies(label: str, samples_seconds: list[float]) -> LatencySummary:
+    """Compute mean and tail percentiles from raw second-based samples."""
+
+    if not samples_seconds:
+        return LatencySummary(label, 0, 0.0, 0.0, 0.0, 0.0)
+
+    samples_ms = sorted(sample * 1000 for sample in samples_seconds)
+    if len(samples_ms) == 1:
+        only = samples_ms[0]
+        return LatencySummary(label, 1, only, only, only, only)
+
+    cut_points = statistics.quantiles(samples_ms, n=100, method="inclusive")
+    return LatencySummary(
+        label=label,
+        samples=len(samples_ms),
+        mean_ms=statistics.fmean(samples_ms),
+        p50_ms=cut_points[49],
+        p95_ms=cut_points[94],
+        p99_ms=cut_points[98],
+    )
+
+
+async def create_benchmark_engine(**engine_options: Any) -> AsyncEngine:
+    """Recreate the benchmark database, apply the schema and seed static rows.
+
+    `engine_options` are passed to `create_async_engine`, e.g. to shrink the pool.
+    """
+
+    admin_engine = create_async_engine(f"{_BASE_URL}/postgres", isolation_level="AUTOCOMMIT")
+    async with admin_engine.connect() as conn:
+        await conn.execute(text(f"DROP DATABASE IF EXISTS {BENCH_DATABASE_NAME}"))
+        await conn.execute(text(f"CREATE DATABASE {BENCH_DATABASE_NAME}"))
+    await admin_engine.dispose()
+
+    engine = create_async_engine(f"{_BASE_URL}/{BENCH_DATABASE_NAME}", echo=False, **engine_options)
+    attach_query_tracking(engine)
+    async with AsyncSession(engine) as session:
+        await init_db_schema(session)
+        await seed_timezones(session)
+        await seed_challenges(session)
+    return engine
+
+
+async def seed_attackers(engine: AsyncEngine, attacker_count: int) -> list[tuple[int, int]]:
+    """Create funded users with one conversation each on the first challenge.
+
+    Returns `(conversation_id, user_id)` pairs.
+    """
+
+    now = pendulum.now("UTC").naive()
+    attackers: list[tuple[int, int]] = []
+    async with AsyncSession(engine) as db:
+        for index in range(attacker_count):
+            user_id = await get_next_sequence_value(db, "user_id_seq")
+            conversation_id = await get_next_sequence_value(db, "conversation_id_seq")
+            db.add(
+                User(
+                    user_id=user_id,
+                    reference=uuid.uuid4(),
+                    timezone_id=1,
+                    email=f"bench-{index}-{user_id}@example.com",
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+            await db.flush()
+            db.add(
+                CreditWallet(
+                    credit_wallet_id=await get_next_sequence_value(db, "credit_wallet_id_seq"),
+                    user_id=user_id,
+                    balance_credits=10_000_000,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+            db.add(
+                Conversation(
+                    conversation_id=conversation_id,
+                    user_id=user_id,
+                    challenge_id=1,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+            attackers.append((conversation_id, user_id))
+        await db.commit()
+    return attackers
@@ -0,0 +1,261 @@
+"""Local stand-in for the Mollie payments API, for offline payment benchmarks.
+
+Implements `POST /v2/payments` and `GET /v2/payments/{id}` with configurable latency,
+injected failures and a settle step that moves each payment from `open` to a weighted
+final status and then posts `id=<payment id>` to the payment's webhook URL, like Mollie.
+
+Run it standalone and point the backend at it:
+
+    uv run python -m benchmarks.fake_mollie --port 8765 --settle-after 500:0.5
+    MOLLIE_API_BASE_URL=http://localhost:8765/v2 MOLLIE_API_KEY=test_fake uv run fastapi dev
+
+or mount `FakeMollie(...).app` in-process with `httpx.ASGITransport` (see
+`benchmarks.payment_throughput`).
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """Log-normal delay given by its median; a zero spread means a fixed delay."""
+
+    median_ms: float = 0.0
+    sigma: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        """Parse `median_ms[:sigma]`, e.g. `120:0.4`."""
+
+        median_ms, _, sigma = spec.partition(":")
+        return cls(float(median_ms), float(sigma or 0.0))
+
+    def sample_seconds(self, rng: random.Random) -> float:
+        """Draw one delay in seconds."""
+
+        if self.median_ms <= 0:
+            return 0.0
+        if self.sigma <= 0:
+            return self.median_ms / 1000
+        return rng.lognormvariate(math.log(self.median_ms), self.sigma) / 1000
+
+
+@dataclass(frozen=True)
+class FakeMollieConfig:
+    """Behaviour knobs for the fake Mollie service."""
+
+    create_latency: LatencyDistribution = LatencyDistribution()
+    get_latency: LatencyDistribution = LatencyDistribution()
+    create_failure_rate: float = 0.0
+    get_failure_rate: float = 0.0
+    settle_after: LatencyDistribution = LatencyDistribution()
+    outcomes: tuple[tuple[str, float], ...] = (("paid", 1.0),)
+    webhook_attempts: int = 3
+    seed: int | None = None
+
+
+@dataclass
+class FakeMollieStats:
+    """Counters describing what the fake service has served so far."""
+
+    payments_created: int = 0
+    payments_fetched: int = 0
+    injected_failures: int = 0
+    webhooks_delivered: int = 0
+    webhooks_failed: int = 0
+    final_statuses: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class _FakePayment:
+    payment: dict[str, Any]
+    webhook_url: str | None
+
+
+class FakeMollie:
+    """In-memory Mollie payments API that settles payments and fires webhooks."""
+
+    def __init__(
+        self,
+        config: FakeMollieConfig,
+        *,
+        webhook_transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.config = config
+        self.stats = FakeMollieStats()
+        self._rng = random.Random(config.seed)
+        self._payments: dict[str, _FakePayment] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._webhook_transport = webhook_transport
+        self._webhook_client: httpx.AsyncClient | None = None
+        self.app = self._build_app()
+
+    async def drain(self) -> None:
+        """Wait until every scheduled settle and webhook delivery has finished."""
+
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Cancel pending settles and close the webhook HTTP client."""
+
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._webhook_client is not None:
+            await self._webhook_client.aclose()
+            self._webhook_client = None
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Mollie")
+        app.add_api_route("/v2/payments", self._create_payment, methods=["POST"])
+        app.add_api_route("/v2/payments/{payment_id}", self._get_payment, methods=["GET"])
+        app.add_api_route("/checkout/{payment_id}", self._checkout, methods=["GET"])
+        return app
+
+    async def _create_payment(self, request: Request) -> JSONResponse:
+        """Create an `open` payment and schedule its settle step."""
+
+        failure = await self._simulate_call(
+            self.config.create_latency, self.config.create_failure_rate
+        )
+        if failure is not None:
+            return failure
+
+        body = await request.json()
+        payment_id = f"tr_{uuid.uuid4().hex[:10]}"
+        payment = {
+            "resource": "payment",
+            "id": payment_id,
+            "mode": "test",
+            "status": "open",
+            "amount": body.get("amount"),
+            "description": body.get("description"),
+            "redirectUrl": body.get("redirectUrl"),
+            "webhookUrl": body.get("webhookUrl"),
+            "metadata": body.get("metadata"),
+            "_links": {"checkout": {"href": f"{request.base_url}checkout/{payment_id}"}},
+        }
+        self._payments[payment_id] = _FakePayment(payment, body.get("webhookUrl"))
+        self.stats.payments_created += 1
+
+        task = asyncio.create_task(self._settle(payment_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return JSONResponse(payment, status_code=201)
+
+    async def _get_payment(self, payment_id: str) -> JSONResponse:
+        """Return the current state of one payment."""
+
+        failure = await self._simulate_call(self.config.get_latency, self.config.get_failure_rate)
+        if failure is not None:
+            return failure
+
+        stored = self._payments.get(payment_id)
+        if stored is None:
+            return _error_response(404, "Not Found", f"No payment exists with token {payment_id}.")
+        self.stats.payments_fetched += 1
+        return JSONResponse(stored.payment)
+
+    async def _checkout(self, payment_id: str) -> JSONResponse:
+        """Stand-in for the hosted checkout page."""
+
+        return JSONResponse({"payment_id": payment_id})
+
+    async def _simulate_call(
+        self,
+        latency: LatencyDistribution,
+        failure_rate: float,
+    ) -> JSONResponse | None:
+        """Sleep for a sampled latency and maybe return an injected 503."""
+
+        delay = latency.sample_seconds(self._rng)
+        if delay:
+            await asyncio.sleep(delay)
+        if failure_rate and self._rng.random() < failure_rate:
+            self.stats.injected_failures += 1
+            return _error_response(503, "Service Unavailable", "Injected failure")
+        return None
+
+    async def _settle(self, payment_id: str) -> None:
+        """Move a payment to its final status after a delay and notify its webhook."""
+
+        await asyncio.sleep(self.config.settle_after.sample_seconds(self._rng))
+        statuses = [status for status, _ in self.config.outcomes]
+        weights = [weight for _, weight in self.config.outcomes]
+        final_status = self._rng.choices(statuses, weights)[0]
+
+        stored = self._payments[payment_id]
+        stored.payment["status"] = final_status
+        self.stats.final_statuses[final_status] = self.stats.final_statuses.get(final_status, 0) + 1
+        if stored.webhook_url:
+            await self._deliver_webhook(stored.webhook_url, payment_id)
+
+    async def _deliver_webhook(self, webhook_url: str, payment_id: str) -> None:
+        """POST the payment id to the webhook, retrying on failures like Mollie does."""
+
+        if self._webhook_client is None:
+            self._webhook_client = httpx.AsyncClient(transport=self._webhook_transport)
+        for attempt in range(self.config.webhook_attempts):
+            try:
+                response = await self._webhook_client.post(webhook_url, data={"id": payment_id})
+                if response.is_success:
+                    self.stats.webhooks_delivered += 1
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.05 * 2**attempt)
+        self.stats.webhooks_failed += 1
+
+
+def _error_response(status: int, title: str, detail: str) -> JSONResponse:
+    """Build a Mollie-shaped error body."""
+
+    return JSONResponse({"status": status, "title": title, "detail": detail}, status_code=status)
+
+
+def _parse_outcomes(spec: str) -> tuple[tuple[str, float], ...]:
+    """Parse `paid=0.9,failed=0.05,expired=0.05` into weighted outcomes."""
+
+    outcomes = []
+    for item in spec.split(","):
+        status, _, weight = item.partition("=")
+        outcomes.append((status.strip(), float(weight or 1.0)))
+    return tuple(outcomes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--create-latency", default="120:0.4", help="median_ms[:sigma]")
+    parser.add_argument("--get-latency", default="60:0.3", help="median_ms[:sigma]")
+    parser.add_argument("--create-failure-rate", type=float, default=0.0)
+    parser.add_argument("--get-failure-rate", type=float, default=0.0)
+    parser.add_argument("--settle-after", default="500:0.5", help="median_ms[:sigma]")
+    parser.add_argument("--outcomes", default="paid=1", help="status=weight,...")
+    parser.add_argument("--seed", type=int, default=None)
+    arguments = parser.parse_args()
+    fake = FakeMollie(
+        FakeMollieConfig(
+            create_latency=LatencyDistribution.parse(arguments.create_latency),
+            get_latency=LatencyDistribution.parse(arguments.get_latency),
+            create_failure_rate=arguments.create_failure_rate,
+            get_failure_rate=arguments.get_failure_rate,
+            settle_after=LatencyDistribution.parse(arguments.settle_after),
+            outcomes=_parse_outcomes(arguments.outcomes),
+            seed=arguments.seed,
+        )
+    )
+    uvicorn.run(fake.app, host=arguments.host, port=arguments.port)
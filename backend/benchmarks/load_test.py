@@ -0,0 +1,412 @@
+"""Drive a running backend with the full attack economy and report what it sustains.
+
+Registers users over HTTP, funds their wallets through credit purchases settled by
+`benchmarks.fake_mollie`, opens a conversation per user and challenge, then fires
+attack messages at a fixed open-loop rate (Poisson arrivals) with a Zipf skew across
+challenges. Reports throughput, p50/p95/p99, error and 402 rates per endpoint, and
+DB pool saturation sampled from `GET /health/db/pool` while messages are in flight.
+
+Against the docker-compose Postgres, in three shells:
+
+    docker compose up -d db
+    uv run python -m benchmarks.fake_mollie --port 8765
+    MOLLIE_API_BASE_URL=http://localhost:8765/v2 MOLLIE_API_KEY=test_fake \\
+        MOLLIE_WEBHOOK_BASE_URL=http://localhost:8000 RATE_LIMIT_ENABLED=false \\
+        uv run python -m app.server
+    uv run python -m benchmarks.load_test --users 200 --rate 100 --seconds 60 --skew 1.1
+
+Lower `--credits` below `--rate * --seconds / --users` message costs to exercise the
+402 path. With several server workers each pool sample describes one worker. Every
+simulated user shares the driver's IP, so the per-IP rate limits are switched off
+above; leave them on to measure the limiter itself.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from app.static_data.economy import CENTS_PER_CREDIT
+from benchmarks.common import summarize_latencies
+
+_PASSWORD = "load-test-password"
+
+
+@dataclass
+class EndpointStats:
+    """Latencies and status codes recorded for one endpoint during one phase."""
+
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter[int] = field(default_factory=Counter)
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+    @property
+    def errors(self) -> int:
+        """Transport failures (status 0) and 5xx responses."""
+
+        return sum(count for status, count in self.statuses.items() if status == 0 or status >= 500)
+
+
+@dataclass
+class PoolSample:
+    """One `/health/db/pool` reading, excluding the probe's own connection."""
+
+    checked_out: int
+    capacity: int
+    checkout_timeouts_total: int
+    checkout_wait_seconds_max: float
+    server_connections: int
+
+
+@dataclass
+class LoadUser:
+    """A registered user, its bearer headers and its conversation per challenge."""
+
+    headers: dict[str, str]
+    conversations: dict[int, int] = field(default_factory=dict)
+
+
+class LoadRecorder:
+    """Collect per-endpoint stats across all phases of a run."""
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.phase_seconds: dict[str, float] = {}
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        label: str,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> httpx.Response | None:
+        """Send one request, recording its latency and status under `label`."""
+
+        stats = self.endpoints.setdefault(label, EndpointStats())
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            stats.statuses[0] += 1
+            return None
+        stats.latencies.append(time.perf_counter() - started)
+        stats.statuses[response.status_code] += 1
+        return response
+
+    def report(self, phases: dict[str, str]) -> list[str]:
+        """Render one line per endpoint, with throughput over its phase's duration."""
+
+        lines = []
+        for label, stats in self.endpoints.items():
+            seconds = self.phase_seconds.get(phases.get(label, ""), 0.0)
+            throughput = stats.requests / seconds if seconds else 0.0
+            requests = stats.requests or 1
+            lines.append(
+                f"{summarize_latencies(label, stats.latencies).format_row()} "
+                f"rps={throughput:8.1f} errors={stats.errors / requests:6.2%} "
+                f"402={stats.statuses[402] / requests:6.2%}"
+            )
+        return lines
+
+
+def challenge_weights(challenge_ids: list[int], skew: float) -> list[float]:
+    """Zipf weights: the first challenge is the hottest, 0 spreads load evenly."""
+
+    return [1 / rank**skew for rank in range(1, len(challenge_ids) + 1)]
+
+
+def summarize_pool(samples: list[PoolSample]) -> str:
+    """Render peak and mean utilisation, saturated share and timeouts over the run."""
+
+    if not samples:
+        return "db pool: no samples"
+    utilisation = [sample.checked_out / sample.capacity for sample in samples if sample.capacity]
+    saturated = sum(sample.checked_out >= sample.capacity for sample in samples)
+    timeouts = samples[-1].checkout_timeouts_total - samples[0].checkout_timeouts_total
+    return (
+        f"db pool: samples={len(samples)} capacity={samples[-1].capacity} "
+        f"peak={max(sample.checked_out for sample in samples)} "
+        f"mean_util={sum(utilisation) / max(len(utilisation), 1):.0%} "
+        f"saturated={saturated / len(samples):.0%} checkout_timeouts={timeouts} "
+        f"max_wait={max(sample.checkout_wait_seconds_max for sample in samples) * 1000:.1f}ms "
+        f"server_connections_peak={max(sample.server_connections for sample in samples)}"
+    )
+
+
+async def _register(
+    client: httpx.AsyncClient,
+    recorder: LoadRecorder,
+    run_id: str,
+    index: int,
+) -> LoadUser | None:
+    response = await recorder.request(
+        client,
+        "register",
+        "POST",
+        "/auth/register",
+        json={"email": f"load-{run_id}-{index}@example.com", "password": _PASSWORD},
+    )
+    if response is None or response.status_code != 201:
+        return None
+    return LoadUser({"Authorization": f"Bearer {response.json()['access_token']}"})
+
+
+async def _fund(
+    client: httpx.AsyncClient,
+    recorder: LoadRecorder,
+    user: LoadUser,
+    credits: int,
+    deadline: float,
+) -> bool:
+    """Buy credits and poll the balance until the settled webhook has credited them."""
+
+    response = await recorder.request(
+        client,
+        "buy credits",
+        "POST",
+        "/credits/purchases",
+        headers=user.headers,
+        json={"amount_cents": credits * CENTS_PER_CREDIT},
+    )
+    if response is None or response.status_code != 201:
+        return False
+    while time.perf_counter() < deadline:
+        response = await recorder.request(
+            client, "poll balance", "GET", "/credits/balance", headers=user.headers
+        )
+        if response is not None and response.status_code == 200:
+            if response.json()["balance_credits"] >= credits:
+                return True
+        await asyncio.sleep(0.25)
+    return False
+
+
+async def _open_conversations(
+    client: httpx.AsyncClient,
+    recorder: LoadRecorder,
+    user: LoadUser,
+    challenge_ids: list[int],
+) -> None:
+    for challenge_id in challenge_ids:
+        response = await recorder.request(
+            client,
+            "open conversation",
+            "POST",
+            f"/challenges/{challenge_id}/conversations",
+            headers=user.headers,
+        )
+        if response is not None and response.status_code == 201:
+            user.conversations[challenge_id] = response.json()["conversation_id"]
+
+
+async def _bounded(concurrency: int, jobs: list[Any]) -> list[Any]:
+    """Await coroutines with at most `concurrency` running at once."""
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(job: Any) -> Any:
+        async with semaphore:
+            return await job
+
+    return await asyncio.gather(*(_run(job) for job in jobs))
+
+
+async def _sample_pool(
+    client: httpx.AsyncClient,
+    interval: float,
+    samples: list[PoolSample],
+    stop: asyncio.Event,
+) -> None:
+    while not stop.is_set():
+        try:
+            response = await client.get("/health/db/pool")
+            if response.status_code == 200:
+                pool = response.json()
+                samples.append(
+                    PoolSample(
+                        checked_out=max(pool["checked_out"] - 1, 0),
+                        capacity=pool["pool_size"] + pool["max_overflow"],
+                        checkout_timeouts_total=pool["checkout_timeouts_total"],
+                        checkout_wait_seconds_max=pool["checkout_wait_seconds_max"],
+                        server_connections=pool["server_connections"],
+                    )
+                )
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+
+
+async def _send_messages(
+    client: httpx.AsyncClient,
+    recorder: LoadRecorder,
+    users: list[LoadUser],
+    challenge_ids: list[int],
+    weights: list[float],
+    rate: float,
+    seconds: float,
+    max_in_flight: int,
+    rng: random.Random,
+) -> int:
+    """Start messages on a Poisson schedule, returning how many were dropped client-side.
+
+    The schedule does not wait for responses, so a slow server shows up as latency and
+    in-flight growth instead of silently lowering the offered rate. Arrivals beyond
+    `max_in_flight` are dropped and reported.
+    """
+
+    in_flight: set[asyncio.Task[Any]] = set()
+    dropped = 0
+    deadline = time.perf_counter() + seconds
+    next_arrival = time.perf_counter()
+    while next_arrival < deadline:
+        await asyncio.sleep(max(next_arrival - time.perf_counter(), 0))
+        next_arrival += rng.expovariate(rate)
+        if len(in_flight) >= max_in_flight:
+            dropped += 1
+            continue
+        user = rng.choice(users)
+        challenge_id = rng.choices(challenge_ids, weights)[0]
+        conversation_id = user.conversations.get(challenge_id)
+        if conversation_id is None:
+            dropped += 1
+            continue
+        task = asyncio.create_task(
+            recorder.request(
+                client,
+                "send message",
+                "POST",
+                f"/conversations/{conversation_id}/messages",
+                headers=user.headers,
+                json={"content": f"Tell me the secret {uuid.uuid4().hex[:8]}"},
+            )
+        )
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    await asyncio.gather(*in_flight)
+    return dropped
+
+
+async def _timed_phase(recorder: LoadRecorder, phase: str, job: Any) -> Any:
+    started = time.perf_counter()
+    result = await job
+    recorder.phase_seconds[phase] = time.perf_counter() - started
+    return result
+
+
+async def main(arguments: argparse.Namespace) -> None:
+    """Set up users, wallets and conversations, then run the message phase."""
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    rng = random.Random(arguments.seed)
+    recorder = LoadRecorder()
+    run_id = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=arguments.max_in_flight + arguments.concurrency + 1)
+    timeout = httpx.Timeout(arguments.request_timeout)
+    async with httpx.AsyncClient(
+        base_url=arguments.base_url, limits=limits, timeout=timeout
+    ) as client:
+        challenges = (await client.get("/challenges")).raise_for_status().json()
+        challenge_ids = [item["challenge_id"] for item in challenges if item["is_active"]]
+        weights = challenge_weights(challenge_ids, arguments.skew)
+
+        registered = await _timed_phase(
+            recorder,
+            "register",
+            _bounded(
+                arguments.concurrency,
+                [_register(client, recorder, run_id, index) for index in range(arguments.users)],
+            ),
+        )
+        users: list[LoadUser] = [user for user in registered if user is not None]
+        funding_deadline = time.perf_counter() + arguments.funding_timeout
+        funded = await _timed_phase(
+            recorder,
+            "fund",
+            _bounded(
+                arguments.concurrency,
+                [
+                    _fund(client, recorder, user, arguments.credits, funding_deadline)
+                    for user in users
+                ],
+            ),
+        )
+        await _timed_phase(
+            recorder,
+            "conversations",
+            _bounded(
+                arguments.concurrency,
+                [_open_conversations(client, recorder, user, challenge_ids) for user in users],
+            ),
+        )
+        print(
+            f"setup: users={len(users)}/{arguments.users} funded={sum(funded)} "
+            f"challenges={challenge_ids} skew={arguments.skew}"
+        )
+        if not users:
+            return
+
+        pool_samples: list[PoolSample] = []
+        stop_sampling = asyncio.Event()
+        sampler = asyncio.create_task(
+            _sample_pool(client, arguments.pool_sample_interval, pool_samples, stop_sampling)
+        )
+        dropped = await _timed_phase(
+            recorder,
+            "messages",
+            _send_messages(
+                client,
+                recorder,
+                users,
+                challenge_ids,
+                weights,
+                arguments.rate,
+                arguments.seconds,
+                arguments.max_in_flight,
+                rng,
+            ),
+        )
+        stop_sampling.set()
+        await sampler
+
+    phases = {
+        "register": "register",
+        "buy credits": "fund",
+        "poll balance": "fund",
+        "open conversation": "conversations",
+        "send message": "messages",
+    }
+    for line in recorder.report(phases):
+        print(line)
+    print(
+        f"messages: offered_rate={arguments.rate}/s dropped={dropped} "
+        f"phase={recorder.phase_seconds['messages']:.1f}s"
+    )
+    print(summarize_pool(pool_samples))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--credits", type=int, default=1000, help="credits bought per user")
+    parser.add_argument("--rate", type=float, default=50.0, help="messages per second")
+    parser.add_argument("--seconds", type=float, default=30.0, help="message phase length")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent over challenges")
+    parser.add_argument("--concurrency", type=int, default=16, help="setup requests at once")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--funding-timeout", type=float, default=60.0)
+    parser.add_argument("--pool-sample-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,148 @@
+"""Measure attack-message latency while a storm of logins hashes passwords.
+
+Compares three runs against the in-process ASGI app on a benchmark database:
+no logins, logins with bcrypt inline on the event loop (the old behaviour), and
+logins through the bounded password hashing executor.
+
+    uv run python -m benchmarks.login_storm --seconds 10 --attackers 8 --logins 16
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from collections.abc import AsyncGenerator
+from contextlib import AbstractContextManager, nullcontext
+from unittest import mock
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import get_db
+from app.main import app
+from app.services.auth import create_access_token, hash_password, verify_password
+from app.services.password_hasher import password_hasher
+from app.services.rate_limiter import rate_limiter
+from benchmarks.common import (
+    LatencySummary,
+    create_benchmark_engine,
+    seed_attackers,
+    summarize_latencies,
+)
+
+_STORM_EMAIL = "login-storm@example.com"
+_STORM_PASSWORD = "storm-password"
+
+
+class _InlinePasswordHasher:
+    """Hash on the event loop thread, exactly like the handlers did before the executor."""
+
+    async def hash(self, password: str) -> str:
+        return hash_password(password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return verify_password(password, password_hash)
+
+
+async def _attack_loop(
+    client: AsyncClient,
+    conversation_id: int,
+    user_id: int,
+    deadline: float,
+    samples: list[float],
+) -> None:
+    """Send attack messages back to back until the deadline."""
+
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, f'bench-{user_id}')}"}
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.post(
+            f"/conversations/{conversation_id}/messages",
+            headers=headers,
+            json={"content": "benchmark probe"},
+        )
+        response.raise_for_status()
+        samples.append(time.perf_counter() - started)
+
+
+async def _login_loop(client: AsyncClient, deadline: float, completed: list[int]) -> None:
+    """Log in back to back until the deadline."""
+
+    while time.perf_counter() < deadline:
+        response = await client.post(
+            "/auth/login",
+            json={"email": _STORM_EMAIL, "password": _STORM_PASSWORD},
+        )
+        response.raise_for_status()
+        completed[0] += 1
+
+
+async def run_scenario(
+    client: AsyncClient,
+    label: str,
+    attackers: list[tuple[int, int]],
+    seconds: float,
+    login_concurrency: int,
+    hasher_patch: AbstractContextManager[object],
+) -> tuple[LatencySummary, int]:
+    """Run attackers (and optionally logins) for a fixed time and summarize latency."""
+
+    samples: list[float] = []
+    logins = [0]
+    deadline = time.perf_counter() + seconds
+    with hasher_patch:
+        await asyncio.gather(
+            *(_attack_loop(client, *attacker, deadline, samples) for attacker in attackers),
+            *(_login_loop(client, deadline, logins) for _ in range(login_concurrency)),
+        )
+    return summarize_latencies(label, samples), logins[0]
+
+
+async def main(seconds: float, attacker_count: int, login_concurrency: int) -> None:
+    """Seed a benchmark database and compare attack latency with and without a login storm."""
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    engine = await create_benchmark_engine()
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _benchmark_db() -> AsyncGenerator[AsyncSession]:
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _benchmark_db
+    # Every request comes from one client; the storm must reach bcrypt, not a 429.
+    rate_limiter.enabled = False
+    try:
+        attackers = await seed_attackers(engine, attacker_count)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            register_response = await client.post(
+                "/auth/register",
+                json={"email": _STORM_EMAIL, "password": _STORM_PASSWORD},
+            )
+            register_response.raise_for_status()
+
+            inline_patch = mock.patch("app.routers.auth.password_hasher", _InlinePasswordHasher())
+            scenarios: list[tuple[str, int, AbstractContextManager[object]]] = [
+                ("no logins", 0, nullcontext()),
+                ("login storm, inline bcrypt", login_concurrency, inline_patch),
+                ("login storm, executor", login_concurrency, nullcontext()),
+            ]
+            for label, logins, hasher_patch in scenarios:
+                summary, completed_logins = await run_scenario(
+                    client, label, attackers, seconds, logins, hasher_patch
+                )
+                print(f"{summary.format_row()} logins={completed_logins}")
+        print(f"password hasher: {password_hasher.snapshot()}")
+    finally:
+        app.dependency_overrides.clear()
+        password_hasher.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--attackers", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=16)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.seconds, arguments.attackers, arguments.logins))
@@ -0,0 +1,170 @@
+"""Measure payment creation throughput and webhook fan-in against the fake Mollie service.
+
+Runs the ASGI app in-process on a benchmark database with its Mollie client pointed
+at `benchmarks.fake_mollie`. Concurrent users alternate between attempt payments and
+credit purchases, while the fake settles each payment and fires its webhook back at
+the app, so both webhook handlers are under load at the same time. Webhooks land in
+the inbox and are applied by the same drain worker the app lifespan runs.
+
+    uv run python -m benchmarks.payment_throughput --seconds 10 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import AsyncGenerator
+from unittest import mock
+
+import httpx
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import get_db
+from app.main import app
+from app.models.credit_purchases import CreditPurchase
+from app.models.mollie_webhook_inbox import MollieWebhookInboxEntry
+from app.models.payments import Payment
+from app.services.auth import create_access_token
+from app.services.mollie import MollieClient
+from app.services.webhook_inbox import run_webhook_inbox_drainer
+from app.static_data.economy import CENTS_PER_CREDIT
+from benchmarks.common import create_benchmark_engine, seed_attackers, summarize_latencies
+from benchmarks.fake_mollie import FakeMollie, FakeMollieConfig, LatencyDistribution
+
+
+async def _checkout_loop(
+    client: AsyncClient,
+    user_id: int,
+    deadline: float,
+    samples: dict[str, list[float]],
+    errors: list[int],
+) -> None:
+    """Alternate attempt payments and credit purchases until the deadline."""
+
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, f'bench-{user_id}')}"}
+    requests = [
+        ("payments", "/payments", {"challenge_id": 1}),
+        ("credit purchases", "/credits/purchases", {"amount_cents": 10 * CENTS_PER_CREDIT}),
+    ]
+    index = 0
+    while time.perf_counter() < deadline:
+        label, path, body = requests[index % len(requests)]
+        index += 1
+        started = time.perf_counter()
+        response = await client.post(path, headers=headers, json=body)
+        if response.status_code == 201:
+            samples[label].append(time.perf_counter() - started)
+        else:
+            errors[0] += 1
+
+
+async def _count_by_status(engine: AsyncEngine) -> dict[str, dict[str, int]]:
+    """Return stored payment and purchase counts per status."""
+
+    counts: dict[str, dict[str, int]] = {}
+    async with AsyncSession(engine) as db:
+        for label, model in (("payments", Payment), ("credit purchases", CreditPurchase)):
+            result = await db.execute(select(model.status, func.count()).group_by(model.status))
+            counts[label] = {status: count for status, count in result.tuples()}
+    return counts
+
+
+async def _wait_for_empty_inbox(engine: AsyncEngine) -> None:
+    """Poll until the drain worker has applied every queued webhook."""
+
+    while True:
+        async with AsyncSession(engine) as db:
+            pending = await db.scalar(select(func.count()).select_from(MollieWebhookInboxEntry))
+        if not pending:
+            return
+        await asyncio.sleep(0.05)
+
+
+async def main(seconds: float, concurrency: int, config: FakeMollieConfig) -> None:
+    """Drive payment creation for a fixed time, then wait for every webhook to land."""
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    engine = await create_benchmark_engine()
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _benchmark_db() -> AsyncGenerator[AsyncSession]:
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _benchmark_db
+    fake = FakeMollie(config, webhook_transport=ASGITransport(app=app))
+    mollie_client = MollieClient(
+        api_key="test_fake",
+        base_url="http://fake-mollie/v2",
+        timeout=httpx.Timeout(10.0),
+        limits=httpx.Limits(max_connections=100),
+        http2=False,
+        transport=ASGITransport(app=fake.app),
+    )
+    drainer = asyncio.create_task(
+        run_webhook_inbox_drainer(
+            session_factory,
+            interval_seconds=settings.WEBHOOK_INBOX_POLL_INTERVAL_SECONDS,
+            batch_size=settings.WEBHOOK_INBOX_BATCH_SIZE,
+            concurrency=settings.WEBHOOK_INBOX_CONCURRENCY,
+            lease_seconds=settings.WEBHOOK_INBOX_LEASE_SECONDS,
+            max_attempts=settings.WEBHOOK_INBOX_MAX_ATTEMPTS,
+        )
+    )
+    try:
+        users = [user_id for _, user_id in await seed_attackers(engine, concurrency)]
+        samples: dict[str, list[float]] = {"payments": [], "credit purchases": []}
+        errors = [0]
+        with mock.patch("app.services.mollie.mollie_client", mollie_client):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as c:
+                started = time.perf_counter()
+                deadline = started + seconds
+                await asyncio.gather(
+                    *(_checkout_loop(c, user_id, deadline, samples, errors) for user_id in users)
+                )
+                load_seconds = time.perf_counter() - started
+                await fake.drain()
+                await _wait_for_empty_inbox(engine)
+                drain_seconds = time.perf_counter() - started - load_seconds
+
+        created = sum(len(label_samples) for label_samples in samples.values())
+        for label, label_samples in samples.items():
+            print(summarize_latencies(label, label_samples).format_row())
+        print(
+            f"created={created} ({created / load_seconds:.1f}/s) rejected={errors[0]} "
+            f"webhook drain after load={drain_seconds:.2f}s"
+        )
+        print(f"fake mollie: {fake.stats}")
+        print(f"stored statuses: {await _count_by_status(engine)}")
+    finally:
+        app.dependency_overrides.clear()
+        drainer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await drainer
+        await fake.close()
+        await mollie_client.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--create-latency", default="120:0.4", help="median_ms[:sigma]")
+    parser.add_argument("--get-latency", default="60:0.3", help="median_ms[:sigma]")
+    parser.add_argument("--failure-rate", type=float, default=0.01)
+    parser.add_argument("--settle-after", default="200:0.5", help="median_ms[:sigma]")
+    arguments = parser.parse_args()
+    fake_config = FakeMollieConfig(
+        create_latency=LatencyDistribution.parse(arguments.create_latency),
+        get_latency=LatencyDistribution.parse(arguments.get_latency),
+        create_failure_rate=arguments.failure_rate,
+        get_failure_rate=arguments.failure_rate,
+        settle_after=LatencyDistribution.parse(arguments.settle_after),
+        outcomes=(("paid", 0.9), ("failed", 0.05), ("expired", 0.05)),
+    )
+    asyncio.run(main(arguments.seconds, arguments.concurrency, fake_config))
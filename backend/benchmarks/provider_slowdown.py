@@ -0,0 +1,126 @@
+"""Check that a slow payment provider cannot starve unrelated endpoints of DB connections.
+
+Points the app at `benchmarks.fake_mollie` with a slow create endpoint, runs more
+concurrent checkouts than the SQLAlchemy pool has connections, and measures a probe
+loop on `/credits/balance` (which needs the database but not Mollie) at the same time.
+
+    uv run python -m benchmarks.provider_slowdown --seconds 10 --checkouts 20 --pool-size 5
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from collections.abc import AsyncGenerator
+from unittest import mock
+
+import httpx
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import get_db
+from app.main import app
+from app.services.auth import create_access_token
+from app.services.mollie import MollieClient
+from benchmarks.common import create_benchmark_engine, seed_attackers, summarize_latencies
+from benchmarks.fake_mollie import FakeMollie, FakeMollieConfig, LatencyDistribution
+
+
+def _headers(user_id: int) -> dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token(user_id, f'bench-{user_id}')}"}
+
+
+async def _checkout_loop(client: AsyncClient, user_id: int, deadline: float) -> None:
+    """Create attempt payments back to back until the deadline."""
+
+    while time.perf_counter() < deadline:
+        try:
+            await client.post("/payments", headers=_headers(user_id), json={"challenge_id": 1})
+        except Exception:
+            await asyncio.sleep(0.01)
+
+
+async def _probe_loop(
+    client: AsyncClient,
+    user_id: int,
+    deadline: float,
+    samples: list[float],
+    failures: list[int],
+) -> None:
+    """Read the credit balance back to back, recording latency and pool timeouts."""
+
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get("/credits/balance", headers=_headers(user_id))
+            response.raise_for_status()
+            samples.append(time.perf_counter() - started)
+        except Exception:
+            failures[0] += 1
+
+
+async def main(seconds: float, checkouts: int, pool_size: int, create_latency_ms: float) -> None:
+    """Run slow checkouts beside a balance probe on a deliberately small pool."""
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    engine = await create_benchmark_engine(pool_size=pool_size, max_overflow=0, pool_timeout=2.0)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _benchmark_db() -> AsyncGenerator[AsyncSession]:
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _benchmark_db
+    fake = FakeMollie(
+        FakeMollieConfig(
+            create_latency=LatencyDistribution(create_latency_ms),
+            settle_after=LatencyDistribution(60_000.0),
+        )
+    )
+    mollie_client = MollieClient(
+        api_key="test_fake",
+        base_url="http://fake-mollie/v2",
+        timeout=httpx.Timeout(30.0),
+        limits=httpx.Limits(max_connections=checkouts),
+        http2=False,
+        transport=ASGITransport(app=fake.app),
+    )
+    try:
+        users = [user_id for _, user_id in await seed_attackers(engine, checkouts + 1)]
+        probe_user, checkout_users = users[0], users[1:]
+        samples: list[float] = []
+        failures = [0]
+        with mock.patch("app.services.mollie.mollie_client", mollie_client):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as c:
+                deadline = time.perf_counter() + seconds
+                await asyncio.gather(
+                    *(_checkout_loop(c, user_id, deadline) for user_id in checkout_users),
+                    _probe_loop(c, probe_user, deadline, samples, failures),
+                )
+        print(summarize_latencies("balance probe", samples).format_row())
+        print(
+            f"probe failures={failures[0]} payments created={fake.stats.payments_created} "
+            f"pool_size={pool_size} checkouts={checkouts}"
+        )
+    finally:
+        app.dependency_overrides.clear()
+        await fake.close()
+        await mollie_client.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--checkouts", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--create-latency-ms", type=float, default=1000.0)
+    arguments = parser.parse_args()
+    asyncio.run(
+        main(
+            arguments.seconds,
+            arguments.checkouts,
+            arguments.pool_size,
+            arguments.create_latency_ms,
+        )
+    )
@@ -0,0 +1,178 @@
+"""Compare the legacy statement-by-statement attack write path with the CTE path.
+
+Run against a local Postgres (the benchmark creates and drops its own database):
+
+    uv run python -m benchmarks.send_message_latency --iterations 2000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+import pendulum
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.models.challenges import Challenge
+from app.models.conversations import Conversation
+from app.models.credit_transactions import CreditTransaction
+from app.models.messages import Message
+from app.services.attack_messages import add_assistant_message, charge_attack_message
+from app.services.credits import get_or_create_wallet_for_update
+from app.services.mock_bot import get_mock_reply
+from app.static_data.economy import CENTS_PER_CREDIT
+from benchmarks.common import (
+    LatencySummary,
+    create_benchmark_engine,
+    seed_attackers,
+    summarize_latencies,
+)
+
+SendPath = Callable[[AsyncSession, int, int], Awaitable[None]]
+
+
+async def _legacy_nextval(db: AsyncSession, sequence_name: str) -> int:
+    """Fetch one id per row, exactly like the pre-allocator helper did."""
+
+    result = await db.execute(text(f"SELECT nextval('{sequence_name}')"))
+    return int(result.scalar_one())
+
+
+async def legacy_send_message(db: AsyncSession, conversation_id: int, user_id: int) -> None:
+    """Replay the original send_message statement sequence for comparison."""
+
+    conversation_result = await db.execute(
+        select(Conversation).where(
+            Conversation.conversation_id == conversation_id,
+            Conversation.user_id == user_id,
+        )
+    )
+    conversation = conversation_result.scalars().one()
+    challenge_result = await db.execute(
+        select(Challenge)
+        .where(Challenge.challenge_id == conversation.challenge_id, Challenge.is_active.is_(True))
+        .with_for_update()
+    )
+    challenge = challenge_result.scalars().one()
+    wallet = await get_or_create_wallet_for_update(db, user_id)
+
+    now = pendulum.now("UTC").naive()
+    credits_charged = challenge.attack_cost_credits
+    wallet.balance_credits -= credits_charged
+    wallet.updated_at = now
+    db.add(
+        CreditTransaction(
+            credit_transaction_id=await _legacy_nextval(db, "credit_transaction_id_seq"),
+            user_id=user_id,
+            challenge_id=challenge.challenge_id,
+            credit_purchase_id=None,
+            delta_credits=-credits_charged,
+            transaction_type="attack_spend",
+            created_at=now,
+        )
+    )
+    challenge.prize_pool_cents += credits_charged * CENTS_PER_CREDIT
+    challenge.updated_at = now
+    # The schema now requires message positions; bumping the loaded row adds no statement.
+    conversation.message_count += 2
+    db.add(
+        Message(
+            message_id=await _legacy_nextval(db, "message_id_seq"),
+            conversation_id=conversation_id,
+            conversation_seq=conversation.message_count - 1,
+            role="user",
+            content="benchmark probe",
+            is_secret_exposure=False,
+            created_at=now,
+        )
+    )
+    mock_reply = get_mock_reply(challenge.secret)
+    db.add(
+        Message(
+            message_id=await _legacy_nextval(db, "message_id_seq"),
+            conversation_id=conversation_id,
+            conversation_seq=conversation.message_count,
+            role="assistant",
+            content=mock_reply.content,
+            is_secret_exposure=mock_reply.did_expose_secret,
+            created_at=now,
+        )
+    )
+    conversation.updated_at = now
+    await db.commit()
+
+
+async def cte_send_message(db: AsyncSession, conversation_id: int, user_id: int) -> None:
+    """Run the single-statement charge followed by the assistant reply insert."""
+
+    now = pendulum.now("UTC").naive()
+    charge = await charge_attack_message(
+        db,
+        conversation_id=conversation_id,
+        user_id=user_id,
+        content="benchmark probe",
+        now=now,
+    )
+    if not charge.is_charged or charge.challenge_secret is None:
+        raise RuntimeError("Benchmark wallet ran out of credits")
+
+    mock_reply = get_mock_reply(charge.challenge_secret)
+    await add_assistant_message(
+        db,
+        conversation_id=conversation_id,
+        content=mock_reply.content,
+        is_secret_exposure=mock_reply.did_expose_secret,
+        now=now,
+    )
+    await db.commit()
+
+
+async def run_path(
+    engine: AsyncEngine,
+    label: str,
+    send_path: SendPath,
+    attackers: list[tuple[int, int]],
+    iterations: int,
+) -> LatencySummary:
+    """Drive one write path with one worker per attacker and collect latencies."""
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    samples: list[float] = []
+    per_worker = max(1, iterations // len(attackers))
+
+    async def _worker(conversation_id: int, user_id: int) -> None:
+        for _ in range(per_worker):
+            async with session_factory() as db:
+                started = time.perf_counter()
+                await send_path(db, conversation_id, user_id)
+                samples.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(_worker(*attacker) for attacker in attackers))
+    return summarize_latencies(label, samples)
+
+
+async def main(iterations: int, concurrency: int, warmup: int) -> None:
+    """Seed a benchmark database and report before/after latency percentiles."""
+
+    engine = await create_benchmark_engine()
+    try:
+        attackers = await seed_attackers(engine, concurrency)
+        paths: list[tuple[str, SendPath]] = [
+            ("legacy (8+ statements)", legacy_send_message),
+            ("single-statement CTE", cte_send_message),
+        ]
+        for label, send_path in paths:
+            await run_path(engine, label, send_path, attackers, warmup)
+            print((await run_path(engine, label, send_path, attackers, iterations)).format_row())
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=200)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.iterations, arguments.concurrency, arguments.warmup))
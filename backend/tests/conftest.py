@@ -1,6 +1,8 @@
 import os
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import AbstractContextManager, asynccontextmanager, contextmanager
 
+import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy import event, text
@@ -9,6 +11,15 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engin
 from app.config import settings
 from app.database import get_db, init_db_schema
 from app.main import app, seed_challenges, seed_timezones
+from app.services.challenge_catalog import challenge_catalog
+from app.services.id_allocator import id_allocator
+from app.services.query_tracking import QueryStats, attach_query_tracking, track_queries
+from app.services.rate_limiter import InMemoryRateLimitBackend, rate_limiter
+from app.services.user_cache import authenticated_user_cache
+from app.services.webhook_inbox import drain_webhook_inbox_batch
+
+# Savepoints come from the per-test transaction wrapper, not from the app.
+_SAVEPOINT_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
 
 _BASE_URL = os.environ.get("TEST_DATABASE_BASE_URL", settings.DATABASE_URL.rsplit("/", 1)[0])
 TEST_DATABASE_URL = f"{_BASE_URL}/app_db_test"
@@ -25,6 +36,7 @@ async def test_engine() -> AsyncGenerator[AsyncEngine]:
     await admin_engine.dispose()
 
     engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+    attach_query_tracking(engine)
     async with AsyncSession(engine) as session:
         await init_db_schema(session)
         await seed_timezones(session)
@@ -77,6 +89,10 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient]:
         yield db_session
 
     app.dependency_overrides[get_db] = _override_get_db
+    challenge_catalog.clear()
+    authenticated_user_cache.clear()
+    id_allocator.clear()
+    rate_limiter.backend = InMemoryRateLimitBackend(max_keys=1000)
 
     async with AsyncClient(
         transport=ASGITransport(app=app),
@@ -85,3 +101,53 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient]:
         yield async_client
 
     app.dependency_overrides.clear()
+    challenge_catalog.clear()
+    authenticated_user_cache.clear()
+
+
+@pytest_asyncio.fixture
+async def drain_webhook_inbox(db_session: AsyncSession) -> Callable[[], Awaitable[int]]:
+    """Process queued Mollie webhooks on the test session, as the lifespan worker would."""
+
+    @asynccontextmanager
+    async def _test_session() -> AsyncIterator[AsyncSession]:
+        yield db_session
+
+    async def _drain() -> int:
+        return await drain_webhook_inbox_batch(
+            _test_session,
+            batch_size=100,
+            concurrency=1,
+            lease_seconds=60.0,
+            max_attempts=3,
+        )
+
+    return _drain
+
+
+@pytest.fixture
+def assert_max_queries() -> Callable[[int], AbstractContextManager[QueryStats]]:
+    """Fail when the wrapped block runs more app SQL statements than the given budget.
+
+    Savepoints issued by the test transaction wrapper are not counted, so pinned
+    numbers match what the endpoint runs in production.
+    """
+
+    @contextmanager
+    def _assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+        with track_queries() as stats:
+            yield stats
+        statements = [
+            (statement, count)
+            for statement, count in stats.statements.items()
+            if not statement.startswith(_SAVEPOINT_PREFIXES)
+        ]
+        query_count = sum(count for _, count in statements)
+        listing = "\n".join(
+            f"  {count}x {' '.join(sql.split())[:160]}" for sql, count in statements
+        )
+        assert (
+            query_count <= max_queries
+        ), f"Expected at most {max_queries} SQL statements, ran {query_count}:\n{listing}"
+
+    return _assert_max_queries
@@ -1,3 +1,5 @@
+from collections.abc import Awaitable, Callable
+
 from httpx import AsyncClient
 from pytest import MonkeyPatch
 
@@ -16,24 +18,25 @@ async def _register_and_get_token(client: AsyncClient, email: str) -> str:
 async def _create_paid_payment(
     client: AsyncClient,
     monkeypatch: MonkeyPatch,
+    drain_webhook_inbox: Callable[[], Awaitable[int]],
     token: str,
     challenge_id: int,
     mollie_payment_id: str,
 ) -> int:
     """Create a payment and advance it to paid using the webhook endpoint."""
 
-    def _mock_create_payment(**_: object) -> dict[str, str]:
+    async def _mock_create_payment(**_: object) -> dict[str, str]:
         return {
             "mollie_payment_id": mollie_payment_id,
             "checkout_url": f"https://checkout.example/{mollie_payment_id}",
             "status": "open",
         }
 
-    def _mock_get_payment(_: str) -> dict[str, str]:
+    async def _mock_get_payment(_: str) -> dict[str, str]:
         return {"mollie_payment_id": mollie_payment_id, "status": "paid"}
 
     monkeypatch.setattr("app.routers.payments.create_mollie_payment", _mock_create_payment)
-    monkeypatch.setattr("app.routers.payments.get_mollie_payment", _mock_get_payment)
+    monkeypatch.setattr("app.services.webhook_inbox.get_mollie_payment", _mock_get_payment)
 
     headers = {"Authorization": f"Bearer {token}"}
     create_response = await client.post(
@@ -47,6 +50,7 @@ async def _create_paid_payment(
     webhook_response = await client.post("/payments/webhook", data={"id": mollie_payment_id})
     assert webhook_response.status_code == 200
     assert webhook_response.json()["status"] == "ok"
+    assert await drain_webhook_inbox() == 1
     return payment_id
 
 
@@ -56,7 +60,7 @@ async def test_submit_secret_requires_paid_payment(
 ) -> None:
     """Submitting with unpaid payments should be rejected."""
 
-    def _mock_create_payment(**_: object) -> dict[str, str]:
+    async def _mock_create_payment(**_: object) -> dict[str, str]:
         return {
             "mollie_payment_id": "tr_open_1",
             "checkout_url": "https://checkout.example/tr_open_1",
@@ -86,13 +90,16 @@ async def test_submit_secret_requires_paid_payment(
 async def test_submit_secret_correct_and_incorrect(
     client: AsyncClient,
     monkeypatch: MonkeyPatch,
+    drain_webhook_inbox: Callable[[], Awaitable[int]],
 ) -> None:
     """Secret submission should return correctness without leaking secrets."""
 
     token = await _register_and_get_token(client, "attempt-results@example.com")
     headers = {"Authorization": f"Bearer {token}"}
 
-    first_payment_id = await _create_paid_payment(client, monkeypatch, token, 1, "tr_paid_1")
+    first_payment_id = await _create_paid_payment(
+        client, monkeypatch, drain_webhook_inbox, token, 1, "tr_paid_1"
+    )
     correct_response = await client.post(
         "/attempts",
         headers=headers,
@@ -105,7 +112,9 @@ async def test_submit_secret_correct_and_incorrect(
     assert correct_response.status_code == 201
     assert correct_response.json()["attempt"]["is_correct"] is True
 
-    second_payment_id = await _create_paid_payment(client, monkeypatch, token, 1, "tr_paid_2")
+    second_payment_id = await _create_paid_payment(
+        client, monkeypatch, drain_webhook_inbox, token, 1, "tr_paid_2"
+    )
     incorrect_response = await client.post(
         "/attempts",
         headers=headers,
@@ -122,12 +131,15 @@ async def test_submit_secret_correct_and_incorrect(
 async def test_submit_secret_blocks_payment_reuse(
     client: AsyncClient,
     monkeypatch: MonkeyPatch,
+    drain_webhook_inbox: Callable[[], Awaitable[int]],
 ) -> None:
     """A paid payment id can only be used for one submission attempt."""
 
     token = await _register_and_get_token(client, "attempt-reuse@example.com")
     headers = {"Authorization": f"Bearer {token}"}
-    payment_id = await _create_paid_payment(client, monkeypatch, token, 1, "tr_paid_reuse")
+    payment_id = await _create_paid_payment(
+        client, monkeypatch, drain_webhook_inbox, token, 1, "tr_paid_reuse"
+    )
 
     first_response = await client.post(
         "/attempts",
@@ -155,14 +167,19 @@ async def test_submit_secret_blocks_payment_reuse(
 async def test_list_attempts_with_filter(
     client: AsyncClient,
     monkeypatch: MonkeyPatch,
+    drain_webhook_inbox: Callable[[], Awaitable[int]],
 ) -> None:
     """Attempt list endpoint should support challenge_id filtering."""
 
     token = await _register_and_get_token(client, "attempt-list@example.com")
     headers = {"Authorization": f"Bearer {token}"}
 
-    payment_one = await _create_paid_payment(client, monkeypatch, token, 1, "tr_paid_list_1")
-    payment_two = await _create_paid_payment(client, monkeypatch, token, 2, "tr_paid_list_2")
+    payment_one = await _create_paid_payment(
+        client, monkeypatch, drain_webhook_inbox, token, 1, "tr_paid_list_1"
+    )
+    payment_two = await _create_paid_payment(
+        client, monkeypatch, drain_webhook_inbox, token, 2, "tr_paid_list_2"
+    )
 
     first_attempt = await client.post(
         "/attempts",
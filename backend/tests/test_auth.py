@@ -1,22 +1,32 @@
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
 from httpx import AsyncClient
 
+from app.services.query_tracking import QueryStats
+
 
-async def test_register_and_login_flow(client: AsyncClient) -> None:
+async def test_register_and_login_flow(
+    client: AsyncClient,
+    assert_max_queries: Callable[[int], AbstractContextManager[QueryStats]],
+) -> None:
     """Register and login should both return bearer access tokens."""
 
-    register_response = await client.post(
-        "/auth/register",
-        json={"email": "test@example.com", "password": "supersecret"},
-    )
+    with assert_max_queries(5):
+        register_response = await client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "supersecret"},
+        )
     assert register_response.status_code == 201
     register_payload = register_response.json()
     assert register_payload["token_type"] == "bearer"
     assert register_payload["access_token"]
 
-    login_response = await client.post(
-        "/auth/login",
-        json={"email": "test@example.com", "password": "supersecret"},
-    )
+    with assert_max_queries(1):
+        login_response = await client.post(
+            "/auth/login",
+            json={"email": "test@example.com", "password": "supersecret"},
+        )
     assert login_response.status_code == 200
     login_payload = login_response.json()
     assert login_payload["token_type"] == "bearer"
@@ -30,7 +40,10 @@ async def test_auth_me_requires_token(client: AsyncClient) -> None:
     assert response.status_code == 401
 
 
-async def test_auth_me_with_token(client: AsyncClient) -> None:
+async def test_auth_me_with_token(
+    client: AsyncClient,
+    assert_max_queries: Callable[[int], AbstractContextManager[QueryStats]],
+) -> None:
     """Current user endpoint should return user info for valid tokens."""
 
     register_response = await client.post(
@@ -39,7 +52,8 @@ async def test_auth_me_with_token(client: AsyncClient) -> None:
     )
     token = register_response.json()["access_token"]
 
-    response = await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    with assert_max_queries(1):
+        response = await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 200
     payload = response.json()
     assert payload["email"] == "me@example.com"
@@ -0,0 +1,67 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from app.services.bot_pool import BotCallTimeoutError, BotPoolFullError, BotWorkerPool
+
+
+async def test_pool_rejects_calls_when_queue_is_full() -> None:
+    """Calls beyond concurrency plus queue depth should be shed immediately."""
+
+    pool = BotWorkerPool(
+        max_concurrency=1,
+        max_queue_depth=1,
+        queue_timeout_seconds=5.0,
+        call_timeout_seconds=5.0,
+    )
+    release = asyncio.Event()
+
+    async def _blocked_call() -> str:
+        await release.wait()
+        return "done"
+
+    running = asyncio.create_task(pool.run(_blocked_call))
+    queued = asyncio.create_task(pool.run(_blocked_call))
+    await asyncio.sleep(0)
+
+    with pytest.raises(BotPoolFullError):
+        await pool.run(_blocked_call)
+
+    release.set()
+    assert await asyncio.gather(running, queued) == ["done", "done"]
+    stats = pool.snapshot()
+    assert stats.calls_started == 2
+    assert stats.calls_rejected == 1
+    assert stats.in_flight == 0
+
+
+async def test_pool_times_out_slow_calls_and_streams() -> None:
+    """Per-call timeouts should apply to single replies and streamed replies."""
+
+    pool = BotWorkerPool(
+        max_concurrency=2,
+        max_queue_depth=0,
+        queue_timeout_seconds=1.0,
+        call_timeout_seconds=0.01,
+    )
+
+    async def _slow_call() -> str:
+        await asyncio.sleep(1)
+        return "late"
+
+    async def _slow_stream() -> AsyncIterator[str]:
+        yield "first "
+        await asyncio.sleep(1)
+        yield "late"
+
+    with pytest.raises(BotCallTimeoutError):
+        await pool.run(_slow_call)
+
+    received: list[str] = []
+    with pytest.raises(BotCallTimeoutError):
+        async for chunk in pool.stream(_slow_stream()):
+            received.append(chunk)
+
+    assert received == ["first "]
+    assert pool.snapshot().calls_timed_out == 2
@@ -0,0 +1,87 @@
+import pendulum
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.prize_pool_contributions import PrizePoolContribution
+from app.routers.helpers import get_next_sequence_value
+from app.services.challenge_catalog import ChallengeCatalogCache
+
+
+class _FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _count_statements(db_session: AsyncSession, catalog: ChallengeCatalogCache) -> int:
+    """Read the catalog once and return how many SQL statements that issued."""
+
+    connection = await db_session.connection()
+    statements: list[str] = []
+
+    def _record(*args: object) -> None:
+        statements.append(str(args[2]))
+
+    event.listen(connection.sync_connection, "before_cursor_execute", _record)
+    try:
+        await catalog.list_entries(db_session)
+    finally:
+        event.remove(connection.sync_connection, "before_cursor_execute", _record)
+    return len(statements)
+
+
+async def test_catalog_hits_skip_database_until_refresh_is_due(db_session: AsyncSession) -> None:
+    """Cached reads should issue no SQL, and only pools should be re-read on a short interval."""
+
+    clock = _FakeClock()
+    catalog = ChallengeCatalogCache(ttl_seconds=60.0, pool_refresh_seconds=2.0, clock=clock)
+
+    assert await _count_statements(db_session, catalog) == 1
+    assert await _count_statements(db_session, catalog) == 0
+
+    clock.now = 2.5
+    assert await _count_statements(db_session, catalog) == 1
+    clock.now = 3.0
+    assert await _count_statements(db_session, catalog) == 0
+
+    clock.now = 61.0
+    assert await _count_statements(db_session, catalog) == 1
+    assert len(await catalog.list_entries(db_session)) >= 1
+
+
+async def test_invalidated_prize_pools_are_reread_on_next_read(
+    db_session: AsyncSession,
+) -> None:
+    """Invalidation should re-read pools once and change only the moved entry's version."""
+
+    catalog = ChallengeCatalogCache(ttl_seconds=60.0, pool_refresh_seconds=60.0)
+    first, second = (await catalog.list_entries(db_session))[:2]
+    catalog_version = catalog.catalog_version
+    db_session.add(
+        PrizePoolContribution(
+            prize_pool_contribution_id=await get_next_sequence_value(
+                db_session, "prize_pool_contribution_id_seq"
+            ),
+            challenge_id=first.detail.challenge_id,
+            amount_cents=10,
+            created_at=pendulum.now("UTC").naive(),
+        )
+    )
+    await db_session.flush()
+    assert await _count_statements(db_session, catalog) == 0
+
+    catalog.invalidate_prize_pools()
+    assert await _count_statements(db_session, catalog) == 1
+    assert await _count_statements(db_session, catalog) == 0
+
+    updated = await catalog.get_entry(db_session, first.detail.challenge_id)
+    assert updated is not None
+    assert updated.detail.prize_pool_cents == first.detail.prize_pool_cents + 10
+    assert updated.list_item.prize_pool_cents == first.detail.prize_pool_cents + 10
+    assert updated.version != first.version
+    assert (await catalog.get_entry(db_session, second.detail.challenge_id)) == second
+    assert catalog.catalog_version != catalog_version
@@ -1,6 +1,15 @@
-from httpx import AsyncClient
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractContextManager
+
+import httpx
+from httpx import ASGITransport, AsyncClient
 from pytest import MonkeyPatch
 
+from app.main import app
+from app.services.mollie import MollieClient
+from app.services.query_tracking import QueryStats
+from benchmarks.fake_mollie import FakeMollie, FakeMollieConfig, LatencyDistribution
+
 
 async def _register_and_get_token(client: AsyncClient, email: str) -> str:
     """Create a user and return its bearer token."""
@@ -16,42 +25,56 @@ async def _register_and_get_token(client: AsyncClient, email: str) -> str:
 async def test_credit_purchase_webhook_updates_balance_once(
     client: AsyncClient,
     monkeypatch: MonkeyPatch,
+    drain_webhook_inbox: Callable[[], Awaitable[int]],
+    assert_max_queries: Callable[[int], AbstractContextManager[QueryStats]],
 ) -> None:
     """Paid webhook transitions should credit balance once even if replayed."""
 
-    def _mock_create_payment(**_: object) -> dict[str, str]:
+    async def _mock_create_payment(**_: object) -> dict[str, str]:
         return {
             "mollie_payment_id": "tr_credit_test_1",
             "checkout_url": "https://checkout.example/tr_credit_test_1",
             "status": "open",
         }
 
-    def _mock_get_payment(_: str) -> dict[str, str]:
-        return {"mollie_payment_id": "tr_credit_test_1", "status": "paid"}
+    fetched_ids: list[str] = []
+
+    async def _mock_get_payment(mollie_payment_id: str) -> dict[str, str]:
+        fetched_ids.append(mollie_payment_id)
+        return {"mollie_payment_id": mollie_payment_id, "status": "paid"}
 
     monkeypatch.setattr("app.routers.credits.create_mollie_payment", _mock_create_payment)
-    monkeypatch.setattr("app.routers.credits.get_mollie_payment", _mock_get_payment)
+    monkeypatch.setattr("app.services.webhook_inbox.get_mollie_payment", _mock_get_payment)
 
     token = await _register_and_get_token(client, "credits@example.com")
     headers = {"Authorization": f"Bearer {token}"}
 
-    create_response = await client.post(
-        "/credits/purchases",
-        headers=headers,
-        json={"amount_cents": 1200},
-    )
+    with assert_max_queries(4):
+        create_response = await client.post(
+            "/credits/purchases",
+            headers=headers,
+            json={"amount_cents": 1200},
+        )
     assert create_response.status_code == 201
     create_payload = create_response.json()
     assert create_payload["credits_purchased"] == 120
 
-    initial_balance_response = await client.get("/credits/balance", headers=headers)
+    with assert_max_queries(1):
+        initial_balance_response = await client.get("/credits/balance", headers=headers)
     assert initial_balance_response.status_code == 200
     assert initial_balance_response.json()["balance_credits"] == 0
-
-    webhook_response = await client.post(
-        "/credits/purchases/webhook",
-        data={"id": "tr_credit_test_1"},
+    balance_etag = initial_balance_response.headers["etag"]
+    cached_balance_response = await client.get(
+        "/credits/balance",
+        headers={**headers, "If-None-Match": balance_etag},
     )
+    assert cached_balance_response.status_code == 304
+
+    with assert_max_queries(1):
+        webhook_response = await client.post(
+            "/credits/purchases/webhook",
+            data={"id": "tr_credit_test_1"},
+        )
     assert webhook_response.status_code == 200
 
     second_webhook_response = await client.post(
@@ -59,8 +82,20 @@ async def test_credit_purchase_webhook_updates_balance_once(
         data={"id": "tr_credit_test_1"},
     )
     assert second_webhook_response.status_code == 200
+    assert await drain_webhook_inbox() == 1
+    assert fetched_ids == ["tr_credit_test_1"]
 
-    balance_response = await client.get("/credits/balance", headers=headers)
+    replayed_webhook_response = await client.post(
+        "/credits/purchases/webhook",
+        data={"id": "tr_credit_test_1"},
+    )
+    assert replayed_webhook_response.status_code == 200
+    assert await drain_webhook_inbox() == 1
+
+    balance_response = await client.get(
+        "/credits/balance",
+        headers={**headers, "If-None-Match": balance_etag},
+    )
     assert balance_response.status_code == 200
     assert balance_response.json()["balance_credits"] == 120
 
@@ -85,7 +120,7 @@ async def test_credit_purchase_ownership_enforced(
 ) -> None:
     """Users must not access other users' credit purchase records."""
 
-    def _mock_create_payment(**_: object) -> dict[str, str]:
+    async def _mock_create_payment(**_: object) -> dict[str, str]:
         return {
             "mollie_payment_id": "tr_credit_test_2",
             "checkout_url": "https://checkout.example/tr_credit_test_2",
@@ -110,3 +145,43 @@ async def test_credit_purchase_ownership_enforced(
         headers={"Authorization": f"Bearer {token_b}"},
     )
     assert response.status_code == 404
+
+
+async def test_credit_purchase_settles_through_fake_mollie(
+    client: AsyncClient,
+    monkeypatch: MonkeyPatch,
+    drain_webhook_inbox: Callable[[], Awaitable[int]],
+) -> None:
+    """The fake Mollie service should drive create, webhook and status refresh end to end."""
+
+    fake = FakeMollie(
+        FakeMollieConfig(settle_after=LatencyDistribution(median_ms=50.0)),
+        webhook_transport=ASGITransport(app=app),
+    )
+    mollie_client = MollieClient(
+        api_key="test_fake",
+        base_url="http://fake-mollie/v2",
+        timeout=httpx.Timeout(5.0),
+        limits=httpx.Limits(max_connections=4),
+        http2=False,
+        transport=ASGITransport(app=fake.app),
+    )
+    monkeypatch.setattr("app.services.mollie.mollie_client", mollie_client)
+
+    token = await _register_and_get_token(client, "credits-fake-mollie@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        create_response = await client.post(
+            "/credits/purchases", headers=headers, json={"amount_cents": 1000}
+        )
+        assert create_response.status_code == 201
+        assert create_response.json()["checkout_url"].startswith("http://fake-mollie/checkout/")
+        await fake.drain()
+        assert await drain_webhook_inbox() == 1
+    finally:
+        await fake.close()
+        await mollie_client.close()
+
+    assert fake.stats.webhooks_delivered == 1
+    balance_response = await client.get("/credits/balance", headers=headers)
+    assert balance_response.json()["balance_credits"] == 100
@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import exc as sa_exc
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.services.db_pool import Histogram, InstrumentedAsyncAdaptedQueuePool, db_pool_monitor
+from app.services.metrics import metrics_registry
+
+_EXPORTED_HISTOGRAMS = (
+    "db_pool_checkout_wait_seconds",
+    "db_pool_checkout_hold_seconds",
+    "db_pool_connection_lifetime_seconds",
+)
+
+
+def _exported_count(name: str) -> float:
+    """Read a Prometheus histogram's observation count from the app registry."""
+
+    return metrics_registry.get_sample_value(f"{name}_count") or 0.0
+
+
+def test_histogram_reports_cumulative_buckets() -> None:
+    """Observations should land in the first bucket whose bound they do not exceed."""
+
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(3.65)
+
+
+async def test_pool_records_waits_timeouts_holds_and_lifetimes(test_engine: AsyncEngine) -> None:
+    """An exhausted pool should count the timeout and every checkout, hold and close."""
+
+    engine = create_async_engine(
+        test_engine.url,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    db_pool_monitor.attach(engine)
+    db_pool_monitor.reset()
+    exported_before = {name: _exported_count(name) for name in _EXPORTED_HISTOGRAMS}
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            busy = db_pool_monitor.snapshot(engine.pool)
+            with pytest.raises(sa_exc.TimeoutError):
+                async with engine.connect():
+                    pass
+    finally:
+        await engine.dispose()
+
+    stats = db_pool_monitor.snapshot(engine.pool)
+    assert busy.checked_out == 1
+    assert busy.pool_size == 1
+    assert stats.checked_out == 0
+    assert stats.checkouts_total == 1
+    assert stats.checkout_timeouts_total == 1
+    assert stats.checkout_hold_seconds["count"] == 1
+    assert stats.connections_opened_total == 1
+    assert stats.connections_closed_total == 1
+    assert stats.connection_lifetime_seconds["count"] == 1
+    assert {name: _exported_count(name) - exported_before[name] for name in exported_before} == {
+        name: 1 for name in _EXPORTED_HISTOGRAMS
+    }
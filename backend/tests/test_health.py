@@ -1,5 +1,10 @@
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
 from httpx import AsyncClient
 
+from app.services.query_tracking import QueryStats
+
 
 async def test_health_check(client: AsyncClient) -> None:
     """Health endpoint returns liveness status."""
@@ -9,9 +14,51 @@ async def test_health_check(client: AsyncClient) -> None:
     assert response.json() == {"status": "ok"}
 
 
-async def test_db_health_check(client: AsyncClient) -> None:
+async def test_db_health_check(
+    client: AsyncClient,
+    assert_max_queries: Callable[[int], AbstractContextManager[QueryStats]],
+) -> None:
     """DB health endpoint verifies database connectivity."""
 
-    response = await client.get("/health/db")
+    with assert_max_queries(1):
+        response = await client.get("/health/db")
     assert response.status_code == 200
     assert response.json() == {"status": "ok", "database": "connected"}
+
+
+async def test_db_pool_health_reports_pool_and_server_limits(client: AsyncClient) -> None:
+    """DB pool health endpoint exposes pool limits, histograms and Postgres headroom."""
+
+    response = await client.get("/health/db/pool")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["pool_size"] >= 1
+    assert payload["server_max_connections"] >= payload["server_connections"] >= 1
+    assert "+Inf" in payload["checkout_wait_seconds"]["buckets"]
+
+
+async def test_bot_pool_health_reports_capacity(client: AsyncClient) -> None:
+    """Bot pool health endpoint exposes concurrency limits and queue counters."""
+
+    response = await client.get("/health/bots")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["max_concurrency"] >= 1
+    assert payload["queue_depth"] == 0
+
+
+async def test_password_hasher_health_reports_queue_metrics(client: AsyncClient) -> None:
+    """Auth health endpoint exposes bcrypt executor limits and queue-wait counters."""
+
+    register_response = await client.post(
+        "/auth/register",
+        json={"email": "hasher-health@example.com", "password": "supersecret"},
+    )
+    assert register_response.status_code == 201
+
+    response = await client.get("/health/auth")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["max_workers"] >= 1
+    assert payload["calls_completed"] >= 1
+    assert payload["queue_wait_seconds_total"] >= 0
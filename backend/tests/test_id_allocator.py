@@ -0,0 +1,44 @@
+from pytest import MonkeyPatch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.id_allocator import SequenceIdAllocator
+
+
+async def test_allocator_reserves_blocks_instead_of_rows(
+    db_session: AsyncSession,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """Allocating many ids should only advance the sequence once per block."""
+
+    allocator = SequenceIdAllocator()
+    reserved_blocks: list[range] = []
+    reserve_block = allocator._reserve_block
+
+    async def _recording_reserve_block(db: AsyncSession, sequence_name: str) -> object:
+        block = await reserve_block(db, sequence_name)
+        reserved_blocks.append(range(block.next_value, block.stop_value))
+        return block
+
+    monkeypatch.setattr(allocator, "_reserve_block", _recording_reserve_block)
+
+    allocated_ids = [await allocator.next_id(db_session, "message_id_seq") for _ in range(120)]
+
+    assert [len(block) for block in reserved_blocks] == [50, 50, 50]
+    assert allocated_ids == [value for block in reserved_blocks for value in block][:120]
+
+
+async def test_allocators_in_separate_workers_never_collide(db_session: AsyncSession) -> None:
+    """Independent allocators sharing one sequence should hand out disjoint ids."""
+
+    worker_a = SequenceIdAllocator()
+    worker_b = SequenceIdAllocator()
+
+    ids_a: list[int] = []
+    ids_b: list[int] = []
+    for _ in range(75):
+        ids_a.append(await worker_a.next_id(db_session, "conversation_id_seq"))
+        ids_b.append(await worker_b.next_id(db_session, "conversation_id_seq"))
+
+    assert len(set(ids_a)) == 75
+    assert len(set(ids_b)) == 75
+    assert set(ids_a).isdisjoint(ids_b)
@@ -0,0 +1,125 @@
+import asyncio
+
+import httpx
+import pytest
+from httpx import AsyncClient
+
+from app.services.metrics import metrics_registry
+from app.services.mollie import MollieClient
+
+
+def _sample(name: str, **labels: str) -> float:
+    """Read one sample from the app registry, treating a missing series as zero."""
+
+    return metrics_registry.get_sample_value(name, labels) or 0.0
+
+
+async def test_metrics_label_requests_by_route_template_and_count_queries(
+    client: AsyncClient,
+) -> None:
+    """Requests are labelled by route template, with the queries they issued per route."""
+
+    route_labels = {"method": "GET", "route": "/health/db"}
+    requests_before = _sample("http_requests_total", **route_labels, status="200")
+    queries_before = _sample("db_queries_total", route="/health/db")
+    unmatched_before = _sample("http_requests_total", method="GET", route="unmatched", status="404")
+
+    assert (await client.get("/health/db")).status_code == 200
+    assert (await client.get("/no/such/path/12345")).status_code == 404
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/health/db"}' in (
+        response.text
+    )
+    assert "http_requests_in_flight 1.0" in response.text
+    assert "db_pool_checked_out" in response.text
+    assert "db_pool_checkout_wait_seconds_bucket" in response.text
+    assert "bot_pool_queue_depth" in response.text
+    assert _sample("http_requests_total", **route_labels, status="200") == requests_before + 1
+    assert _sample("db_queries_total", route="/health/db") >= queries_before + 1
+    assert (
+        _sample("http_requests_total", method="GET", route="unmatched", status="404")
+        == unmatched_before + 1
+    )
+
+
+async def test_mollie_calls_record_latency_and_failure_outcomes() -> None:
+    """Every Mollie call is timed and counted with its outcome, so error rates are visible."""
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/tr_missing"):
+            return httpx.Response(404, json={"status": 404})
+        return httpx.Response(200, json={"id": "tr_ok", "status": "paid"})
+
+    client = MollieClient(
+        api_key="test_key",
+        base_url="https://mollie.test/v2",
+        timeout=httpx.Timeout(1.0),
+        limits=httpx.Limits(max_connections=2),
+        http2=False,
+        transport=httpx.MockTransport(_handler),
+    )
+    ok_before = _sample("mollie_requests_total", operation="get_payment", outcome="ok")
+    errors_before = _sample("mollie_requests_total", operation="get_payment", outcome="http_error")
+    timed_before = _sample("mollie_request_duration_seconds_count", operation="get_payment")
+    try:
+        await client.get_payment("tr_ok")
+        with pytest.raises(RuntimeError):
+            await client.get_payment("tr_missing")
+    finally:
+        await client.close()
+
+    assert _sample("mollie_requests_total", operation="get_payment", outcome="ok") == ok_before + 1
+    assert (
+        _sample("mollie_requests_total", operation="get_payment", outcome="http_error")
+        == errors_before + 1
+    )
+    assert (
+        _sample("mollie_request_duration_seconds_count", operation="get_payment")
+        == timed_before + 2
+    )
+
+
+async def test_mollie_calls_label_unexpected_errors_apart_from_cancellations() -> None:
+    """Unexpected failures count as `error`, and only real cancellations as `cancelled`."""
+
+    release = asyncio.Event()
+
+    async def _handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/tr_slow"):
+            await release.wait()
+        raise LookupError("handler bug")
+
+    client = MollieClient(
+        api_key="test_key",
+        base_url="https://mollie.test/v2",
+        timeout=httpx.Timeout(1.0),
+        limits=httpx.Limits(max_connections=2),
+        http2=False,
+        transport=httpx.MockTransport(_handler),
+    )
+    errors_before = _sample("mollie_requests_total", operation="get_payment", outcome="error")
+    cancelled_before = _sample(
+        "mollie_requests_total", operation="get_payment", outcome="cancelled"
+    )
+    try:
+        with pytest.raises(LookupError):
+            await client.get_payment("tr_broken")
+        slow = asyncio.ensure_future(client.get_payment("tr_slow"))
+        await asyncio.sleep(0.01)
+        slow.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await slow
+    finally:
+        await client.close()
+
+    assert (
+        _sample("mollie_requests_total", operation="get_payment", outcome="error")
+        == errors_before + 1
+    )
+    assert (
+        _sample("mollie_requests_total", operation="get_payment", outcome="cancelled")
+        == cancelled_before + 1
+    )
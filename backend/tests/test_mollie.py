@@ -0,0 +1,97 @@
+import json
+
+import httpx
+import pytest
+
+from app.services.mollie import MollieClient
+
+
+def _client(handler: httpx.MockTransport, *, api_key: str = "test_key") -> MollieClient:
+    """Build a Mollie client that talks to an in-memory transport."""
+
+    return MollieClient(
+        api_key=api_key,
+        base_url="https://mollie.test/v2",
+        timeout=httpx.Timeout(1.0),
+        limits=httpx.Limits(max_connections=2),
+        http2=False,
+        transport=handler,
+    )
+
+
+async def test_create_payment_posts_amount_and_parses_checkout_link() -> None:
+    """Create calls should send the bearer key and EUR amount and return the checkout url."""
+
+    requests: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            201,
+            json={
+                "id": "tr_test",
+                "status": "open",
+                "_links": {"checkout": {"href": "https://checkout.test/tr_test"}},
+            },
+        )
+
+    client = _client(httpx.MockTransport(_handler))
+    try:
+        result = await client.create_payment(
+            amount_cents=1250,
+            description="Credits",
+            redirect_url="https://app.test/return",
+            webhook_url="https://app.test/webhook",
+            metadata={"payment_id": "1"},
+        )
+        status = await client.get_payment("tr_test")
+    finally:
+        await client.close()
+
+    assert result == {
+        "mollie_payment_id": "tr_test",
+        "checkout_url": "https://checkout.test/tr_test",
+        "status": "open",
+    }
+    assert status == {"mollie_payment_id": "tr_test", "status": "open"}
+    assert requests[0].headers["Authorization"] == "Bearer test_key"
+    assert str(requests[0].url) == "https://mollie.test/v2/payments"
+    assert json.loads(requests[0].content)["amount"] == {"currency": "EUR", "value": "12.50"}
+    assert str(requests[1].url) == "https://mollie.test/v2/payments/tr_test"
+
+
+async def test_error_responses_and_missing_key_raise() -> None:
+    """HTTP errors should surface as RuntimeError and a blank key as ValueError."""
+
+    client = _client(httpx.MockTransport(lambda _: httpx.Response(422, json={"detail": "bad"})))
+    try:
+        with pytest.raises(RuntimeError):
+            await client.get_payment("tr_missing")
+    finally:
+        await client.close()
+
+    with pytest.raises(ValueError):
+        await _client(httpx.MockTransport(lambda _: httpx.Response(200)), api_key=" ").get_payment(
+            "tr_test"
+        )
+
+
+async def test_get_payment_rejects_ids_without_the_payment_prefix() -> None:
+    """Untrusted webhook ids must not be able to steer the request to another path."""
+
+    requests: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"id": "tr_a", "status": "open"})
+
+    client = _client(httpx.MockTransport(_handler))
+    try:
+        with pytest.raises(ValueError):
+            await client.get_payment("../refunds")
+        await client.get_payment("tr_a/../../refunds?x=1")
+    finally:
+        await client.close()
+
+    assert len(requests) == 1
+    assert requests[0].url.raw_path == b"/v2/payments/tr_a%2F..%2F..%2Frefunds%3Fx%3D1"
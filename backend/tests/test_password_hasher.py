@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusyError
+
+
+async def test_hashing_runs_off_the_event_loop() -> None:
+    """The loop should keep scheduling other work while bcrypt hashes run."""
+
+    hasher = PasswordHasher(max_workers=2, max_queue_depth=8, bcrypt_rounds=10)
+    ticks = 0
+
+    async def _ticker() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    ticker = asyncio.create_task(_ticker())
+    try:
+        password_hashes = await asyncio.gather(*(hasher.hash(f"pw-{index}") for index in range(4)))
+    finally:
+        ticker.cancel()
+        hasher.shutdown()
+
+    assert ticks > 4
+    assert password_hashes[0].startswith("$2b$10$")
+    stats = hasher.snapshot()
+    assert stats.calls_completed == 4
+    assert stats.in_flight == 0
+    assert stats.queue_depth == 0
+
+
+async def test_verify_matches_only_the_original_password() -> None:
+    """Verification should accept the hashed password and reject anything else."""
+
+    hasher = PasswordHasher(max_workers=1, max_queue_depth=8, bcrypt_rounds=4)
+    try:
+        password_hash = await hasher.hash("supersecret")
+        assert await hasher.verify("supersecret", password_hash)
+        assert not await hasher.verify("wrong-password", password_hash)
+        assert not await hasher.verify("supersecret", "not-a-bcrypt-hash")
+    finally:
+        hasher.shutdown()
+
+
+async def test_full_queue_rejects_new_hashes() -> None:
+    """Hashes beyond the queue depth should fail fast instead of waiting."""
+
+    hasher = PasswordHasher(max_workers=1, max_queue_depth=1, bcrypt_rounds=12)
+    try:
+        running = asyncio.ensure_future(hasher.hash("first"))
+        queued = asyncio.ensure_future(hasher.hash("second"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PasswordHasherBusyError):
+            await hasher.hash("third")
+        await asyncio.gather(running, queued)
+    finally:
+        hasher.shutdown()
+
+
+async def test_cancelled_queued_hash_releases_its_slot() -> None:
+    """A caller that gives up while its hash is still queued must not leak queue depth."""
+
+    hasher = PasswordHasher(max_workers=1, max_queue_depth=1, bcrypt_rounds=12)
+    try:
+        running = asyncio.ensure_future(hasher.hash("first"))
+        queued = asyncio.ensure_future(hasher.hash("second"))
+        await asyncio.sleep(0.05)
+        assert hasher.snapshot().queue_depth == 1
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert hasher.snapshot().queue_depth == 0
+        await running
+    finally:
+        hasher.shutdown()
+
+    stats = hasher.snapshot()
+    assert stats.queue_depth == 0
+    assert stats.in_flight == 0
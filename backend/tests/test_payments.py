@@ -1,5 +1,13 @@
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractContextManager
+
 from httpx import AsyncClient
 from pytest import MonkeyPatch
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.payments import Payment
+from app.services.query_tracking import QueryStats
 
 
 async def _register_and_get_token(client: AsyncClient, email: str) -> str:
@@ -16,10 +24,11 @@ async def _register_and_get_token(client: AsyncClient, email: str) -> str:
 async def test_create_and_get_payment_status(
     client: AsyncClient,
     monkeypatch: MonkeyPatch,
+    assert_max_queries: Callable[[int], AbstractContextManager[QueryStats]],
 ) -> None:
     """Create payment should return checkout data and persist local status."""
 
-    def _mock_create_payment(**_: object) -> dict[str, str]:
+    async def _mock_create_payment(**_: object) -> dict[str, str]:
         return {
             "mollie_payment_id": "tr_test_1",
             "checkout_url": "https://checkout.example/tr_test_1",
@@ -31,14 +40,16 @@ async def test_create_and_get_payment_status(
     token = await _register_and_get_token(client, "payments@example.com")
     headers = {"Authorization": f"Bearer {token}"}
 
-    create_response = await client.post("/payments", headers=headers, json={"challenge_id": 1})
+    with assert_max_queries(5):
+        create_response = await client.post("/payments", headers=headers, json={"challenge_id": 1})
     assert create_response.status_code == 201
     create_payload = create_response.json()
     assert create_payload["checkout_url"].startswith("https://checkout.example/")
     assert create_payload["status"] == "open"
     payment_id = create_payload["payment_id"]
 
-    status_response = await client.get(f"/payments/{payment_id}", headers=headers)
+    with assert_max_queries(1):
+        status_response = await client.get(f"/payments/{payment_id}", headers=headers)
     assert status_response.status_code == 200
     status_payload = status_response.json()
     assert status_payload["mollie_payment_id"] == "tr_test_1"
@@ -48,21 +59,22 @@ async def test_create_and_get_payment_status(
 async def test_payment_webhook_updates_status(
     client: AsyncClient,
     monkeypatch: MonkeyPatch,
+    drain_webhook_inbox: Callable[[], Awaitable[int]],
 ) -> None:
     """Webhook callback should update persisted payment status idempotently."""
 
-    def _mock_create_payment(**_: object) -> dict[str, str]:
+    async def _mock_create_payment(**_: object) -> dict[str, str]:
         return {
             "mollie_payment_id": "tr_test_2",
             "checkout_url": "https://checkout.example/tr_test_2",
             "status": "open",
         }
 
-    def _mock_get_payment(_: str) -> dict[str, str]:
+    async def _mock_get_payment(_: str) -> dict[str, str]:
         return {"mollie_payment_id": "tr_test_2", "status": "paid"}
 
     monkeypatch.setattr("app.routers.payments.create_mollie_payment", _mock_create_payment)
-    monkeypatch.setattr("app.routers.payments.get_mollie_payment", _mock_get_payment)
+    monkeypatch.setattr("app.services.webhook_inbox.get_mollie_payment", _mock_get_payment)
 
     token = await _register_and_get_token(client, "webhook@example.com")
     headers = {"Authorization": f"Bearer {token}"}
@@ -74,10 +86,18 @@ async def test_payment_webhook_updates_status(
     assert webhook_response.status_code == 200
     assert webhook_response.json()["status"] == "ok"
 
+    pending_response = await client.get(f"/payments/{payment_id}", headers=headers)
+    assert pending_response.json()["status"] == "open"
+    assert await drain_webhook_inbox() == 1
+
     status_response = await client.get(f"/payments/{payment_id}", headers=headers)
     assert status_response.status_code == 200
     assert status_response.json()["status"] == "paid"
 
+    unknown_response = await client.post("/payments/webhook", data={"id": "tr_unknown"})
+    assert unknown_response.json()["status"] == "ignored"
+    assert await drain_webhook_inbox() == 0
+
 
 async def test_payment_ownership_enforced(
     client: AsyncClient,
@@ -85,7 +105,7 @@ async def test_payment_ownership_enforced(
 ) -> None:
     """Users should not access payment records owned by other users."""
 
-    def _mock_create_payment(**_: object) -> dict[str, str]:
+    async def _mock_create_payment(**_: object) -> dict[str, str]:
         return {
             "mollie_payment_id": "tr_test_3",
             "checkout_url": "https://checkout.example/tr_test_3",
@@ -109,3 +129,33 @@ async def test_payment_ownership_enforced(
         headers={"Authorization": f"Bearer {token_b}"},
     )
     assert response.status_code == 404
+
+
+async def test_provider_call_runs_after_pending_payment_is_committed(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """The pending row should already be committed during the Mollie call and fail with it."""
+
+    pending_rows_during_call: list[int] = []
+
+    async def _failing_create_payment(**_: object) -> dict[str, str]:
+        pending_rows_during_call.append(len(db_session.new) + len(db_session.dirty))
+        raise RuntimeError("Mollie unavailable")
+
+    monkeypatch.setattr("app.routers.payments.create_mollie_payment", _failing_create_payment)
+
+    token = await _register_and_get_token(client, "provider-down@example.com")
+    response = await client.post(
+        "/payments",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"challenge_id": 1},
+    )
+    assert response.status_code == 502
+    assert pending_rows_during_call == [0]
+
+    result = await db_session.execute(
+        select(Payment.status).where(Payment.mollie_payment_id.is_(None))
+    )
+    assert result.scalars().all() == ["failed"]
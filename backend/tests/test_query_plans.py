@@ -0,0 +1,310 @@
+import re
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from httpx import AsyncClient
+from pytest import MonkeyPatch
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.prize_pool import fold_prize_pool_contributions
+
+# Static lookup tables stay a handful of rows, so a seq scan (and sorting it) is the
+# cheapest plan there and not a regression.
+_STATIC_RELATIONS = frozenset({"challenges", "timezones", "pg_sequence"})
+_TRANSACTION_CONTROL = re.compile(r"^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b", re.IGNORECASE)
+
+# Seeded ids start far above anything the sequences hand out during the test.
+_SEED_ID_BASE = 10_000_000
+
+_SEED_SQL = [
+    """
+    INSERT INTO users (user_id, reference, timezone_id, email, created_at, updated_at)
+    SELECT :base + n, gen_random_uuid(), 1, 'plan-seed-' || n || '@example.com',
+           now()::timestamp, now()::timestamp
+    FROM generate_series(1, 5000) AS n
+    """,
+    """
+    INSERT INTO credit_wallets (credit_wallet_id, user_id, balance_credits, created_at, updated_at)
+    SELECT :base + n, :base + n, 100, now()::timestamp, now()::timestamp
+    FROM generate_series(1, 5000) AS n
+    """,
+    """
+    INSERT INTO conversations (
+        conversation_id, user_id, challenge_id, message_count, created_at, updated_at
+    )
+    SELECT :base + n, :base + 1 + n % 5000, 1 + n % 3, 5, now()::timestamp, now()::timestamp
+    FROM generate_series(1, 20000) AS n
+    """,
+    """
+    INSERT INTO messages (
+        message_id, conversation_id, conversation_seq, role, content, is_secret_exposure,
+        created_at
+    )
+    SELECT :base + n, :base + 1 + n % 20000, 1 + n / 20000,
+           CASE WHEN n % 2 = 0 THEN 'user' ELSE 'assistant' END,
+           'seeded message ' || n, FALSE, now()::timestamp
+    FROM generate_series(1, 100000) AS n
+    """,
+    """
+    INSERT INTO payments (
+        payment_id, user_id, challenge_id, mollie_payment_id, amount_cents, status,
+        created_at, updated_at
+    )
+    SELECT :base + n, :base + 1 + n % 5000, 1 + n % 3, 'tr_plan_seed_' || n, 500, 'paid',
+           now()::timestamp, now()::timestamp
+    FROM generate_series(1, 20000) AS n
+    """,
+    """
+    INSERT INTO attempts (
+        attempt_id, user_id, challenge_id, payment_id, submitted_secret, is_correct, created_at
+    )
+    SELECT :base + n, :base + 1 + n % 5000, 1 + n % 3, :base + n, 'guess', FALSE,
+           now()::timestamp
+    FROM generate_series(1, 20000) AS n
+    """,
+    """
+    INSERT INTO credit_purchases (
+        credit_purchase_id, user_id, mollie_payment_id, amount_cents, credits_purchased,
+        status, created_at, updated_at
+    )
+    SELECT :base + n, :base + 1 + n % 5000, 'tr_plan_credit_' || n, 1000, 100, 'paid',
+           now()::timestamp, now()::timestamp
+    FROM generate_series(1, 10000) AS n
+    """,
+    """
+    INSERT INTO credit_transactions (
+        credit_transaction_id, user_id, challenge_id, credit_purchase_id, delta_credits,
+        transaction_type, created_at
+    )
+    SELECT :base + n, :base + 1 + n % 5000, 1 + n % 3, NULL, -1, 'attack_spend',
+           now()::timestamp
+    FROM generate_series(1, 50000) AS n
+    """,
+    """
+    INSERT INTO prize_pool_contributions (
+        prize_pool_contribution_id, challenge_id, amount_cents, created_at
+    )
+    SELECT :base + n, 1 + n % 3, 10, now()::timestamp
+    FROM generate_series(1, 20000) AS n
+    """,
+    """
+    INSERT INTO mollie_webhook_inbox (
+        source, mollie_payment_id, notification_count, attempts,
+        received_at, last_received_at, available_at
+    )
+    SELECT 'payment', 'tr_seed_' || n, 1, 1, now()::timestamp, now()::timestamp,
+        now()::timestamp + interval '1 hour'
+    FROM generate_series(1, 20000) AS n
+    """,
+]
+
+
+async def _seed_realistic_volumes(db_session: AsyncSession) -> None:
+    """Fill every hot table with enough rows that missing indexes show up in plans."""
+
+    for statement in _SEED_SQL:
+        await db_session.execute(text(statement), {"base": _SEED_ID_BASE})
+    await db_session.execute(text("ANALYZE"))
+
+
+def _scanned_relations(plan: dict[str, Any]) -> set[str]:
+    """Collect base relations read anywhere below a plan node."""
+
+    relations = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for child in plan.get("Plans", []):
+        relations |= _scanned_relations(child)
+    return relations
+
+
+def _plan_violations(plan: dict[str, Any], *, is_limited: bool = False) -> list[str]:
+    """Return seq scans, full index walks and sorts over tables expected to be index-served."""
+
+    violations: list[str] = []
+    node_type = plan["Node Type"]
+    is_limited = is_limited or node_type == "Limit"
+    relation = plan.get("Relation Name")
+    if node_type == "Seq Scan" and relation not in _STATIC_RELATIONS:
+        violations.append(f"Seq Scan on {relation}")
+    if (
+        node_type in {"Index Scan", "Index Only Scan"}
+        and "Index Cond" not in plan
+        and not (is_limited and "Filter" not in plan)
+        and relation not in _STATIC_RELATIONS
+    ):
+        # Walking a whole index for its ordering is a seq scan in disguise. An unfiltered
+        # walk under a LIMIT stops after the first rows, which is the keyset/queue pattern.
+        violations.append(f"Full {node_type} on {relation}")
+    if node_type in {"Sort", "Incremental Sort"}:
+        unindexed = _scanned_relations(plan) - _STATIC_RELATIONS
+        if unindexed:
+            violations.append(f"{node_type} over {', '.join(sorted(unindexed))}")
+    for child in plan.get("Plans", []):
+        violations.extend(_plan_violations(child, is_limited=is_limited))
+    return violations
+
+
+async def _register(client: AsyncClient, email: str) -> dict[str, str]:
+    """Create a user and return bearer auth headers."""
+
+    response = await client.post(
+        "/auth/register",
+        json={"email": email, "password": "supersecret"},
+    )
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def _exercise_routers(
+    client: AsyncClient,
+    monkeypatch: MonkeyPatch,
+    drain_webhook_inbox: Callable[[], Awaitable[int]],
+) -> None:
+    """Hit every read and write path the API exposes for one user."""
+
+    async def _mock_create_payment(**_: object) -> dict[str, str]:
+        return {
+            "mollie_payment_id": "tr_plan_live",
+            "checkout_url": "https://checkout.example/tr_plan_live",
+            "status": "open",
+        }
+
+    async def _mock_get_payment(mollie_payment_id: str) -> dict[str, str]:
+        return {"mollie_payment_id": mollie_payment_id, "status": "paid"}
+
+    async def _mock_create_purchase(**_: object) -> dict[str, str]:
+        return {
+            "mollie_payment_id": "tr_plan_credit_live",
+            "checkout_url": "https://checkout.example/tr_plan_credit_live",
+            "status": "open",
+        }
+
+    monkeypatch.setattr("app.routers.payments.create_mollie_payment", _mock_create_payment)
+    monkeypatch.setattr("app.routers.credits.create_mollie_payment", _mock_create_purchase)
+    monkeypatch.setattr("app.services.webhook_inbox.get_mollie_payment", _mock_get_payment)
+
+    headers = await _register(client, "plan-user@example.com")
+    assert (
+        await client.post(
+            "/auth/login",
+            json={"email": "plan-user@example.com", "password": "supersecret"},
+        )
+    ).status_code == 200
+    assert (await client.get("/auth/me", headers=headers)).status_code == 200
+    assert (await client.post("/users", json={"timezone_name": "UTC"})).status_code == 201
+    assert (await client.get("/users")).status_code == 200
+
+    assert (await client.get("/challenges")).status_code == 200
+    assert (await client.get("/challenges/1")).status_code == 200
+
+    purchase_response = await client.post(
+        "/credits/purchases",
+        headers=headers,
+        json={"amount_cents": 1000},
+    )
+    assert purchase_response.status_code == 201
+    purchase_id = purchase_response.json()["credit_purchase_id"]
+    webhook_response = await client.post(
+        "/credits/purchases/webhook",
+        data={"id": "tr_plan_credit_live"},
+    )
+    assert webhook_response.status_code == 200
+    assert await drain_webhook_inbox() == 1
+    purchase_url = f"/credits/purchases/{purchase_id}"
+    assert (await client.get(purchase_url, headers=headers)).status_code == 200
+    assert (await client.get("/credits/balance", headers=headers)).status_code == 200
+
+    conversation_ids = []
+    for _ in range(3):
+        response = await client.post("/challenges/1/conversations", headers=headers)
+        assert response.status_code == 201
+        conversation_ids.append(response.json()["conversation_id"])
+    conversation_id = conversation_ids[-1]
+    for index in range(3):
+        response = await client.post(
+            f"/conversations/{conversation_id}/messages",
+            headers=headers,
+            json={"content": f"probe {index}"},
+        )
+        assert response.status_code == 201
+
+    conversations_page = await client.get(
+        "/challenges/1/conversations?limit=1",
+        headers=headers,
+    )
+    assert conversations_page.status_code == 200
+    assert (
+        await client.get(
+            f"/challenges/1/conversations?cursor={conversations_page.json()['next_cursor']}",
+            headers=headers,
+        )
+    ).status_code == 200
+    messages_url = f"/conversations/{conversation_id}/messages"
+    assert (await client.get(f"{messages_url}?limit=2", headers=headers)).status_code == 200
+    assert (
+        await client.get(f"{messages_url}?after_message_id=1&limit=2", headers=headers)
+    ).status_code == 200
+    assert (
+        await client.get(f"{messages_url}?before_message_id={2**40}&limit=2", headers=headers)
+    ).status_code == 200
+
+    payment_response = await client.post("/payments", headers=headers, json={"challenge_id": 1})
+    assert payment_response.status_code == 201
+    payment_id = payment_response.json()["payment_id"]
+    assert (await client.post("/payments/webhook", data={"id": "tr_plan_live"})).status_code == 200
+    assert await drain_webhook_inbox() == 1
+    assert (await client.get(f"/payments/{payment_id}", headers=headers)).status_code == 200
+    attempt_response = await client.post(
+        "/attempts",
+        headers=headers,
+        json={"challenge_id": 1, "payment_id": payment_id, "submitted_secret": "wrong"},
+    )
+    assert attempt_response.status_code == 201
+    assert (await client.get("/attempts", headers=headers)).status_code == 200
+    assert (await client.get("/attempts?challenge_id=1", headers=headers)).status_code == 200
+
+
+async def test_router_queries_use_indexes(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: MonkeyPatch,
+    drain_webhook_inbox: Callable[[], Awaitable[int]],
+) -> None:
+    """Every statement the routers issue should be index-served on a realistic dataset."""
+
+    await _seed_realistic_volumes(db_session)
+    connection = await db_session.connection()
+    captured: dict[str, tuple[Any, ...]] = {}
+
+    def _capture(
+        conn: Connection,
+        cursor: object,
+        statement: str,
+        parameters: tuple[Any, ...],
+        context: object,
+        executemany: bool,
+    ) -> None:
+        if not executemany and not _TRANSACTION_CONTROL.match(statement):
+            captured.setdefault(statement, parameters)
+
+    event.listen(connection.sync_connection, "before_cursor_execute", _capture)
+    try:
+        await _exercise_routers(client, monkeypatch, drain_webhook_inbox)
+        await fold_prize_pool_contributions(db_session, batch_size=5000)
+    finally:
+        event.remove(connection.sync_connection, "before_cursor_execute", _capture)
+
+    # Small per-user row counts make a sort or a seq scan legitimately cheaper for some
+    # statements. Penalising both means they only appear when no index can serve them.
+    await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    await connection.exec_driver_sql("SET LOCAL enable_sort = off")
+    failures: list[str] = []
+    for statement, parameters in captured.items():
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar_one()[0]["Plan"]
+        for violation in _plan_violations(plan):
+            failures.append(f"{violation}\n{' '.join(statement.split())}")
+
+    assert len(captured) > 20
+    assert not failures, "\n\n".join(failures)
@@ -0,0 +1,74 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.middleware import QueryBudgetMiddleware
+from app.services.query_tracking import track_queries
+
+
+async def _open_savepoint(db_session: AsyncSession) -> None:
+    """Start the per-test savepoint up front so it is not counted as app work."""
+
+    await db_session.execute(text("SELECT 0"))
+
+
+async def test_debug_responses_report_query_count_and_db_time(
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    """In debug mode each response carries its statement count and DB time."""
+
+    await _open_savepoint(db_session)
+    response = await client.get("/health/db")
+    assert response.status_code == 200
+    assert response.headers["X-DB-Query-Count"] == "1"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+
+async def test_nested_scopes_roll_up_into_the_enclosing_scope(db_session: AsyncSession) -> None:
+    """Statements counted by an inner scope also count for the scope around it."""
+
+    await _open_savepoint(db_session)
+    with track_queries() as outer:
+        await db_session.execute(text("SELECT 1"))
+        with track_queries() as inner:
+            await db_session.execute(text("SELECT 2"))
+
+    assert inner.count == 1
+    assert outer.count == 2
+    assert outer.seconds >= inner.seconds > 0
+
+
+async def test_repeated_statements_are_logged_as_possible_n_plus_one(
+    db_session: AsyncSession,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """A request repeating one statement past the limit logs a warning naming it."""
+
+    await _open_savepoint(db_session)
+    budget_app = FastAPI()
+
+    @budget_app.get("/items")
+    async def _items() -> dict[str, int]:
+        for item_id in range(3):
+            await db_session.execute(text("SELECT CAST(:item_id AS int)"), {"item_id": item_id})
+        return {"items": 3}
+
+    budget_app.add_middleware(
+        QueryBudgetMiddleware, max_queries=2, max_repeats=3, expose_headers=False
+    )
+    with caplog.at_level(logging.WARNING, logger="app.middleware"):
+        async with AsyncClient(
+            transport=ASGITransport(app=budget_app), base_url="http://test"
+        ) as budget_client:
+            response = await budget_client.get("/items")
+
+    assert response.status_code == 200
+    assert "X-DB-Query-Count" not in response.headers
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("Possible N+1 on GET /items: statement ran 3 times" in m for m in messages)
+    assert any("GET /items ran 3 statements (budget 2)" in m for m in messages)
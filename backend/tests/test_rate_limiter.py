@@ -0,0 +1,155 @@
+import asyncio
+import uuid
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
+from httpx import ASGITransport, AsyncClient
+from pytest import MonkeyPatch
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app.main import app
+from app.services.auth import create_access_token
+from app.services.query_tracking import QueryStats
+from app.services.rate_limiter import (
+    InMemoryRateLimitBackend,
+    PostgresRateLimitBackend,
+    RateLimitPolicy,
+    rate_limiter,
+)
+
+
+async def test_memory_bucket_allows_a_burst_then_refills() -> None:
+    """A full bucket serves `burst` requests, then one more per refill interval."""
+
+    now = [0.0]
+    backend = InMemoryRateLimitBackend(max_keys=10, clock=lambda: now[0])
+    policy = RateLimitPolicy(burst=2, per_minute=6.0)
+
+    assert (await backend.consume("login_ip:1.2.3.4", policy)).allowed
+    assert (await backend.consume("login_ip:1.2.3.4", policy)).allowed
+    denied = await backend.consume("login_ip:1.2.3.4", policy)
+    assert not denied.allowed
+    assert denied.retry_after_seconds == 10.0
+    assert (await backend.consume("login_ip:5.6.7.8", policy)).allowed
+
+    now[0] = 10.0
+    assert (await backend.consume("login_ip:1.2.3.4", policy)).allowed
+    assert not (await backend.consume("login_ip:1.2.3.4", policy)).allowed
+
+    now[0] = 100.0
+    assert await backend.prune(idle_seconds=20.0) == 2
+
+
+async def test_postgres_buckets_are_shared_and_atomic(test_engine: AsyncEngine) -> None:
+    """Concurrent checks on one key never hand out more tokens than the bucket holds."""
+
+    backend = PostgresRateLimitBackend(test_engine)
+    key = f"send_message_user:{uuid.uuid4()}"
+    policy = RateLimitPolicy(burst=5, per_minute=0.01)
+
+    decisions = await asyncio.gather(*(backend.consume(key, policy) for _ in range(20)))
+
+    assert sum(decision.allowed for decision in decisions) == 5
+    assert all(decision.retry_after_seconds > 0 for decision in decisions if not decision.allowed)
+
+    async with test_engine.begin() as conn:
+        await conn.execute(
+            text(
+                "UPDATE rate_limit_buckets SET updated_at = updated_at - interval '1 day' "
+                "WHERE bucket_key = :key"
+            ),
+            {"key": key},
+        )
+    assert (await backend.consume(key, policy)).allowed
+    assert await backend.prune(idle_seconds=0.0) >= 1
+
+
+async def test_login_is_limited_per_ip_before_any_query(
+    client: AsyncClient,
+    monkeypatch: MonkeyPatch,
+    assert_max_queries: Callable[[int], AbstractContextManager[QueryStats]],
+) -> None:
+    """Over the limit, login answers 429 with Retry-After without touching the database."""
+
+    monkeypatch.setitem(rate_limiter.policies, "login_ip", RateLimitPolicy(2, 1.0))
+    credentials = {"email": "nobody@example.com", "password": "supersecret"}
+
+    for _ in range(2):
+        assert (await client.post("/auth/login", json=credentials)).status_code == 401
+
+    with assert_max_queries(0):
+        response = await client.post("/auth/login", json=credentials)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "60"
+
+
+async def test_send_message_is_limited_per_user(
+    client: AsyncClient,
+    monkeypatch: MonkeyPatch,
+    assert_max_queries: Callable[[int], AbstractContextManager[QueryStats]],
+) -> None:
+    """One user's exhausted bucket does not limit another user on the same IP."""
+
+    monkeypatch.setitem(rate_limiter.policies, "send_message_user", RateLimitPolicy(1, 1.0))
+    first = {"Authorization": f"Bearer {create_access_token(910001, 'a@example.com')}"}
+    second = {"Authorization": f"Bearer {create_access_token(910002, 'b@example.com')}"}
+    url = "/conversations/999999/messages"
+    body = {"content": "hello"}
+
+    assert (await client.post(url, headers=first, json=body)).status_code == 401
+    with assert_max_queries(0):
+        limited = await client.post(url, headers=first, json=body)
+    assert limited.status_code == 429
+    assert "Retry-After" in limited.headers
+    assert (await client.post(url, headers=second, json=body)).status_code == 401
+
+
+async def test_ip_limits_key_on_the_client_behind_a_trusted_proxy(
+    client: AsyncClient,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """Clients behind the proxy get their own buckets, and a spoofed hop changes nothing."""
+
+    monkeypatch.setitem(rate_limiter.policies, "login_ip", RateLimitPolicy(1, 1.0))
+    credentials = {"email": "nobody@example.com", "password": "supersecret"}
+    # How uvicorn wraps the app for the prod compose file, seen from the nginx container.
+    transport = ASGITransport(
+        app=ProxyHeadersMiddleware(app, trusted_hosts="172.30.0.10"),
+        client=("172.30.0.10", 51234),
+    )
+
+    async with AsyncClient(transport=transport, base_url="http://test") as proxied:
+
+        async def _login(forwarded_for: str) -> int:
+            response = await proxied.post(
+                "/auth/login", json=credentials, headers={"X-Forwarded-For": forwarded_for}
+            )
+            return response.status_code
+
+        assert await _login("198.51.100.1") == 401
+        assert await _login("198.51.100.2") == 401
+        assert await _login("198.51.100.1") == 429
+        # nginx appends the real peer, so only the rightmost untrusted entry counts.
+        assert await _login("203.0.113.9, 198.51.100.2") == 429
+
+
+async def test_login_is_limited_per_email_across_ips(
+    client: AsyncClient,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """Rotating client IPs does not buy more password guesses against one account."""
+
+    monkeypatch.setitem(rate_limiter.policies, "login_email", RateLimitPolicy(2, 1.0))
+
+    async def _login(client_ip: str, email: str) -> int:
+        transport = ASGITransport(app=app, client=(client_ip, 51234))
+        async with AsyncClient(transport=transport, base_url="http://test") as from_ip:
+            response = await from_ip.post("/auth/login", json={"email": email, "password": "guess"})
+        return response.status_code
+
+    assert await _login("198.51.100.1", "victim@example.com") == 401
+    assert await _login("198.51.100.2", "victim@example.com") == 401
+    assert await _login("198.51.100.3", " Victim@Example.com") == 429
+    assert await _login("198.51.100.3", "someone-else@example.com") == 401
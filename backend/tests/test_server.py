@@ -0,0 +1,43 @@
+from pathlib import Path
+from unittest import mock
+
+from app.server import prepare_multiprocess_metrics, uvicorn_options
+from app.services.metrics import MULTIPROCESS_DIR_ENV
+
+
+def test_uvicorn_options_follow_server_settings() -> None:
+    """Worker count and recycling come from SERVER_*, with 0 meaning no request limit."""
+
+    with (
+        mock.patch("app.config.settings.SERVER_WORKERS", 3),
+        mock.patch("app.config.settings.SERVER_MAX_REQUESTS", 0),
+    ):
+        options = uvicorn_options()
+    assert options["workers"] == 3
+    assert options["limit_max_requests"] is None
+
+    with (
+        mock.patch("app.config.settings.SERVER_WORKERS", 0),
+        mock.patch("app.config.settings.SERVER_MAX_REQUESTS", 500),
+        mock.patch("os.cpu_count", return_value=6),
+    ):
+        options = uvicorn_options()
+    assert options["workers"] == 6
+    assert options["limit_max_requests"] == 500
+
+
+def test_multiprocess_metrics_dir_is_cleared_before_workers_start(tmp_path: Path) -> None:
+    """Files left by an earlier run are removed so stale worker samples are not summed."""
+
+    metrics_dir = tmp_path / "metrics"
+    metrics_dir.mkdir()
+    (metrics_dir / "counter_123.db").write_bytes(b"stale")
+    environ = {MULTIPROCESS_DIR_ENV: str(metrics_dir)}
+
+    prepare_multiprocess_metrics(environ)
+
+    assert list(metrics_dir.iterdir()) == []
+
+    fresh: dict[str, str] = {}
+    prepare_multiprocess_metrics(fresh)
+    assert Path(fresh[MULTIPROCESS_DIR_ENV]).is_dir()
@@ -0,0 +1,62 @@
+import asyncio
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.database import init_db_schema
+from app.main import (
+    _PREPARE_DATABASE_LOCK_SQL,
+    _PREPARE_DATABASE_UNLOCK_SQL,
+    prepare_database,
+    seed_challenges,
+    seed_timezones,
+)
+from app.models.challenges import Challenge
+from app.models.timezones import Timezone
+from app.services.query_tracking import QueryStats
+from app.static_data.challenges import SEED_CHALLENGES
+from app.static_data.timezones import TimezoneEnum
+
+
+async def test_schema_init_only_reapplies_changed_files(db_session: AsyncSession) -> None:
+    """Files whose recorded checksum still matches are skipped on the next boot."""
+
+    assert await init_db_schema(db_session) == []
+
+    await db_session.execute(
+        text("UPDATE schema_files SET checksum = 'stale' WHERE file_name = 'timezones.sql'")
+    )
+    assert await init_db_schema(db_session) == ["timezones.sql"]
+    assert await init_db_schema(db_session) == []
+
+
+async def test_seeding_is_one_idempotent_statement_per_table(
+    db_session: AsyncSession,
+    assert_max_queries: Callable[[int], AbstractContextManager[QueryStats]],
+) -> None:
+    """Re-seeding existing rows runs one bulk insert per table and changes nothing."""
+
+    with assert_max_queries(2):
+        await seed_timezones(db_session)
+        await seed_challenges(db_session)
+
+    assert await db_session.scalar(select(func.count()).select_from(Timezone)) == len(TimezoneEnum)
+    assert await db_session.scalar(select(func.count()).select_from(Challenge)) == len(
+        SEED_CHALLENGES
+    )
+
+
+async def test_prepare_database_waits_for_the_init_lock(test_engine: AsyncEngine) -> None:
+    """A worker starting while another one prepares the database waits for it to finish."""
+
+    async with test_engine.connect() as holder:
+        await holder.execute(_PREPARE_DATABASE_LOCK_SQL)
+        preparing = asyncio.create_task(prepare_database(test_engine))
+        await asyncio.sleep(0.2)
+        assert not preparing.done()
+        await holder.execute(_PREPARE_DATABASE_UNLOCK_SQL)
+        await holder.commit()
+
+    assert await asyncio.wait_for(preparing, timeout=10) == []
@@ -0,0 +1,73 @@
+import pytest
+from pytest import MonkeyPatch
+
+from app.services import auth
+from app.services.auth import VerifiedTokenCache, create_access_token
+
+
+class _FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cached_tokens_skip_verification_until_expiry(monkeypatch: MonkeyPatch) -> None:
+    """Repeat decodes should reuse verified claims and stop once `exp` has passed."""
+
+    token = create_access_token(user_id=42, email="token-cache@example.com")
+    exp = int(auth.decode_access_token(token)["exp"])
+    clock = _FakeClock(exp - 60)
+    cache = VerifiedTokenCache(max_entries=8, clock=clock)
+
+    verifications = 0
+    real_decode = auth.decode_access_token
+
+    def _counting_decode(raw_token: str) -> dict[str, str | int]:
+        nonlocal verifications
+        verifications += 1
+        return real_decode(raw_token)
+
+    monkeypatch.setattr(auth, "decode_access_token", _counting_decode)
+
+    assert cache.decode(token)["sub"] == "42"
+    assert cache.decode(token)["sub"] == "42"
+    assert verifications == 1
+
+    clock.now = exp
+    cache.decode(token)
+    assert verifications == 2
+
+
+def test_callers_cannot_change_cached_claims() -> None:
+    """Mutating returned claims must not affect later decodes of the same token."""
+
+    token = create_access_token(user_id=42, email="token-copy@example.com")
+    cache = VerifiedTokenCache(max_entries=8)
+
+    cache.decode(token)["sub"] = "7"
+    cached_claims = cache.decode(token)
+    cached_claims["sub"] = "8"
+
+    assert cache.decode(token)["sub"] == "42"
+
+
+def test_cache_rejects_tampered_tokens_and_stays_bounded() -> None:
+    """Only exact verified tokens may hit, and old entries are evicted past the bound."""
+
+    cache = VerifiedTokenCache(max_entries=1)
+    first_token = create_access_token(user_id=1, email="first@example.com")
+    second_token = create_access_token(user_id=2, email="second@example.com")
+
+    header, payload, signature = first_token.split(".")
+    tampered_signature = ("B" if signature[0] == "A" else "A") + signature[1:]
+
+    assert cache.decode(first_token)["sub"] == "1"
+    with pytest.raises(ValueError):
+        cache.decode(f"{header}.{payload}.{tampered_signature}")
+
+    assert cache.decode(second_token)["sub"] == "2"
+    assert len(cache) == 1
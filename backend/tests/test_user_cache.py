@@ -0,0 +1,81 @@
+import uuid
+
+import pendulum
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.users import User
+from app.services.user_cache import (
+    AuthenticatedUser,
+    AuthenticatedUserCache,
+    authenticated_user_cache,
+)
+
+
+class _FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _identity(user_id: int) -> AuthenticatedUser:
+    """Build a throwaway identity for cache bookkeeping tests."""
+
+    now = pendulum.now("UTC").naive()
+    return AuthenticatedUser(
+        user_id=user_id,
+        reference=uuid.uuid4(),
+        email=f"cache-{user_id}@example.com",
+        timezone_id=1,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def test_cache_evicts_least_recently_used_and_expired_entries() -> None:
+    """The cache should stay bounded and drop identities once their TTL passes."""
+
+    clock = _FakeClock()
+    cache = AuthenticatedUserCache(max_entries=2, ttl_seconds=10.0, clock=clock)
+    cache.put(_identity(1))
+    cache.put(_identity(2))
+    assert cache.get(1) is not None
+
+    cache.put(_identity(3))
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+
+    clock.now = 10.0
+    assert cache.get(1) is None
+    assert cache.get(3) is None
+
+
+async def test_authenticated_requests_reuse_cached_identity(
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    """Repeat requests should use the cached identity until the user row changes."""
+
+    register_response = await client.post(
+        "/auth/register",
+        json={"email": "cached-identity@example.com", "password": "supersecret"},
+    )
+    headers = {"Authorization": f"Bearer {register_response.json()['access_token']}"}
+
+    me_response = await client.get("/auth/me", headers=headers)
+    assert me_response.status_code == 200
+    user_id = me_response.json()["user_id"]
+    assert authenticated_user_cache.get(user_id) is not None
+
+    user = (await db_session.execute(select(User).where(User.user_id == user_id))).scalar_one()
+    user.email = "renamed-identity@example.com"
+    await db_session.flush()
+    assert authenticated_user_cache.get(user_id) is None
+
+    refreshed_response = await client.get("/auth/me", headers=headers)
+    assert refreshed_response.json()["email"] == "renamed-identity@example.com"
@@ -1,10 +1,19 @@
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
 from httpx import AsyncClient
 
+from app.services.query_tracking import QueryStats
+
 
-async def test_create_user(client: AsyncClient) -> None:
+async def test_create_user(
+    client: AsyncClient,
+    assert_max_queries: Callable[[int], AbstractContextManager[QueryStats]],
+) -> None:
     """Create an example user with a seeded timezone."""
 
-    response = await client.post("/users", json={"timezone_name": "Europe/Amsterdam"})
+    with assert_max_queries(3):
+        response = await client.post("/users", json={"timezone_name": "Europe/Amsterdam"})
     assert response.status_code == 201
 
     payload = response.json()
@@ -12,14 +21,19 @@ async def test_create_user(client: AsyncClient) -> None:
     assert "reference" in payload
 
 
-async def test_list_users(client: AsyncClient) -> None:
-    """List endpoint returns created users."""
+async def test_list_users(
+    client: AsyncClient,
+    assert_max_queries: Callable[[int], AbstractContextManager[QueryStats]],
+) -> None:
+    """List endpoint returns created users, serialized exactly like the create response."""
 
     create_response = await client.post("/users", json={"timezone_name": "UTC"})
     assert create_response.status_code == 201
 
-    response = await client.get("/users")
+    with assert_max_queries(1):
+        response = await client.get("/users")
     assert response.status_code == 200
     payload = response.json()
     assert isinstance(payload, list)
     assert len(payload) >= 1
+    assert payload[0] == create_response.json()
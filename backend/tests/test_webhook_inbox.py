@@ -0,0 +1,98 @@
+from collections.abc import Awaitable, Callable
+
+from httpx import AsyncClient
+from pytest import MonkeyPatch
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.mollie_webhook_inbox import MollieWebhookInboxEntry
+
+
+async def _create_open_payment(
+    client: AsyncClient,
+    monkeypatch: MonkeyPatch,
+    mollie_payment_id: str,
+) -> dict[str, str]:
+    """Register a user, create an open payment and return its auth headers."""
+
+    async def _mock_create_payment(**_: object) -> dict[str, str]:
+        return {
+            "mollie_payment_id": mollie_payment_id,
+            "checkout_url": f"https://checkout.example/{mollie_payment_id}",
+            "status": "open",
+        }
+
+    monkeypatch.setattr("app.routers.payments.create_mollie_payment", _mock_create_payment)
+    response = await client.post(
+        "/auth/register",
+        json={"email": f"{mollie_payment_id}@example.com", "password": "supersecret"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    create_response = await client.post("/payments", headers=headers, json={"challenge_id": 1})
+    assert create_response.status_code == 201
+    return headers
+
+
+async def _inbox_entry(db_session: AsyncSession) -> MollieWebhookInboxEntry | None:
+    """Reload the only pending inbox row, if any."""
+
+    result = await db_session.execute(
+        select(MollieWebhookInboxEntry).execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def test_notifications_during_processing_requeue_the_payment(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: MonkeyPatch,
+    drain_webhook_inbox: Callable[[], Awaitable[int]],
+) -> None:
+    """A webhook that lands while its payment is being fetched must trigger another fetch."""
+
+    await _create_open_payment(client, monkeypatch, "tr_inbox_requeue")
+    statuses = iter(["open", "paid"])
+    fetched: list[str] = []
+
+    async def _mock_get_payment(mollie_payment_id: str) -> dict[str, str]:
+        if not fetched:
+            await client.post("/payments/webhook", data={"id": mollie_payment_id})
+        fetched.append(mollie_payment_id)
+        return {"mollie_payment_id": mollie_payment_id, "status": next(statuses)}
+
+    monkeypatch.setattr("app.services.webhook_inbox.get_mollie_payment", _mock_get_payment)
+
+    await client.post("/payments/webhook", data={"id": "tr_inbox_requeue"})
+    assert await drain_webhook_inbox() == 1
+    requeued = await _inbox_entry(db_session)
+    assert requeued is not None
+    assert requeued.notification_count == 2
+
+    assert await drain_webhook_inbox() == 1
+    assert fetched == ["tr_inbox_requeue", "tr_inbox_requeue"]
+    assert await _inbox_entry(db_session) is None
+
+
+async def test_failed_fetches_back_off_instead_of_retrying_immediately(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: MonkeyPatch,
+    drain_webhook_inbox: Callable[[], Awaitable[int]],
+) -> None:
+    """Provider errors should keep the notification but delay its next attempt."""
+
+    await _create_open_payment(client, monkeypatch, "tr_inbox_retry")
+
+    async def _failing_get_payment(_: str) -> dict[str, str]:
+        raise RuntimeError("Mollie unavailable")
+
+    monkeypatch.setattr("app.services.webhook_inbox.get_mollie_payment", _failing_get_payment)
+
+    await client.post("/payments/webhook", data={"id": "tr_inbox_retry"})
+    assert await drain_webhook_inbox() == 1
+    assert await drain_webhook_inbox() == 0
+
+    entry = await _inbox_entry(db_session)
+    assert entry is not None
+    assert entry.attempts == 1
+    assert entry.available_at > entry.last_received_at
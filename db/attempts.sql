@@ -1,5 +1,8 @@
 -- Attempts table and sequence
-CREATE SEQUENCE IF NOT EXISTS attempt_id_seq START WITH 1 INCREMENT BY 1;
+CREATE SEQUENCE IF NOT EXISTS attempt_id_seq START WITH 1 INCREMENT BY 50;
+
+-- The app reserves ids in blocks of INCREMENT BY, so only ever raise this value.
+ALTER SEQUENCE attempt_id_seq INCREMENT BY 50;
 
 CREATE TABLE IF NOT EXISTS attempts (
     attempt_id BIGINT PRIMARY KEY,
@@ -11,6 +14,15 @@ CREATE TABLE IF NOT EXISTS attempts (
     created_at TIMESTAMP NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_attempts_user_id ON attempts (user_id);
+CREATE INDEX IF NOT EXISTS idx_attempts_user_created
+ON attempts (user_id, created_at DESC, attempt_id DESC);
+CREATE INDEX IF NOT EXISTS idx_attempts_user_challenge_created
+ON attempts (user_id, challenge_id, created_at DESC, attempt_id DESC);
 CREATE INDEX IF NOT EXISTS idx_attempts_challenge_id ON attempts (challenge_id);
 CREATE INDEX IF NOT EXISTS idx_attempts_payment_id ON attempts (payment_id);
+
+-- Superseded by the composite indexes above. Block-allocated ids do not follow
+-- creation order, so listings sort by created_at first.
+DROP INDEX IF EXISTS idx_attempts_user_id;
+DROP INDEX IF EXISTS idx_attempts_user_attempt;
+DROP INDEX IF EXISTS idx_attempts_user_challenge_attempt;
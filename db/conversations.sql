@@ -1,5 +1,8 @@
 -- Conversations table and sequence
-CREATE SEQUENCE IF NOT EXISTS conversation_id_seq START WITH 1 INCREMENT BY 1;
+CREATE SEQUENCE IF NOT EXISTS conversation_id_seq START WITH 1 INCREMENT BY 50;
+
+-- The app reserves ids in blocks of INCREMENT BY, so only ever raise this value.
+ALTER SEQUENCE conversation_id_seq INCREMENT BY 50;
 
 CREATE TABLE IF NOT EXISTS conversations (
     conversation_id BIGINT PRIMARY KEY,
@@ -9,5 +12,15 @@ CREATE TABLE IF NOT EXISTS conversations (
     updated_at TIMESTAMP NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_conversations_user_id ON conversations (user_id);
+CREATE INDEX IF NOT EXISTS idx_conversations_user_challenge_created
+ON conversations (user_id, challenge_id, created_at DESC, conversation_id DESC);
 CREATE INDEX IF NOT EXISTS idx_conversations_challenge_id ON conversations (challenge_id);
+
+-- Superseded by the composite index above. Block-allocated ids do not follow
+-- creation order, so listings sort by created_at first.
+DROP INDEX IF EXISTS idx_conversations_user_id;
+DROP INDEX IF EXISTS idx_conversations_user_challenge_conversation;
+
+-- Number of messages appended so far, which is also the newest message's
+-- conversation_seq. Bumping it row-locks the conversation until commit.
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS message_count BIGINT NOT NULL DEFAULT 0;
@@ -1,5 +1,8 @@
 -- Credit transactions table and sequence
-CREATE SEQUENCE IF NOT EXISTS credit_transaction_id_seq START WITH 1 INCREMENT BY 1;
+CREATE SEQUENCE IF NOT EXISTS credit_transaction_id_seq START WITH 1 INCREMENT BY 50;
+
+-- The app reserves ids in blocks of INCREMENT BY, so only ever raise this value.
+ALTER SEQUENCE credit_transaction_id_seq INCREMENT BY 50;
 
 CREATE TABLE IF NOT EXISTS credit_transactions (
     credit_transaction_id BIGINT PRIMARY KEY,
@@ -11,6 +14,10 @@ CREATE TABLE IF NOT EXISTS credit_transactions (
     created_at TIMESTAMP NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_credit_transactions_user_id ON credit_transactions (user_id);
+CREATE INDEX IF NOT EXISTS idx_credit_transactions_user_created
+ON credit_transactions (user_id, created_at);
 CREATE INDEX IF NOT EXISTS idx_credit_transactions_challenge_id ON credit_transactions (challenge_id);
 CREATE INDEX IF NOT EXISTS idx_credit_transactions_purchase_id ON credit_transactions (credit_purchase_id);
+
+-- Superseded by the composite index above.
+DROP INDEX IF EXISTS idx_credit_transactions_user_id;
@@ -1,5 +1,8 @@
 -- Messages table and sequence
-CREATE SEQUENCE IF NOT EXISTS message_id_seq START WITH 1 INCREMENT BY 1;
+CREATE SEQUENCE IF NOT EXISTS message_id_seq START WITH 1 INCREMENT BY 50;
+
+-- The app reserves ids in blocks of INCREMENT BY, so only ever raise this value.
+ALTER SEQUENCE message_id_seq INCREMENT BY 50;
 
 CREATE TABLE IF NOT EXISTS messages (
     message_id BIGINT PRIMARY KEY,
@@ -10,7 +13,41 @@ CREATE TABLE IF NOT EXISTS messages (
     created_at TIMESTAMP NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_messages_conversation_id ON messages (conversation_id);
+-- Superseded by the composite index on conversation_seq below.
+DROP INDEX IF EXISTS idx_messages_conversation_id;
 
 ALTER TABLE messages
 ADD COLUMN IF NOT EXISTS is_secret_exposure BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- Position of the message in its conversation, assigned from
+-- conversations.message_count under the conversation row lock. Message ids come
+-- from per-process blocks, so only this column follows insertion order.
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS conversation_seq BIGINT;
+
+UPDATE messages
+SET conversation_seq = numbered.conversation_seq
+FROM (
+    SELECT
+        message_id,
+        ROW_NUMBER() OVER (PARTITION BY conversation_id ORDER BY message_id) AS conversation_seq
+    FROM messages
+) AS numbered
+WHERE messages.message_id = numbered.message_id AND messages.conversation_seq IS NULL;
+
+ALTER TABLE messages ALTER COLUMN conversation_seq SET NOT NULL;
+
+UPDATE conversations
+SET message_count = counted.message_count
+FROM (
+    SELECT conversation_id, MAX(conversation_seq) AS message_count
+    FROM messages
+    GROUP BY conversation_id
+) AS counted
+WHERE conversations.conversation_id = counted.conversation_id
+    AND conversations.message_count < counted.message_count;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_conversation_id_conversation_seq
+ON messages (conversation_id, conversation_seq);
+
+-- Superseded by the index above, message ids no longer order a conversation.
+DROP INDEX IF EXISTS idx_messages_conversation_id_message_id;
@@ -0,0 +1,17 @@
+-- Durable inbox of Mollie webhook notifications waiting to be processed.
+-- One row per (source, Mollie payment id): repeated notifications for the same
+-- payment coalesce into the pending row instead of queueing another fetch.
+CREATE TABLE IF NOT EXISTS mollie_webhook_inbox (
+    source TEXT NOT NULL,
+    mollie_payment_id TEXT NOT NULL,
+    notification_count INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    received_at TIMESTAMP NOT NULL,
+    last_received_at TIMESTAMP NOT NULL,
+    available_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (source, mollie_payment_id)
+);
+
+-- Lets the drain worker claim the oldest due rows without sorting the inbox.
+CREATE INDEX IF NOT EXISTS idx_mollie_webhook_inbox_available_at
+ON mollie_webhook_inbox (available_at);
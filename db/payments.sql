@@ -1,5 +1,8 @@
 -- Payments table and sequence
-CREATE SEQUENCE IF NOT EXISTS payment_id_seq START WITH 1 INCREMENT BY 1;
+CREATE SEQUENCE IF NOT EXISTS payment_id_seq START WITH 1 INCREMENT BY 50;
+
+-- The app reserves ids in blocks of INCREMENT BY, so only ever raise this value.
+ALTER SEQUENCE payment_id_seq INCREMENT BY 50;
 
 CREATE TABLE IF NOT EXISTS payments (
     payment_id BIGINT PRIMARY KEY,
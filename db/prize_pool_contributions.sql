@@ -0,0 +1,19 @@
+-- Prize pool contributions table and sequence (append-only, folded into challenges)
+CREATE SEQUENCE IF NOT EXISTS prize_pool_contribution_id_seq START WITH 1 INCREMENT BY 50;
+
+-- The app reserves ids in blocks of INCREMENT BY, so only ever raise this value.
+ALTER SEQUENCE prize_pool_contribution_id_seq INCREMENT BY 50;
+
+CREATE TABLE IF NOT EXISTS prize_pool_contributions (
+    prize_pool_contribution_id BIGINT PRIMARY KEY,
+    challenge_id BIGINT NOT NULL REFERENCES challenges (challenge_id),
+    amount_cents BIGINT NOT NULL,
+    created_at TIMESTAMP NOT NULL
+);
+
+-- Covering index so pending pool totals are answered by an index-only scan.
+CREATE INDEX IF NOT EXISTS idx_prize_pool_contributions_challenge_amount
+ON prize_pool_contributions (challenge_id) INCLUDE (amount_cents);
+
+-- Superseded by the covering index above.
+DROP INDEX IF EXISTS idx_prize_pool_contributions_challenge_id;
@@ -0,0 +1,12 @@
+-- Token buckets shared by every API worker and replica when RATE_LIMIT_BACKEND=postgres.
+-- Unlogged: the counters are disposable, so skipping the WAL keeps each request's
+-- upsert cheap. A crash empties the table, which only resets buckets to full.
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets (
+    bucket_key TEXT PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMP NOT NULL
+);
+
+-- Lets the pruner find buckets idle long enough to have refilled completely.
+CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_updated_at
+ON rate_limit_buckets (updated_at);
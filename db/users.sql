@@ -1,5 +1,8 @@
 -- Users table and sequence
-CREATE SEQUENCE IF NOT EXISTS user_id_seq START WITH 1 INCREMENT BY 1;
+CREATE SEQUENCE IF NOT EXISTS user_id_seq START WITH 1 INCREMENT BY 50;
+
+-- The app reserves ids in blocks of INCREMENT BY, so only ever raise this value.
+ALTER SEQUENCE user_id_seq INCREMENT BY 50;
 
 CREATE TABLE IF NOT EXISTS users (
     user_id BIGINT PRIMARY KEY,
@@ -14,3 +17,6 @@ CREATE INDEX IF NOT EXISTS idx_users_reference ON users (reference);
 -- Add authentication columns
 ALTER TABLE users ADD COLUMN IF NOT EXISTS email TEXT UNIQUE;
 ALTER TABLE users ADD COLUMN IF NOT EXISTS password_hash TEXT;
+
+-- Newest-first listing. Block-allocated ids do not follow creation order.
+CREATE INDEX IF NOT EXISTS idx_users_created ON users (created_at DESC, user_id DESC);
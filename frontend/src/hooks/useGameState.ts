@@ -8,6 +8,7 @@ import type {
   CreditBalanceResponse,
   CreditPurchaseCreateResponse,
   CreditPurchaseReadResponse,
+  MessagePage,
   MessageRead,
   PaymentCreateResponse,
   PaymentStatusResponse,
@@ -18,6 +19,7 @@ const CENTS_PER_CREDIT = 10;
 const POLL_INTERVAL_MS = 2000;
 const MAX_POLL_ATTEMPTS = 45;
 const PENDING_ATTEMPT_KEY = "bb_pending_attempt";
+const MESSAGE_PAGE_LIMIT = 200;
 
 const TERMINAL_PAYMENT_STATUSES = new Set(["paid", "failed", "canceled", "expired"]);
 
@@ -60,6 +62,23 @@ function mapMessage(message: MessageRead): ChatMessage {
   };
 }
 
+async function fetchConversationHistory(conversationId: number): Promise<MessageRead[]> {
+  const messages: MessageRead[] = [];
+  let cursor: string | null = null;
+  do {
+    const params = new URLSearchParams({ limit: String(MESSAGE_PAGE_LIMIT) });
+    if (cursor) {
+      params.set("cursor", cursor);
+    }
+    const page: MessagePage = await apiFetch<MessagePage>(
+      `/conversations/${conversationId}/messages?${params.toString()}`,
+    );
+    messages.push(...page.items);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return messages;
+}
+
 function loadPendingAttempt(): PendingAttempt | null {
   const raw = sessionStorage.getItem(PENDING_ATTEMPT_KEY);
   if (!raw) {
@@ -179,9 +198,7 @@ export function useGameState() {
         },
       );
 
-      const history = await apiFetch<MessageRead[]>(
-        `/conversations/${conversation.conversation_id}/messages`,
-      );
+      const history = await fetchConversationHistory(conversation.conversation_id);
 
       setActiveBotId(bot.id);
       setConversationId(conversation.conversation_id);
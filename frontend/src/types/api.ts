@@ -40,6 +40,11 @@ export interface MessageRead {
   created_at: string
 }
 
+export interface MessagePage {
+  items: MessageRead[]
+  next_cursor: string | null
+}
+
 export interface SendMessageResponse {
   user_message: MessageRead
   bot_message: MessageRead